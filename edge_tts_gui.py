@@ -15,13 +15,20 @@ import customtkinter as ctk
 from tkinter import filedialog, messagebox
 import os
 import json
+import tempfile
 import threading
 import asyncio
+import queue
 from pathlib import Path
 from datetime import datetime
 
 # Import TTS engines
-from tts_engines import EdgeTTSEngine, PiperTTSEngine
+from tts_engines import EdgeTTSEngine, PiperTTSEngine, CancellationToken, GenerationCancelled
+from tts_engines import GenerationJob, GenerationQueue
+from tts_engines import DOCUMENT_EXTENSIONS, DocumentTextSource, open_text_source
+from tts_engines import VoiceViewCache, SynthesisWorker, WorkerCrashed, FORMAT_LABELS, has_journal
+from tts_engines import AudiobookRenderer, find_chapters
+from tts_engines import SUBTITLE_EXTENSIONS, looks_like_subtitles
 
 # Set appearance mode and color theme
 ctk.set_appearance_mode("dark")
@@ -33,6 +40,175 @@ CONFIG_FILE = "tts_config.json"
 # Application version
 VERSION = "2.0.0"
 
+# Files larger than this are synthesized straight from disk instead of
+# being loaded into the text box
+LARGE_FILE_BYTES = 256 * 1024
+
+# Row widgets kept by the virtualized language selector
+LANGUAGE_SELECTOR_ROWS = 11
+
+# How often queued worker-thread updates are applied to widgets (~30 Hz)
+UI_PUMP_INTERVAL_MS = 33
+
+
+class UIUpdatePump:
+    """
+    Single channel for worker-thread -> UI updates.
+
+    Worker threads never touch Tk directly; they enqueue callables here and one
+    periodic after() tick on the main thread applies them. Updates posted with
+    the same key are coalesced so only the latest value is applied per tick,
+    which keeps per-block download or per-chunk progress from flooding Tk.
+    """
+
+    def __init__(self, root, interval_ms: int = UI_PUMP_INTERVAL_MS):
+        self._root = root
+        self._interval_ms = interval_ms
+        self._queue = queue.SimpleQueue()
+        self._root.after(self._interval_ms, self._tick)
+
+    def post(self, key, func):
+        """Queue a coalescable update; a later post with the same key replaces it"""
+        self._queue.put((key, func))
+
+    def call(self, func):
+        """Queue a one-off update that is always applied (dialogs, completion)"""
+        self._queue.put((None, func))
+
+    def _tick(self):
+        # Keep only the latest update per key, applied in order of last arrival
+        pending = {}
+        while True:
+            try:
+                key, func = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if key is None:
+                key = object()
+            pending.pop(key, None)
+            pending[key] = func
+
+        for func in pending.values():
+            try:
+                func()
+            except Exception as e:
+                print(f"UI update failed: {e}")
+
+        try:
+            self._root.after(self._interval_ms, self._tick)
+        except Exception:
+            pass  # Window destroyed
+
+
+class IncrementalTextStats:
+    """
+    Character and word counts for a Tk text widget, maintained by delta.
+
+    The widget's Tcl command is wrapped so every insert/delete/replace is seen
+    with its index range. Only the lines an edit touches are re-counted before
+    and after it, so a keystroke costs O(line) instead of O(document).
+    on_change fires after each edit; on_idle fires once typing pauses.
+    """
+
+    def __init__(self, text_widget, on_change=None, on_idle=None, idle_ms: int = 600):
+        self.widget = text_widget
+        self.on_change = on_change
+        self.on_idle = on_idle
+        self.idle_ms = idle_ms
+        self.chars = 0
+        self.words = 0
+        self._idle_job = None
+        # Undo/redo bypass the widget command; recount in full on the next pause
+        self._dirty = False
+
+        self._orig = text_widget._w + "_stats_orig"
+        text_widget.tk.call("rename", text_widget._w, self._orig)
+        text_widget.tk.createcommand(text_widget._w, self._proxy)
+        self.recount()
+
+    def _call(self, *args):
+        return self.widget.tk.call(self._orig, *args)
+
+    def _line(self, index) -> int:
+        return int(str(self._call("index", index)).split(".")[0])
+
+    def _last_line(self) -> int:
+        return self._line("end-1c")
+
+    def _touched_line(self, index) -> int:
+        """Line an edit at index touches ("end" lies past the last line, which it edits)"""
+        return min(self._line(index), self._last_line())
+
+    def _measure(self, first_line: int, last_line: int):
+        """(chars, words) for whole lines first_line..last_line"""
+        # Clamp to the real last line so Tk's implicit trailing newline is never counted
+        doc_last = self._last_line()
+        last_line = min(last_line, doc_last)
+        first_line = min(first_line, last_line)
+        text = str(self._call("get", f"{first_line}.0", f"{last_line}.end"))
+        # The newline ending the range belongs to it, except on the last line
+        newline = 1 if last_line < doc_last else 0
+        return len(text) + newline, len(text.split())
+
+    def _proxy(self, *args):
+        op = args[0] if args else ""
+        if op not in ("insert", "delete", "replace") or len(args) < 2:
+            result = self._call(*args)
+            if op == "edit" and len(args) > 1 and args[1] in ("undo", "redo"):
+                self._dirty = True
+                self._schedule_idle()
+            return result
+
+        try:
+            first = self._touched_line(args[1])
+            if op in ("delete", "replace") and len(args) > 2:
+                last = self._touched_line(args[2])
+            elif op == "delete":
+                # One index (Backspace) deletes one char, maybe a newline joining two lines
+                last = self._touched_line(f"{args[1]}+1c")
+            else:
+                last = first
+            lines_before = self._last_line()
+            chars_before, words_before = self._measure(first, last)
+        except Exception:
+            return self._call(*args)
+
+        result = self._call(*args)
+
+        try:
+            last_after = max(first, last + self._last_line() - lines_before)
+            chars_after, words_after = self._measure(first, last_after)
+            self.chars += chars_after - chars_before
+            self.words += words_after - words_before
+        except Exception:
+            self._dirty = True
+
+        if self.on_change:
+            self.on_change(self.chars, self.words)
+        self._schedule_idle()
+        return result
+
+    def _schedule_idle(self):
+        if self._idle_job is not None:
+            self.widget.after_cancel(self._idle_job)
+        self._idle_job = self.widget.after(self.idle_ms, self._fire_idle)
+
+    def _fire_idle(self):
+        self._idle_job = None
+        if self._dirty:
+            self.recount()
+            if self.on_change:
+                self.on_change(self.chars, self.words)
+        if self.on_idle:
+            self.on_idle()
+
+    def recount(self):
+        """Full O(n) count - used at startup and after undo/redo"""
+        text = str(self._call("get", "1.0", "end-1c"))
+        self.chars = len(text)
+        self.words = len(text.split())
+        self._dirty = False
+
 
 class EdgeTTSApp(ctk.CTk):
     def __init__(self):
@@ -58,24 +234,11 @@ class EdgeTTSApp(ctk.CTk):
         }
         self.current_engine = self.engines['edge']
 
+        # Memoized dropdown view models per (engine, language, show_all, installed voices)
+        self.voice_views = VoiceViewCache()
+
         # Load voices from current engine
-        self.voice_categories = self.current_engine.get_voices()
-
-        # Flatten voices for dropdown
-        # all_voices maps voice_id -> description
-        self.all_voices = {}
-        for category, voices in self.voice_categories.items():
-            self.all_voices.update(voices)
-
-        # Create display name mapping for better UX
-        # voice_display maps display_name -> voice_id
-        self.voice_display = {}
-        self.voice_id_to_display = {}
-        for voice_id, desc in self.all_voices.items():
-            # Create a shorter display name from the description
-            display_name = desc.split(' [')[0].split(' (')[0]  # Remove status tags
-            self.voice_display[display_name] = voice_id
-            self.voice_id_to_display[voice_id] = display_name
+        self.apply_voice_view(self.voice_views.get('edge', self.current_engine, show_all=True))
 
         # Variables
         self.engine_var = ctk.StringVar(value='edge')
@@ -87,6 +250,10 @@ class EdgeTTSApp(ctk.CTk):
         self.pitch_var = ctk.DoubleVar(value=0)
         self.volume_var = ctk.DoubleVar(value=0)
         self.show_all_languages_var = ctk.BooleanVar(value=False)
+        self.mixed_language_var = ctk.BooleanVar(value=False)
+        self.dialogue_var = ctk.BooleanVar(value=False)
+        self.audiobook_var = ctk.BooleanVar(value=False)
+        self.auto_route_var = ctk.BooleanVar(value=False)
         self.selected_language = ctk.StringVar(value="English (US)")  # User selected language
 
         # Piper supported languages (~40 from HuggingFace)
@@ -160,10 +327,42 @@ class EdgeTTSApp(ctk.CTk):
         default_output = str(Path.cwd() / f"speech_{timestamp}.mp3")
         self.output_path_var = ctk.StringVar(value=default_output)
 
+        # Chosen output format per engine (Piper can encode FLAC/Opus/MP3)
+        self.output_formats = {'edge': '.mp3', 'piper': '.wav'}
+        self.output_format_var = ctk.StringVar(value="MP3")
+
         self.char_count_var = ctk.StringVar(value="Characters: 0")
         self.word_count_var = ctk.StringVar(value="Words: 0")
         self.status_var = ctk.StringVar(value="Ready - 100% FREE!")
 
+        # Lowercase search index for the language selector (rebuilt per list)
+        self._language_index = []
+        self._language_index_key = None
+
+        # Last language code reported by auto-detection
+        self.detected_language = None
+
+        # Large imported file streamed from disk (None = use the text box)
+        self.file_source = None
+
+        # Cancellation token for the running generation (None when idle)
+        self.active_cancel_token = None
+        # Tokens for in-flight voice downloads, cancelled on close
+        self.download_tokens = set()
+
+        # Worker threads route all UI updates through this pump
+        self.ui_pump = UIUpdatePump(self)
+
+        # Long-lived synthesis process: keeps inference off the Tk process
+        # and loaded Piper models warm between jobs
+        self.synthesis_worker = SynthesisWorker()
+        self.synthesis_worker.start()
+
+        # Background generation queue (Edge concurrent, Piper limited by cores)
+        self.job_queue = GenerationQueue(on_update=self.on_job_update, worker=self.synthesis_worker)
+        self.job_rows = {}
+        self.job_queue_dialog = None
+
         # Load saved settings
         self.load_settings()
 
@@ -308,7 +507,13 @@ class EdgeTTSApp(ctk.CTk):
             font=ctk.CTkFont(size=11)
         )
         self.text_box.pack(fill="both", expand=True, padx=10, pady=(0, 10))
-        self.text_box.bind("<KeyRelease>", lambda e: self.update_stats())
+
+        # Counts update by delta on every edit; detection waits for a pause
+        self.text_stats = IncrementalTextStats(
+            self.text_box._textbox,
+            on_change=lambda chars, words: self.update_stats(),
+            on_idle=self.on_typing_paused
+        )
 
         # Import button
         import_btn = ctk.CTkButton(
@@ -457,6 +662,48 @@ class EdgeTTSApp(ctk.CTk):
         self.volume_label = ctk.CTkLabel(volume_frame, text="+0%", width=50)
         self.volume_label.pack(side="left", padx=5)
 
+        # Mixed-language documents: pick a voice per paragraph language
+        mixed_frame = ctk.CTkFrame(settings_frame, fg_color="transparent")
+        mixed_frame.pack(fill="x", padx=10, pady=(3, 3))
+
+        self.mixed_language_checkbox = ctk.CTkCheckBox(
+            mixed_frame,
+            text="Auto voice per language (mixed-language text)",
+            variable=self.mixed_language_var,
+            font=ctk.CTkFont(size=11)
+        )
+        self.mixed_language_checkbox.pack(side="left", padx=5)
+
+        # Dialogue scripts: "SPEAKER: line", a voice per speaker, one stem per line
+        self.dialogue_checkbox = ctk.CTkCheckBox(
+            mixed_frame,
+            text="Dialogue script (SPEAKER: line)",
+            variable=self.dialogue_var,
+            font=ctk.CTkFont(size=11)
+        )
+        self.dialogue_checkbox.pack(side="left", padx=5)
+
+        # Engine routing: use whichever engine is expected to finish first
+        route_frame = ctk.CTkFrame(settings_frame, fg_color="transparent")
+        route_frame.pack(fill="x", padx=10, pady=(0, 8))
+
+        self.auto_route_checkbox = ctk.CTkCheckBox(
+            route_frame,
+            text="Fastest engine (Piper fallback if Edge is slow)",
+            variable=self.auto_route_var,
+            font=ctk.CTkFont(size=11)
+        )
+        self.auto_route_checkbox.pack(side="left", padx=5)
+
+        # Audiobooks: one file per chapter, chapters rendered in parallel processes
+        self.audiobook_checkbox = ctk.CTkCheckBox(
+            route_frame,
+            text="Audiobook (one file per chapter + playlist)",
+            variable=self.audiobook_var,
+            font=ctk.CTkFont(size=11)
+        )
+        self.audiobook_checkbox.pack(side="left", padx=5)
+
         # Right side - Generate Button
         button_frame = ctk.CTkFrame(settings_container, fg_color="transparent")
         button_frame.pack(side="right", padx=10, pady=10)
@@ -466,11 +713,44 @@ class EdgeTTSApp(ctk.CTk):
             text="🎵 Generate MP3",
             font=ctk.CTkFont(size=14, weight="bold"),
             width=180,
-            height=120,
+            height=60,
             command=self.generate_mp3
         )
         self.generate_btn.pack()
 
+        self.cancel_btn = ctk.CTkButton(
+            button_frame,
+            text="⏹ Cancel",
+            width=180,
+            height=30,
+            fg_color="gray",
+            hover_color="#555555",
+            command=self.cancel_generation,
+            state="disabled"
+        )
+        self.cancel_btn.pack(pady=(6, 0))
+
+        # Job queue - snapshot the current settings as a background job
+        self.add_queue_btn = ctk.CTkButton(
+            button_frame,
+            text="➕ Add to Queue",
+            width=180,
+            height=30,
+            command=self.add_to_queue
+        )
+        self.add_queue_btn.pack(pady=(6, 0))
+
+        self.queue_btn = ctk.CTkButton(
+            button_frame,
+            text="📋 Job Queue (0)",
+            width=180,
+            height=30,
+            fg_color="#333333",
+            hover_color="#555555",
+            command=self.show_job_queue
+        )
+        self.queue_btn.pack(pady=(6, 0))
+
         # Statistics Section
         stats_frame = ctk.CTkFrame(main_frame)
         stats_frame.pack(fill="x", pady=(0, 8))
@@ -541,6 +821,16 @@ class EdgeTTSApp(ctk.CTk):
         )
         self.output_entry.pack(side="left", padx=(0, 5))
 
+        self.format_menu = ctk.CTkOptionMenu(
+            controls_frame,
+            values=["MP3"],
+            variable=self.output_format_var,
+            width=75,
+            command=self.on_format_change
+        )
+        self.format_menu.pack(side="left", padx=2)
+        self.refresh_format_menu()
+
         browse_btn = ctk.CTkButton(
             controls_frame,
             text="Browse",
@@ -588,6 +878,8 @@ class EdgeTTSApp(ctk.CTk):
 
     def clear_text(self):
         """Clear the text box"""
+        if self.file_source:
+            self.exit_file_mode()
         self.text_box.delete("1.0", "end")
         self.update_stats()
 
@@ -633,8 +925,32 @@ class EdgeTTSApp(ctk.CTk):
         # Update voice dropdown with filtered voices
         self.update_voice_dropdown()
 
-        # Update output extension
-        ext = self.current_engine.get_output_extension()
+        # Update output format choices and extension
+        self.refresh_format_menu()
+
+    def refresh_format_menu(self):
+        """Offer the current engine's output formats and apply the chosen one"""
+        engine_key = self.engine_var.get()
+        formats = self.current_engine.get_output_formats()
+        ext = self.output_formats.get(engine_key)
+        if ext not in formats:
+            ext = formats[0]
+        self.output_formats[engine_key] = ext
+        self.format_menu.configure(
+            values=[FORMAT_LABELS.get(f, f) for f in formats],
+            state="normal" if len(formats) > 1 else "disabled"
+        )
+        self.output_format_var.set(FORMAT_LABELS.get(ext, ext))
+        self.set_output_extension(ext)
+
+    def on_format_change(self, label):
+        """Switch the output file to the picked format"""
+        ext = next((e for e, name in FORMAT_LABELS.items() if name == label), None)
+        if ext:
+            self.output_formats[self.engine_var.get()] = ext
+            self.set_output_extension(ext)
+
+    def set_output_extension(self, ext):
         current_path = self.output_path_var.get()
         if current_path:
             base = os.path.splitext(current_path)[0]
@@ -732,34 +1048,55 @@ class EdgeTTSApp(ctk.CTk):
         if not isinstance(self.current_engine, PiperTTSEngine):
             return
 
+        cancel_token = self.begin_download()
+
         def do_download():
             try:
-                self.after(0, lambda: self.status_var.set(f"Downloading {voice_id}..."))
-                self.after(0, lambda: self.progress_bar.set(0.1))
+                self.ui_pump.post('status', lambda: self.status_var.set(f"Downloading {voice_id}..."))
+                self.ui_pump.post('progress', lambda: self.progress_bar.set(0.1))
 
                 def progress_cb(progress, status):
-                    self.after(0, lambda p=progress, s=status: (
-                        self.progress_bar.set(p),
-                        self.status_var.set(s)
-                    ))
+                    self.ui_pump.post('progress', lambda p=progress: self.progress_bar.set(p))
+                    self.ui_pump.post('status', lambda s=status: self.status_var.set(s))
 
-                self.current_engine.download_voice(voice_id, progress_cb)
+                self.current_engine.download_voice(voice_id, progress_cb, cancel_token)
 
-                self.after(0, lambda: self.status_var.set(f"✅ Downloaded {voice_id}"))
-                self.after(0, lambda: self.progress_bar.set(1.0))
+                self.ui_pump.post('status', lambda: self.status_var.set(f"✅ Downloaded {voice_id}"))
+                self.ui_pump.post('progress', lambda: self.progress_bar.set(1.0))
 
                 # Refresh voice list
-                self.after(0, lambda: self.on_engine_change(self.engine_var.get()))
+                self.ui_pump.call(lambda: self.on_engine_change(self.engine_var.get()))
 
                 # Refresh dialog
-                self.after(100, lambda: (dialog.destroy(), self.show_download_manager()))
+                self.ui_pump.call(lambda: self.after(100, lambda: (dialog.destroy(), self.show_download_manager())))
+
+            except GenerationCancelled:
+                self.ui_pump.post('status', lambda: self.status_var.set(f"⏹ Download of {voice_id} cancelled"))
+                self.ui_pump.post('progress', lambda: self.progress_bar.set(0))
 
             except Exception as e:
-                self.after(0, lambda: self.status_var.set(f"❌ Download failed: {str(e)}"))
-                self.after(0, lambda: messagebox.showerror("Error", f"Failed to download voice:\n{e}"))
+                error_msg = str(e)
+                self.ui_pump.post('status', lambda: self.status_var.set(f"❌ Download failed: {error_msg}"))
+                self.ui_pump.call(lambda: messagebox.showerror("Error", f"Failed to download voice:\n{error_msg}"))
+
+            finally:
+                self.ui_pump.call(lambda: self.end_download(cancel_token))
 
         threading.Thread(target=do_download, daemon=True).start()
 
+    def begin_download(self):
+        """Create a cancel token for a voice download and enable Cancel"""
+        cancel_token = CancellationToken()
+        self.download_tokens.add(cancel_token)
+        self.cancel_btn.configure(state="normal")
+        return cancel_token
+
+    def end_download(self, cancel_token):
+        """Forget a finished download's token"""
+        self.download_tokens.discard(cancel_token)
+        if not self.download_tokens and not self.active_cancel_token:
+            self.cancel_btn.configure(state="disabled")
+
     def on_voice_display_change(self, display_name):
         """Handle voice selection change from dropdown"""
         # Map display name back to voice_id
@@ -800,23 +1137,69 @@ class EdgeTTSApp(ctk.CTk):
 
     def update_stats(self):
         """Update character and word count"""
-        text = self.text_box.get("1.0", "end-1c")
-        char_count = len(text)
-        word_count = len(text.split()) if text.strip() else 0
-        self.char_count_var.set(f"Characters: {char_count:,}")
-        self.word_count_var.set(f"Words: {word_count:,}")
+        if self.file_source:
+            # Counted by the background pass in load_file_source
+            return
+        self.char_count_var.set(f"Characters: {self.text_stats.chars:,}")
+        self.word_count_var.set(f"Words: {self.text_stats.words:,}")
+
+    def on_typing_paused(self):
+        """Run language detection in the background once typing stops"""
+        if self.file_source:
+            return
+
+        sample = self.text_box.get("1.0", "1.0 + 2000 chars")
+        if not sample.strip():
+            return
+
+        def detect():
+            lang_code = PiperTTSEngine.detect_language(sample)
+            if lang_code:
+                self.ui_pump.post('detected_language', lambda: self.apply_detected_language(lang_code))
+
+        threading.Thread(target=detect, daemon=True).start()
+
+    def apply_detected_language(self, lang_code):
+        """Record a newly detected language and suggest it in the status bar"""
+        if lang_code == self.detected_language:
+            return
+        self.detected_language = lang_code
+
+        selected = self.selected_language.get()
+        if self.language_to_code.get(selected, selected[:2].lower()) == lang_code:
+            return
+        if self.active_cancel_token:
+            return  # Keep generation progress in the status bar
+
+        # Only a suggestion: the user's language and voice choice is left alone
+        for lang in self.current_language_list:
+            if self.language_to_code.get(lang) == lang_code:
+                self.status_var.set(f"Text looks like {lang} - select it to change voices")
+                break
 
     def import_text_file(self):
         """Import text from a file"""
         file_path = filedialog.askopenfilename(
             title="Select Text File",
             filetypes=[
+                ("Text and Documents", "*.txt *.epub *.html *.htm *.xhtml *.md *.markdown *.srt *.vtt"),
                 ("Text Files", "*.txt"),
+                ("EPUB Books", "*.epub"),
+                ("HTML Files", "*.html *.htm *.xhtml"),
+                ("Markdown Files", "*.md *.markdown"),
+                ("Subtitles", "*.srt *.vtt"),
                 ("All Files", "*.*")
             ]
         )
         if file_path:
             try:
+                # Documents are always streamed: parsed segments go straight to synthesis
+                if (os.path.getsize(file_path) > LARGE_FILE_BYTES
+                        or Path(file_path).suffix.lower() in DOCUMENT_EXTENSIONS):
+                    self.load_file_source(file_path)
+                    return
+                if self.file_source:
+                    self.exit_file_mode()
                 with open(file_path, 'r', encoding='utf-8') as f:
                     text = f.read()
                 self.text_box.delete("1.0", "end")
@@ -826,36 +1209,112 @@ class EdgeTTSApp(ctk.CTk):
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to load file:\n{e}")
 
+    def load_file_source(self, file_path):
+        """Use a large file or a document as the generation source, showing only a preview"""
+        source = open_text_source(file_path)
+        self.file_source = source
+
+        preview = source.preview()
+        self.text_box.configure(state="normal")
+        self.text_box.delete("1.0", "end")
+        self.text_box.insert(
+            "1.0",
+            f"{preview}\n\n"
+            f"[Preview of {source.name} ({source.size_bytes / 1024 / 1024:.1f} MB) - "
+            f"the full file is read from disk during generation. Click Clear to exit.]"
+        )
+        self.text_box.configure(state="disabled")
+        # Language routing needs the whole text up front; files are streamed
+        self.mixed_language_checkbox.configure(state="disabled")
+
+        self.char_count_var.set("Characters: counting...")
+        self.word_count_var.set("Words: counting...")
+        self.status_var.set(f"Loaded (file mode): {source.name}")
+
+        def count():
+            def progress_cb(chars, words, fraction):
+                if self.file_source is not source:
+                    return
+                self.ui_pump.post('stats', lambda: (
+                    self.char_count_var.set(f"Characters: {chars:,}" + ("" if fraction >= 1 else "+")),
+                    self.word_count_var.set(f"Words: {words:,}" + ("" if fraction >= 1 else "+"))
+                ))
+
+            try:
+                source.compute_stats(progress_cb)
+            except Exception as e:
+                error_msg = str(e)
+                self.ui_pump.post('status', lambda: self.status_var.set(f"❌ Failed to read file: {error_msg}"))
+
+        threading.Thread(target=count, daemon=True).start()
+
+    def exit_file_mode(self):
+        """Return to generating from the text box"""
+        self.file_source = None
+        self.text_box.configure(state="normal")
+        self.mixed_language_checkbox.configure(state="normal")
+
     def browse_output(self):
         """Browse for output file location"""
+        ext = self.output_formats.get(self.engine_var.get(), ".mp3")
+        label = FORMAT_LABELS.get(ext, ext.upper()[1:])
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        default_filename = f"speech_{timestamp}.mp3"
+        default_filename = f"speech_{timestamp}{ext}"
 
         current_path = self.output_path_var.get()
         initial_dir = os.path.dirname(current_path) if current_path else os.getcwd()
 
         file_path = filedialog.asksaveasfilename(
-            title="Save MP3 As",
-            defaultextension=".mp3",
-            filetypes=[("MP3 Files", "*.mp3"), ("All Files", "*.*")],
+            title=f"Save {label} As",
+            defaultextension=ext,
+            filetypes=[(f"{label} Files", f"*{ext}"), ("All Files", "*.*")],
             initialfile=default_filename,
             initialdir=initial_dir
         )
         if file_path:
             self.output_path_var.set(file_path)
 
-    def generate_mp3(self):
-        """Generate audio from text using selected TTS engine"""
-        text = self.text_box.get("1.0", "end-1c").strip()
-        output_path = self.output_path_var.get()
+    def render_audiobook(self, engine_key, file_source, text, output_path, voice, speed, pitch, volume,
+                         progress_callback, cancel_token):
+        """Split the imported file (or the text box) into chapters and render them in parallel"""
+        temp_source = None
+        if isinstance(file_source, DocumentTextSource):
+            # Flatten the document to text with "# Title" lines at chapter starts
+            with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as f:
+                temp_source = source_path = f.name
+        elif file_source:
+            source_path = str(file_source.path)
+        else:
+            with tempfile.NamedTemporaryFile('w', suffix='.txt', encoding='utf-8', delete=False) as f:
+                f.write(text)
+                temp_source = source_path = f.name
+        try:
+            if isinstance(file_source, DocumentTextSource):
+                progress_callback(0.01, f"Reading {file_source.name}...")
+                file_source.write_text(source_path, cancel_token)
+            progress_callback(0.01, "Finding chapters...")
+            chapters = find_chapters(source_path)
+            # "book.mp3" -> folder "book" with "01 - Chapter 1.mp3"... and "book.m3u"
+            base, ext = os.path.splitext(output_path)
+            return AudiobookRenderer(engine_key).render(
+                source_path, chapters, base, voice, ext or self.current_engine.get_output_extension(),
+                speed=speed, pitch=pitch, volume=volume,
+                progress_callback=progress_callback,
+                cancel_token=cancel_token
+            )
+        finally:
+            if temp_source:
+                os.remove(temp_source)
 
+    def validate_generation(self, text, output_path):
+        """Check inputs and engine availability before starting a job"""
         if not text:
             messagebox.showwarning("Warning", "Please enter some text to convert.")
-            return
+            return False
 
         if not output_path:
             messagebox.showwarning("Warning", "Please specify an output file path.")
-            return
+            return False
 
         # Check if engine is available
         if not self.current_engine.is_available():
@@ -872,6 +1331,17 @@ class EdgeTTSApp(ctk.CTk):
                     f"{engine_name} is not available.\n\n"
                     "Please run: pip install edge-tts"
                 )
+            return False
+
+        return True
+
+    def generate_mp3(self):
+        """Generate audio from text using selected TTS engine"""
+        text = self.text_box.get("1.0", "end-1c").strip()
+        output_path = self.output_path_var.get()
+        file_source = self.file_source
+
+        if not self.validate_generation(text, output_path):
             return
 
         # Scroll to bottom to show progress
@@ -882,6 +1352,23 @@ class EdgeTTSApp(ctk.CTk):
         self.progress_bar.set(0)
         self.status_var.set("Starting generation...")
 
+        # New token per job; the Cancel button is wired to it
+        cancel_token = CancellationToken()
+        self.active_cancel_token = cancel_token
+        self.cancel_btn.configure(state="normal")
+
+        # Read Tk variables here, on the main thread
+        engine_key = self.engine_var.get()
+        mixed = self.mixed_language_var.get()
+        dialogue = self.dialogue_var.get()
+        audiobook = self.audiobook_var.get()
+        auto_route = self.auto_route_var.get()
+        # SRT/VTT input is dubbed: each cue is fitted to its time on one track
+        if file_source:
+            subtitles = file_source.path.suffix.lower() in SUBTITLE_EXTENSIONS
+        else:
+            subtitles = looks_like_subtitles(text)
+
         def generate():
             try:
                 voice = self.voice_var.get()
@@ -890,63 +1377,354 @@ class EdgeTTSApp(ctk.CTk):
                 volume = int(self.volume_var.get())
 
                 def progress_callback(progress, status):
-                    self.after(0, lambda p=progress, s=status: (
-                        self.progress_bar.set(p),
-                        self.status_var.set(s)
-                    ))
+                    self.ui_pump.post('progress', lambda p=progress: self.progress_bar.set(p))
+                    self.ui_pump.post('status', lambda s=status: self.status_var.set(s))
 
-                # Generate using current engine
-                self.current_engine.generate(
-                    text=text,
-                    voice=voice,
-                    output_path=output_path,
-                    speed=speed,
-                    pitch=pitch,
-                    volume=volume,
-                    progress_callback=progress_callback
-                )
+                details = ""
 
-                self.after(0, lambda: self.progress_bar.set(1.0))
+                if audiobook:
+                    # Chapters render in their own process pool (the synthesis
+                    # worker is a daemon process and can't start one)
+                    book = self.render_audiobook(
+                        engine_key, file_source, text, output_path, voice, speed, pitch, volume,
+                        progress_callback, cancel_token
+                    )
+                    self.ui_pump.post('progress', lambda: self.progress_bar.set(1.0))
+                    self.ui_pump.post('status', lambda: self.status_var.set(
+                        f"✅ Audiobook saved: {len(book.chapters)} chapters "
+                        f"({book.chars_per_second:,.0f} chars/s) - FREE!"
+                    ))
+                    self.ui_pump.call(lambda: messagebox.showinfo(
+                        "Success",
+                        f"Audiobook generated successfully!\n\n"
+                        f"Engine: {self.engines[engine_key].name}\n"
+                        f"Chapters: {len(book.chapters)}\n"
+                        f"Processes: {book.processes}\n"
+                        f"Time: {book.elapsed:.1f} s ({book.chars_per_second:,.0f} chars/s, "
+                        f"{book.realtime_factor:.1f}x real time)\n"
+                        f"Playlist: {book.playlist_path}\n"
+                        f"Cost: $0.00 (FREE!)"
+                    ))
+                    return
+
+                # Synthesis runs in the worker process; this thread only waits
+                request = {
+                    'engine': engine_key,
+                    'voice': voice,
+                    'output_path': output_path,
+                    'speed': speed,
+                    'pitch': pitch,
+                    'volume': volume,
+                }
+                if subtitles:
+                    if file_source:
+                        request.update(mode='subtitles', source_path=str(file_source.path))
+                    else:
+                        request.update(mode='subtitles', text=text)
+                elif dialogue:
+                    # Voice per speaker; lines render in parallel, stems kept next to the output
+                    if file_source:
+                        request.update(mode='dialogue', source_path=str(file_source.path))
+                    else:
+                        request.update(mode='dialogue', text=text)
+                elif mixed and not file_source:
+                    # Route each paragraph to a voice matching its language (the
+                    # checkbox is disabled in file mode, which streams from disk)
+                    request.update(mode='mixed', text=text)
+                elif file_source:
+                    # Stream segments straight from disk
+                    request.update(
+                        mode='file',
+                        source_path=str(file_source.path),
+                        total_chars=file_source.char_count
+                    )
+                else:
+                    # Optionally let the router pick (and hedge) the engine
+                    request.update(mode='text', text=text, route=auto_route)
+
+                result = self.synthesis_worker.run(request, progress_callback, cancel_token)
+                saved_path = result.get('output_path', output_path)
+                engine_name = self.engines[result.get('engine', engine_key)].name
+
+                if request['mode'] == 'mixed':
+                    segments = result.get('segments', [])
+                    code_to_language = {}
+                    for name, code in self.language_to_code.items():
+                        code_to_language.setdefault(code, name.split(' (')[0])
+                    used = sorted({code_to_language.get(lang, lang or '?') for lang, _ in segments})
+                    details = f"Segments: {len(segments)} ({', '.join(used)})\n"
+                    loads_saved = result.get('model_loads_saved', 0)
+                    if loads_saved > 0:
+                        details += f"Voice model loads saved: {loads_saved}\n"
+                    elif loads_saved < 0:
+                        details += f"Extra voice model loads: {-loads_saved}\n"
+                elif request['mode'] == 'dialogue':
+                    speakers = ", ".join(f"{name} ({voice})" for name, voice in result.get('speakers', {}).items())
+                    details = (
+                        f"Lines: {result.get('lines', 0)}\n"
+                        f"Speakers: {speakers}\n"
+                        f"Stems: {result.get('stems_dir', '')}\n"
+                    )
+                elif request['mode'] == 'subtitles':
+                    details = (
+                        f"Cues: {result.get('cues', 0)} ({result.get('stretched', 0)} sped up to fit)\n"
+                        f"Clips: {result.get('clips_dir', '')}\n"
+                    )
+                    unfit = result.get('unfit', [])
+                    if unfit:
+                        listed = ", ".join(
+                            f"#{number} at {start // 60:.0f}:{start % 60:04.1f} (needs {needed}x)"
+                            for number, start, needed in unfit[:5]
+                        )
+                        more = f" and {len(unfit) - 5} more" if len(unfit) > 5 else ""
+                        details += f"Too long for their cue (cut): {listed}{more}\n"
+                elif result.get('engine') and result['engine'] != engine_key:
+                    details = f"Voice: {result['voice']} (routed - faster engine)\n"
+                    if saved_path != output_path:
+                        self.ui_pump.call(lambda: self.output_path_var.set(saved_path))
+
+                self.ui_pump.post('progress', lambda: self.progress_bar.set(1.0))
 
                 # Success
-                file_size = os.path.getsize(output_path) / 1024  # KB
-                ext = os.path.splitext(output_path)[1].upper()[1:]
-                engine_name = self.current_engine.name
+                file_size = os.path.getsize(saved_path) / 1024  # KB
+                ext = os.path.splitext(saved_path)[1].upper()[1:]
 
-                self.after(0, lambda: self.status_var.set(
+                self.ui_pump.post('status', lambda: self.status_var.set(
                     f"✅ Success! {ext} saved ({file_size:.1f} KB) - FREE!"
                 ))
-                self.after(0, lambda: self.play_btn.configure(state="normal"))
-                self.after(0, lambda: messagebox.showinfo(
+                self.ui_pump.call(lambda: self.play_btn.configure(state="normal"))
+                self.ui_pump.call(lambda: messagebox.showinfo(
                     "Success",
                     f"Audio file generated successfully!\n\n"
                     f"Engine: {engine_name}\n"
-                    f"File: {os.path.basename(output_path)}\n"
+                    f"{details}"
+                    f"File: {os.path.basename(saved_path)}\n"
                     f"Size: {file_size:.1f} KB\n"
                     f"Cost: $0.00 (FREE!)"
                 ))
 
+            except GenerationCancelled as e:
+                reason = str(e)
+                if has_journal(output_path):
+                    outcome = "generate again to resume"
+                else:
+                    outcome = "partial output removed"
+                self.ui_pump.post('status', lambda: self.status_var.set(f"⏹ {reason} - {outcome}"))
+                self.ui_pump.post('progress', lambda: self.progress_bar.set(0))
+
+            except WorkerCrashed as e:
+                error_msg = str(e)
+                self.ui_pump.post('status', lambda: self.status_var.set("❌ Synthesis worker crashed - it will restart"))
+                self.ui_pump.call(lambda: messagebox.showerror("Error", f"Failed to generate audio:\n{error_msg}"))
+                self.ui_pump.post('progress', lambda: self.progress_bar.set(0))
+
             except ImportError as e:
-                self.after(0, lambda: self.status_var.set(f"❌ Missing dependency"))
-                self.after(0, lambda: messagebox.showerror(
+                missing = str(e)
+                self.ui_pump.post('status', lambda: self.status_var.set(f"❌ Missing dependency"))
+                self.ui_pump.call(lambda: messagebox.showerror(
                     "Error",
-                    f"Missing dependency:\n{e}\n\n"
+                    f"Missing dependency:\n{missing}\n\n"
                     "Please check installation."
                 ))
-                self.after(0, lambda: self.progress_bar.set(0))
+                self.ui_pump.post('progress', lambda: self.progress_bar.set(0))
 
             except Exception as e:
                 error_msg = str(e)
-                self.after(0, lambda: self.status_var.set(f"❌ Error: {error_msg[:50]}..."))
-                self.after(0, lambda: messagebox.showerror("Error", f"Failed to generate audio:\n{error_msg}"))
-                self.after(0, lambda: self.progress_bar.set(0))
+                self.ui_pump.post('status', lambda: self.status_var.set(f"❌ Error: {error_msg[:50]}..."))
+                self.ui_pump.call(lambda: messagebox.showerror("Error", f"Failed to generate audio:\n{error_msg}"))
+                self.ui_pump.post('progress', lambda: self.progress_bar.set(0))
 
             finally:
-                self.after(0, lambda: self.generate_btn.configure(state="normal"))
+                self.ui_pump.call(lambda: self.finish_generation(cancel_token))
 
         # Run in separate thread
         threading.Thread(target=generate, daemon=True).start()
 
+    def cancel_generation(self):
+        """Cancel the running generation and any voice downloads"""
+        if self.active_cancel_token:
+            self.active_cancel_token.cancel()
+        for token in list(self.download_tokens):
+            token.cancel()
+        self.cancel_btn.configure(state="disabled")
+        self.status_var.set("Cancelling...")
+
+    def finish_generation(self, cancel_token):
+        """Re-enable controls once a generation thread has ended"""
+        if self.active_cancel_token is cancel_token:
+            self.active_cancel_token = None
+        self.generate_btn.configure(state="normal")
+        if not self.download_tokens:
+            self.cancel_btn.configure(state="disabled")
+
+    def unique_output_path(self, output_path):
+        """Avoid overwriting existing files or outputs of unfinished queued jobs"""
+        taken = {job.output_path for job in self.job_queue.jobs() if not job.is_finished}
+        base, ext = os.path.splitext(output_path)
+        candidate = output_path
+        n = 2
+        while candidate in taken or os.path.exists(candidate):
+            candidate = f"{base}_{n}{ext}"
+            n += 1
+        return candidate
+
+    def add_to_queue(self):
+        """Snapshot the current text, voice, parameters and output as a queued job"""
+        text = self.text_box.get("1.0", "end-1c").strip()
+        output_path = self.output_path_var.get()
+
+        if not self.validate_generation(text, output_path):
+            return
+
+        job = GenerationJob(
+            engine=self.engine_var.get(),
+            text=text,
+            voice=self.voice_var.get(),
+            output_path=self.unique_output_path(output_path),
+            speed=self.speed_var.get(),
+            pitch=int(self.pitch_var.get()),
+            volume=int(self.volume_var.get()),
+            text_source=self.file_source
+        )
+        self.job_queue.submit(job)
+        self.status_var.set(f"Queued job #{job.job_id}: {os.path.basename(job.output_path)}")
+
+    def on_job_update(self, job):
+        """Called from worker threads - coalesce per job through the UI pump"""
+        self.ui_pump.post(('job', job.job_id), lambda: self.refresh_job_row(job))
+        self.ui_pump.post('queue_summary', self.refresh_queue_summary)
+
+    def refresh_queue_summary(self):
+        """Update the queue button with the number of unfinished jobs"""
+        jobs = self.job_queue.jobs()
+        active = sum(1 for job in jobs if not job.is_finished)
+        self.queue_btn.configure(text=f"📋 Job Queue ({active})")
+
+    def show_job_queue(self):
+        """Show the job queue panel with per-job status, duration and cancel"""
+        if self.job_queue_dialog and self.job_queue_dialog.winfo_exists():
+            self.job_queue_dialog.focus()
+            return
+
+        dialog = ctk.CTkToplevel(self)
+        dialog.title("Job Queue")
+        dialog.geometry("640x420")
+        dialog.transient(self)
+        self.job_queue_dialog = dialog
+        self.job_rows = {}
+
+        # Center dialog
+        dialog.update_idletasks()
+        x = self.winfo_x() + (self.winfo_width() // 2) - 320
+        y = self.winfo_y() + (self.winfo_height() // 2) - 210
+        dialog.geometry(f"+{x}+{y}")
+
+        ctk.CTkLabel(
+            dialog,
+            text="Generation Jobs",
+            font=ctk.CTkFont(size=16, weight="bold")
+        ).pack(pady=(15, 5))
+
+        self.job_list_frame = ctk.CTkScrollableFrame(dialog, height=280)
+        self.job_list_frame.pack(fill="both", expand=True, padx=15, pady=5)
+
+        for job in self.job_queue.jobs():
+            self.refresh_job_row(job)
+
+        btn_frame = ctk.CTkFrame(dialog, fg_color="transparent")
+        btn_frame.pack(pady=10)
+
+        ctk.CTkButton(
+            btn_frame,
+            text="Clear Finished",
+            width=120,
+            command=self.clear_finished_jobs
+        ).pack(side="left", padx=5)
+
+        ctk.CTkButton(
+            btn_frame,
+            text="Cancel All",
+            width=100,
+            fg_color="gray",
+            hover_color="#555555",
+            command=self.job_queue.cancel_all
+        ).pack(side="left", padx=5)
+
+        ctk.CTkButton(
+            btn_frame,
+            text="Close",
+            width=100,
+            command=dialog.destroy
+        ).pack(side="left", padx=5)
+
+        self.tick_job_durations()
+
+    def refresh_job_row(self, job):
+        """Create or update the panel row for a job (main thread only)"""
+        if not (self.job_queue_dialog and self.job_queue_dialog.winfo_exists()):
+            return
+
+        row = self.job_rows.get(job.job_id)
+        if row is None:
+            frame = ctk.CTkFrame(self.job_list_frame, fg_color="transparent")
+            frame.pack(fill="x", pady=2)
+
+            ctk.CTkLabel(
+                frame,
+                text=f"#{job.job_id} {job.engine} · {os.path.basename(job.output_path)}",
+                anchor="w",
+                width=240
+            ).pack(side="left", padx=5)
+
+            progress = ctk.CTkProgressBar(frame, width=100, height=12)
+            progress.pack(side="left", padx=5)
+
+            status = ctk.CTkLabel(frame, text="", width=120, anchor="w", font=ctk.CTkFont(size=10))
+            status.pack(side="left", padx=2)
+
+            duration = ctk.CTkLabel(frame, text="", width=50, font=ctk.CTkFont(size=10))
+            duration.pack(side="left", padx=2)
+
+            cancel = ctk.CTkButton(
+                frame,
+                text="Cancel",
+                width=60,
+                height=22,
+                font=ctk.CTkFont(size=10),
+                command=lambda jid=job.job_id: self.job_queue.cancel(jid)
+            )
+            cancel.pack(side="right", padx=5)
+
+            row = self.job_rows[job.job_id] = {
+                'frame': frame, 'progress': progress, 'status': status,
+                'duration': duration, 'cancel': cancel
+            }
+
+        row['progress'].set(job.progress)
+        row['status'].configure(text=f"{job.status}: {job.message}"[:28])
+        row['duration'].configure(text=f"{job.duration:.1f}s" if job.duration is not None else "")
+        if job.is_finished:
+            row['cancel'].configure(state="disabled")
+            color = {'done': "green", 'failed': "red"}.get(job.status, "gray")
+            row['status'].configure(text_color=color)
+
+    def tick_job_durations(self):
+        """Refresh running job durations once per second while the panel is open"""
+        if not (self.job_queue_dialog and self.job_queue_dialog.winfo_exists()):
+            return
+        for job in self.job_queue.jobs():
+            if job.status == 'running':
+                self.refresh_job_row(job)
+        self.after(1000, self.tick_job_durations)
+
+    def clear_finished_jobs(self):
+        """Drop finished jobs from the queue and the panel"""
+        for job_id in self.job_queue.clear_finished():
+            row = self.job_rows.pop(job_id, None)
+            if row:
+                row['frame'].destroy()
+        self.refresh_queue_summary()
+
     def play_audio(self):
         """Play the generated MP3 file"""
         output_path = self.output_path_var.get()
@@ -1067,6 +1845,11 @@ class EdgeTTSApp(ctk.CTk):
             'speed': self.speed_var.get(),
             'pitch': self.pitch_var.get(),
             'volume': self.volume_var.get(),
+            'mixed_language': self.mixed_language_var.get(),
+            'dialogue_mode': self.dialogue_var.get(),
+            'audiobook_mode': self.audiobook_var.get(),
+            'auto_route': self.auto_route_var.get(),
+            'output_formats': self.output_formats,
             'output_path': self.output_path_var.get()
         }
         try:
@@ -1087,18 +1870,9 @@ class EdgeTTSApp(ctk.CTk):
                 if saved_engine in self.engines:
                     self.engine_var.set(saved_engine)
                     self.current_engine = self.engines[saved_engine]
-                    self.voice_categories = self.current_engine.get_voices()
-                    self.all_voices = {}
-                    for category, voices in self.voice_categories.items():
-                        self.all_voices.update(voices)
-
-                # Rebuild display mappings for loaded engine
-                self.voice_display = {}
-                self.voice_id_to_display = {}
-                for voice_id, desc in self.all_voices.items():
-                    display_name = desc.split(' [')[0].split(' (')[0]
-                    self.voice_display[display_name] = voice_id
-                    self.voice_id_to_display[voice_id] = display_name
+                    self.apply_voice_view(
+                        self.voice_views.get(saved_engine, self.current_engine, show_all=True)
+                    )
 
                 # Load voice (must be valid for current engine)
                 saved_voice = config.get('voice', '')
@@ -1118,10 +1892,23 @@ class EdgeTTSApp(ctk.CTk):
                 self.speed_var.set(config.get('speed', 1.0))
                 self.pitch_var.set(config.get('pitch', 0))
                 self.volume_var.set(config.get('volume', 0))
+                self.mixed_language_var.set(config.get('mixed_language', False))
+                self.dialogue_var.set(config.get('dialogue_mode', False))
+                self.audiobook_var.set(config.get('audiobook_mode', False))
+                self.auto_route_var.set(config.get('auto_route', False))
+                self.output_formats.update(config.get('output_formats', {}))
                 self.output_path_var.set(config.get('output_path', str(Path.cwd() / "output.mp3")))
         except Exception as e:
             print(f"Failed to load settings: {e}")
 
+    def get_language_search_index(self):
+        """Lowercased (key, name) pairs for the current language list, built once per list"""
+        cache_key = id(self.current_language_list)
+        if self._language_index_key != cache_key:
+            self._language_index = [(lang.lower(), lang) for lang in self.current_language_list]
+            self._language_index_key = cache_key
+        return self._language_index
+
     def show_language_selector(self):
         """Show searchable language selector dialog"""
         dialog = ctk.CTkToplevel(self)
@@ -1147,55 +1934,98 @@ class EdgeTTSApp(ctk.CTk):
         search_entry.pack(padx=15, pady=(15, 10))
         search_entry.focus_set()
 
-        # Scrollable frame for language list
-        scroll_frame = ctk.CTkScrollableFrame(dialog, height=300)
-        scroll_frame.pack(fill="both", expand=True, padx=15, pady=(0, 15))
+        # Virtualized list: a fixed pool of row buttons is re-labelled on
+        # scroll/filter instead of creating a widget per language
+        list_frame = ctk.CTkFrame(dialog, fg_color="transparent")
+        list_frame.pack(fill="both", expand=True, padx=15, pady=(0, 15))
+
+        rows_frame = ctk.CTkFrame(list_frame, fg_color="transparent")
+        rows_frame.pack(side="left", fill="both", expand=True)
 
-        # Store button references for filtering
-        lang_buttons = []
+        search_index = self.get_language_search_index()
+        state = {'matches': [lang for _, lang in search_index], 'top': 0}
 
         def select_language(lang):
             self.selected_language.set(lang)
             dialog.destroy()
             self.on_language_change(lang)
 
-        def create_buttons(filter_text=""):
-            # Clear existing buttons
-            for widget in scroll_frame.winfo_children():
-                widget.destroy()
-            lang_buttons.clear()
+        def select_row(row):
+            index = state['top'] + row
+            if index < len(state['matches']):
+                select_language(state['matches'][index])
 
-            filter_lower = filter_text.lower()
-            for lang in self.current_language_list:
-                if filter_lower in lang.lower():
-                    btn = ctk.CTkButton(
-                        scroll_frame,
-                        text=lang,
-                        anchor="w",
-                        height=28,
-                        fg_color="transparent",
-                        text_color=["#000000", "#FFFFFF"],
-                        hover_color=["#ECECEC", "#3E3E3E"],
-                        command=lambda l=lang: select_language(l)
-                    )
-                    btn.pack(fill="x", pady=1)
-                    lang_buttons.append(btn)
+        rows = []
+        for row in range(LANGUAGE_SELECTOR_ROWS):
+            btn = ctk.CTkButton(
+                rows_frame,
+                text="",
+                anchor="w",
+                height=28,
+                fg_color="transparent",
+                text_color=["#000000", "#FFFFFF"],
+                hover_color=["#ECECEC", "#3E3E3E"],
+                command=lambda r=row: select_row(r)
+            )
+            btn.pack(fill="x", pady=1)
+            rows.append(btn)
+
+        def render():
+            matches = state['matches']
+            for row, btn in enumerate(rows):
+                index = state['top'] + row
+                if index < len(matches):
+                    btn.configure(text=matches[index], state="normal")
+                else:
+                    btn.configure(text="", state="disabled")
+            total = max(len(matches), 1)
+            scrollbar.set(state['top'] / total, min(1.0, (state['top'] + len(rows)) / total))
+
+        def scroll_to(top):
+            max_top = max(0, len(state['matches']) - len(rows))
+            top = max(0, min(int(top), max_top))
+            if top != state['top']:
+                state['top'] = top
+                render()
+
+        def on_scrollbar(*args):
+            if args[0] == "moveto":
+                scroll_to(float(args[1]) * len(state['matches']))
+            elif args[0] == "scroll":
+                step = len(rows) if args[2] == "pages" else 1
+                scroll_to(state['top'] + int(args[1]) * step)
+
+        scrollbar = ctk.CTkScrollbar(list_frame, command=on_scrollbar)
+        scrollbar.pack(side="right", fill="y")
+
+        def on_mousewheel(event):
+            if getattr(event, 'num', None) == 4:
+                delta = -1
+            elif getattr(event, 'num', None) == 5:
+                delta = 1
+            else:
+                delta = -1 if event.delta > 0 else 1
+            scroll_to(state['top'] + delta * 3)
 
-        # Initial population
-        create_buttons()
+        for widget in [rows_frame] + rows:
+            widget.bind("<MouseWheel>", on_mousewheel, add="+")
+            widget.bind("<Button-4>", on_mousewheel, add="+")
+            widget.bind("<Button-5>", on_mousewheel, add="+")
 
-        # Filter on search
+        # Filter the precomputed lowercase index - no widgets are created
         def on_search(*args):
-            create_buttons(search_var.get())
+            filter_lower = search_var.get().lower()
+            state['matches'] = [lang for key, lang in search_index if filter_lower in key]
+            state['top'] = 0
+            render()
 
         search_var.trace_add("write", on_search)
+        render()
 
         # Handle Enter key to select first match
         def on_enter(event):
-            if lang_buttons:
-                # Get first visible button's text
-                first_lang = lang_buttons[0].cget("text")
-                select_language(first_lang)
+            if state['matches']:
+                select_language(state['matches'][0])
 
         search_entry.bind("<Return>", on_enter)
 
@@ -1216,54 +2046,28 @@ class EdgeTTSApp(ctk.CTk):
         """Handle 'Show all voices' checkbox change"""
         self.update_voice_dropdown()
 
+    def apply_voice_view(self, view):
+        """Point the voice lookups at a cached, read-only view model"""
+        # voice_categories: category -> {voice_id: description}
+        # all_voices: voice_id -> description
+        # voice_display: display_name -> voice_id
+        self.voice_categories = view.categories
+        self.all_voices = view.voices
+        self.voice_display = view.display_to_id
+        self.voice_id_to_display = view.id_to_display
+
     def update_voice_dropdown(self):
         """Update voice dropdown based on language selection"""
         show_all = self.show_all_languages_var.get()
         selected_lang = self.selected_language.get()
         lang_code = self.language_to_code.get(selected_lang, selected_lang[:2].lower())
 
-        # Get all voices from current engine
-        all_voice_categories = self.current_engine.get_voices()
-
-        if show_all:
-            # Show all voices without filtering
-            self.voice_categories = all_voice_categories
-        else:
-            # Filter voices by selected language
-            filtered = {}
-            for category, voices in all_voice_categories.items():
-                filtered_voices = {}
-                for voice_id, voice_desc in voices.items():
-                    # Get voice language code
-                    if isinstance(self.current_engine, PiperTTSEngine):
-                        voice_lang = self.current_engine.get_voice_language(voice_id)
-                    else:
-                        # Edge TTS: extract from voice_id (e.g., en-US-JennyNeural -> en)
-                        voice_lang = voice_id.split('-')[0].lower() if '-' in voice_id else None
-
-                    if voice_lang == lang_code:
-                        filtered_voices[voice_id] = voice_desc
-
-                if filtered_voices:
-                    filtered[category] = filtered_voices
-
-            self.voice_categories = filtered if filtered else all_voice_categories
-
-        # Rebuild voice display mappings
-        self.all_voices = {}
-        for category, voices in self.voice_categories.items():
-            self.all_voices.update(voices)
-
-        self.voice_display = {}
-        self.voice_id_to_display = {}
-        for voice_id, desc in self.all_voices.items():
-            # Remove status tags and indentation for display name
-            display_name = desc.strip().split(' [')[0].split(' (')[0]
-            self.voice_display[display_name] = voice_id
-            self.voice_id_to_display[voice_id] = display_name
+        # Cached per (engine, language, show_all, installed voices)
+        view = self.voice_views.get(self.engine_var.get(), self.current_engine, lang_code, show_all)
+        self.apply_voice_view(view)
 
         # Update dropdown values
-        display_names = list(self.voice_display.keys())
+        display_names = list(view.display_names)
         if display_names:
             self.voice_menu.configure(values=display_names)
 
@@ -1583,32 +2387,37 @@ class EdgeTTSApp(ctk.CTk):
         if voice_id in buttons_dict:
             buttons_dict[voice_id].configure(text="...", state="disabled")
 
+        cancel_token = self.begin_download()
+
         def do_download():
             try:
                 def progress_callback(progress, status):
                     pass  # Silent download
 
-                self.current_engine.download_voice(voice_id, progress_callback)
+                self.current_engine.download_voice(voice_id, progress_callback, cancel_token)
 
                 # Update button on completion
                 if voice_id in buttons_dict:
-                    self.after(0, lambda: buttons_dict[voice_id].configure(
+                    self.ui_pump.call(lambda: buttons_dict[voice_id].configure(
                         text="Done",
                         fg_color="green",
                         state="disabled"
                     ))
 
                 # Refresh voice dropdown
-                self.after(100, self.update_voice_dropdown)
+                self.ui_pump.call(self.update_voice_dropdown)
 
             except Exception as e:
                 if voice_id in buttons_dict:
-                    self.after(0, lambda: buttons_dict[voice_id].configure(
+                    self.ui_pump.call(lambda: buttons_dict[voice_id].configure(
                         text="Failed",
                         fg_color="red",
                         state="disabled"
                     ))
 
+            finally:
+                self.ui_pump.call(lambda: self.end_download(cancel_token))
+
         threading.Thread(target=do_download, daemon=True).start()
 
     def download_single_voice_with_progress(self, voice_id: str, widgets_dict: dict):
@@ -1628,6 +2437,8 @@ class EdgeTTSApp(ctk.CTk):
         progress_bar.set(0)
         status_label.configure(text="Starting...")
 
+        cancel_token = self.begin_download()
+
         def do_download():
             try:
                 def progress_callback(progress, status):
@@ -1641,9 +2452,9 @@ class EdgeTTSApp(ctk.CTk):
                             status_label.configure(text="Done!", text_color="green")
                         else:
                             status_label.configure(text=status[:15])
-                    self.after(0, update_ui)
+                    self.ui_pump.post(('download', voice_id), update_ui)
 
-                self.current_engine.download_voice(voice_id, progress_callback)
+                self.current_engine.download_voice(voice_id, progress_callback, cancel_token)
 
                 # Update UI on completion
                 def on_complete():
@@ -1652,7 +2463,7 @@ class EdgeTTSApp(ctk.CTk):
                     # Refresh voice dropdown
                     self.update_voice_dropdown()
 
-                self.after(0, on_complete)
+                self.ui_pump.post(('download', voice_id), on_complete)
 
             except Exception as e:
                 def on_error():
@@ -1660,7 +2471,10 @@ class EdgeTTSApp(ctk.CTk):
                     status_label.configure(text="Failed", text_color="red")
                     btn.pack(side="right", padx=5)
                     btn.configure(text="Retry", state="normal")
-                self.after(0, on_error)
+                self.ui_pump.post(('download', voice_id), on_error)
+
+            finally:
+                self.ui_pump.call(lambda: self.end_download(cancel_token))
 
         threading.Thread(target=do_download, daemon=True).start()
 
@@ -1750,6 +2564,13 @@ You can manually download {lang_name} voices from HuggingFace:
 
     def on_closing(self):
         """Handle window close event"""
+        # Stop background work so partial files are cleaned up
+        if self.active_cancel_token:
+            self.active_cancel_token.cancel("Application closed")
+        for token in list(self.download_tokens):
+            token.cancel("Application closed")
+        self.job_queue.shutdown()
+        self.synthesis_worker.shutdown()
         self.save_settings()
         self.destroy()
 
@@ -0,0 +1,86 @@
+"""
+Fault Injection - Local stand-in for the Edge TTS service that drops connections
+
+Used to exercise EdgeTTSEngine's retry and resume path without the network:
+
+    service = FlakyEdgeService(failures=2, fail_after_chunks=1)
+    engine = EdgeTTSEngine(communicate_factory=service)
+    engine.generate(text, "en-US-AriaNeural", "out.mp3")
+    service.requests  # texts actually sent, showing where each retry resumed
+
+The "audio" is deterministic bytes derived from the text, so the output of
+a run with faults can be compared byte for byte against a clean run.
+"""
+
+import asyncio
+import threading
+from typing import List
+
+
+class InjectedConnectionError(ConnectionResetError):
+    """A connection drop raised on purpose by FlakyEdgeService"""
+    pass
+
+
+class FlakyEdgeService:
+    """
+    Callable with the edge_tts.Communicate signature that fails on demand.
+
+    Args:
+        failures: Number of requests that fail before the service recovers
+        healthy_requests: Requests served cleanly before the failures start
+        fail_after_chunks: Audio chunks delivered before a failing request drops
+        chunk_chars: Characters of text per audio chunk
+        latency: Seconds to wait before each chunk
+    """
+
+    def __init__(
+        self,
+        failures: int = 1,
+        healthy_requests: int = 0,
+        fail_after_chunks: int = 1,
+        chunk_chars: int = 40,
+        latency: float = 0.0
+    ):
+        self.failures_left = failures
+        self.healthy_left = healthy_requests
+        self.fail_after_chunks = fail_after_chunks
+        self.chunk_chars = chunk_chars
+        self.latency = latency
+        self.requests: List[str] = []
+        self._lock = threading.Lock()
+
+    def __call__(self, text: str, voice: str, **kwargs) -> "_FlakyCommunicate":
+        with self._lock:
+            self.requests.append(text)
+            if self.healthy_left > 0:
+                self.healthy_left -= 1
+                fail = False
+            else:
+                fail = self.failures_left > 0
+                if fail:
+                    self.failures_left -= 1
+        return _FlakyCommunicate(self, text, fail)
+
+    @staticmethod
+    def audio_for(text: str) -> bytes:
+        """The bytes a clean request for text produces"""
+        return text.encode('utf-8')
+
+
+class _FlakyCommunicate:
+    def __init__(self, service: FlakyEdgeService, text: str, fail: bool):
+        self.service = service
+        self.text = text
+        self.fail = fail
+
+    async def stream(self):
+        step = self.service.chunk_chars
+        for number, start in enumerate(range(0, len(self.text), step)):
+            if self.fail and number >= self.service.fail_after_chunks:
+                raise InjectedConnectionError("Injected connection drop")
+            if self.service.latency:
+                await asyncio.sleep(self.service.latency)
+            yield {"type": "audio", "data": FlakyEdgeService.audio_for(self.text[start:start + step])}
+        if self.fail:
+            raise InjectedConnectionError("Injected connection drop")
@@ -0,0 +1,127 @@
+"""Tests for gapless WAV/MP3 merging and resampling"""
+
+import struct
+import wave
+
+import pytest
+
+from tts_engines import audio_merge
+from tts_engines.audio_merge import audio_duration, merge_audio, merge_wav, write_mp3_silence
+from tts_engines.wav_writer import WavWriter
+
+
+def ramp(frames: int, channels: int = 1, start: int = 0) -> bytes:
+    samples = [((start + i) * 7) % 20000 - 10000 for i in range(frames) for _ in range(channels)]
+    return struct.pack(f'<{len(samples)}h', *samples)
+
+
+def write_wav(path, pcm: bytes, sample_rate: int, channels: int = 1):
+    with WavWriter(str(path), sample_rate, channels) as writer:
+        writer.write(pcm)
+    return str(path)
+
+
+def read_pcm(path):
+    with wave.open(str(path), 'rb') as wav:
+        return wav.getframerate(), wav.getnframes(), wav.readframes(wav.getnframes())
+
+
+def test_merge_wavs_with_matching_rates_is_exact(tmp_path):
+    parts = [ramp(1000), ramp(2345, start=5), ramp(1)]
+    paths = [write_wav(tmp_path / f"{i}.wav", pcm, 22050) for i, pcm in enumerate(parts)]
+    merge_audio(paths, str(tmp_path / "out.wav"))
+
+    rate, frames, pcm = read_pcm(tmp_path / "out.wav")
+    assert (rate, frames) == (22050, 3346)
+    assert pcm == b''.join(parts)
+
+
+@pytest.mark.parametrize("numpy", [True, False])
+def test_merge_resamples_the_odd_part_out(tmp_path, monkeypatch, numpy):
+    if numpy:
+        pytest.importorskip("numpy")
+    monkeypatch.setattr(audio_merge, 'NUMPY_AVAILABLE', numpy)
+    a = write_wav(tmp_path / "a.wav", ramp(22050, channels=2), 22050, channels=2)
+    b = write_wav(tmp_path / "b.wav", ramp(16000, channels=2), 16000, channels=2)
+    c = write_wav(tmp_path / "c.wav", ramp(11025, channels=2), 22050, channels=2)
+    merge_audio([a, b, c], str(tmp_path / "out.wav"))
+
+    rate, frames, pcm = read_pcm(tmp_path / "out.wav")
+    # The majority rate wins; one second at 16 kHz becomes one second at 22.05 kHz
+    assert rate == 22050
+    assert frames == 22050 + 22050 + 11025
+    # Parts already at the output rate are copied untouched
+    assert pcm[:22050 * 4] == ramp(22050, channels=2)
+    assert pcm[-11025 * 4:] == ramp(11025, channels=2)
+
+
+def test_resampled_audio_follows_the_source(tmp_path):
+    # A slow ramp survives linear interpolation almost exactly
+    slow = struct.pack('<8000h', *range(-4000, 4000))
+    src = write_wav(tmp_path / "slow.wav", slow, 8000)
+    merge_wav([src], str(tmp_path / "out.wav"), sample_rate=16000)
+
+    rate, frames, pcm = read_pcm(tmp_path / "out.wav")
+    assert (rate, frames) == (16000, 16000)
+    samples = struct.unpack(f'<{frames}h', pcm)
+    assert samples[0] == -4000 and samples[2] == -3999
+    assert all(0 <= b - a <= 1 for a, b in zip(samples, samples[1:]))
+
+
+def test_merge_rejects_mismatched_channels(tmp_path):
+    mono = write_wav(tmp_path / "mono.wav", ramp(100), 22050)
+    stereo = write_wav(tmp_path / "stereo.wav", ramp(100, channels=2), 22050, channels=2)
+    with pytest.raises(ValueError):
+        merge_audio([mono, stereo], str(tmp_path / "out.wav"))
+
+
+# ----- MP3 -----
+
+# MPEG-1 Layer III, 128 kbit/s, 44.1 kHz, mono: 417-byte frames of 1152 samples
+MP3_HEADER = bytes([0xFF, 0xFB, 0x90, 0xC0])
+MP3_FRAME_LENGTH = 417
+
+
+def mp3_frame(tag: int) -> bytes:
+    return MP3_HEADER + bytes([tag]) * (MP3_FRAME_LENGTH - 4)
+
+
+def write_mp3(path, frames: int, tag: int) -> str:
+    """Frames wrapped the way encoders ship them: ID3v2, a Xing frame, audio, ID3v1"""
+    xing = bytearray(MP3_HEADER + bytes(MP3_FRAME_LENGTH - 4))
+    xing[21:25] = b'Xing'
+    id3v2 = b'ID3\x03\x00\x00' + bytes([0, 0, 0, 20]) + bytes(20)
+    id3v1 = b'TAG' + bytes(125)
+    with open(path, 'wb') as f:
+        f.write(id3v2 + bytes(xing) + mp3_frame(tag) * frames + id3v1)
+    return str(path)
+
+
+def test_merge_mp3_keeps_only_audio_frames(tmp_path):
+    a = write_mp3(tmp_path / "a.mp3", 10, 1)
+    b = write_mp3(tmp_path / "b.mp3", 25, 2)
+    merge_audio([a, b], str(tmp_path / "out.mp3"))
+
+    data = (tmp_path / "out.mp3").read_bytes()
+    assert data == mp3_frame(1) * 10 + mp3_frame(2) * 25
+    assert audio_duration(str(tmp_path / "out.mp3")) == pytest.approx(35 * 1152 / 44100)
+
+
+def test_mp3_silence_joins_gaplessly(tmp_path):
+    a = write_mp3(tmp_path / "a.mp3", 4, 1)
+    silence = str(tmp_path / "silence.mp3")
+    write_mp3_silence(a, 1.0, silence)
+    merge_audio([a, silence, a], str(tmp_path / "out.mp3"))
+
+    silent_frames = round(44100 / 1152)
+    assert audio_duration(silence) == pytest.approx(silent_frames * 1152 / 44100)
+    assert audio_duration(str(tmp_path / "out.mp3")) == pytest.approx((8 + silent_frames) * 1152 / 44100)
+
+
+def test_merge_mp3_rejects_mixed_rates(tmp_path):
+    a = write_mp3(tmp_path / "a.mp3", 3, 1)
+    b = tmp_path / "b.mp3"
+    # The same frames relabelled as 48 kHz (sample rate index 1)
+    b.write_bytes((tmp_path / "a.mp3").read_bytes().replace(MP3_HEADER, bytes([0xFF, 0xFB, 0x94, 0xC0])))
+    with pytest.raises(ValueError):
+        merge_audio([a, str(b)], str(tmp_path / "out.mp3"))
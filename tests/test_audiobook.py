@@ -0,0 +1,21 @@
+"""Tests for chapter detection"""
+
+from tts_engines.audiobook import find_chapters
+
+BODY = "It was a long day, and the road ahead was longer still. " * 8
+
+
+def test_sentences_starting_with_heading_words_do_not_split(tmp_path):
+    book = tmp_path / "book.txt"
+    book.write_text(
+        "Chapter 1\n\n" + BODY + "\n"
+        "Part of me wanted to stay.\n" + BODY + "\n"
+        "Introduction of the guests took an hour.\n" + BODY + "\n"
+        "Book two of the series was better.\n" + BODY + "\n"
+        "CHAPTER IV: The Storm\n\n" + BODY + "\n"
+        "Part Two\n\n" + BODY + "\n"
+        "Epilogue\n\n" + BODY + "\n",
+        encoding='utf-8'
+    )
+    titles = [chapter.title for chapter in find_chapters(str(book))]
+    assert titles == ["Chapter 1", "CHAPTER IV: The Storm", "Part Two", "Epilogue"]
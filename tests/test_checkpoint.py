@@ -0,0 +1,142 @@
+"""Tests for the segment journal and resuming interrupted generations"""
+
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from tts_engines.checkpoint import CheckpointJournal, has_journal
+from tts_engines.lexicon import LexiconStore
+from tts_engines.wav_writer import WavWriter
+
+SEGMENTS = [f"Segment number {word} of the chapter." for word in
+            ("one", "two", "three", "four", "five", "six")]
+JOB_KEY = dict(engine="test", voice="v", speed=1.0, pitch=0, volume=0)
+
+
+def audio_for(text: str) -> bytes:
+    """Deterministic 16-bit 'audio' per segment"""
+    data = text.encode('utf-8') * 50
+    return data + b'\x00' * (len(data) & 1)
+
+
+class Interrupted(Exception):
+    pass
+
+
+def render(path, segments, stop_at=None, rendered=None):
+    """What the engines do: skip journaled segments, append and record the rest"""
+    journal = CheckpointJournal(str(path), **JOB_KEY)
+    pending = [(i, s) for i, s in enumerate(segments)]
+    while pending and journal.is_done(*pending[0]):
+        pending.pop(0)
+    resume = journal.resume_offset or None
+    writer = WavWriter(str(path), 16000, resume_offset=resume) if resume else WavWriter(str(path), 16000)
+    try:
+        with writer:
+            for index, segment in pending:
+                if index == stop_at:
+                    raise Interrupted()
+                writer.write(audio_for(segment))
+                if rendered is not None:
+                    rendered.append(index)
+                writer.flush()
+                journal.record(index, segment, writer.end_offset)
+    except Interrupted:
+        journal.close()
+        return False
+    journal.finish()
+    return True
+
+
+def test_interrupted_job_resumes_where_it_stopped(tmp_path):
+    clean = tmp_path / "clean.wav"
+    render(clean, SEGMENTS)
+
+    path = tmp_path / "out.wav"
+    assert not render(path, SEGMENTS, stop_at=4)
+    assert has_journal(str(path))
+    assert CheckpointJournal(str(path), **JOB_KEY).completed == 4
+
+    rendered = []
+    assert render(path, SEGMENTS, rendered=rendered)
+    assert rendered == [4, 5]
+    assert path.read_bytes() == clean.read_bytes()
+    assert not has_journal(str(path))
+
+
+def test_edited_text_resumes_from_the_first_change(tmp_path):
+    path = tmp_path / "out.wav"
+    render(path, SEGMENTS, stop_at=5)
+
+    edited = SEGMENTS[:2] + ["A rewritten third segment."] + SEGMENTS[3:]
+    rendered = []
+    render(path, edited, rendered=rendered)
+    assert rendered == [2, 3, 4, 5]
+
+    clean = tmp_path / "clean.wav"
+    render(clean, edited)
+    assert path.read_bytes() == clean.read_bytes()
+
+
+def test_different_settings_start_over(tmp_path):
+    path = tmp_path / "out.wav"
+    render(path, SEGMENTS, stop_at=3)
+    assert CheckpointJournal(str(path), **dict(JOB_KEY, voice="other")).completed == 0
+
+
+def test_audio_lost_after_last_record_is_not_trusted(tmp_path):
+    path = tmp_path / "out.wav"
+    render(path, SEGMENTS, stop_at=4)
+    # Power loss: the journal reached the disk but the last segment's audio did not
+    with open(path, 'r+b') as f:
+        f.truncate(os.path.getsize(path) - 10)
+    assert CheckpointJournal(str(path), **JOB_KEY).completed == 3
+
+
+class FakePiperVoice:
+    """Loaded-voice stand-in: one chunk of deterministic audio per segment"""
+
+    config = SimpleNamespace(sample_rate=16000)
+
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.synthesized = []
+
+    def synthesize(self, text):
+        if text == self.fail_on:
+            raise RuntimeError("Model crashed")
+        self.synthesized.append(text)
+        yield SimpleNamespace(audio_int16_bytes=audio_for(text))
+
+
+def test_piper_engine_resumes_interrupted_wav(tmp_path, monkeypatch):
+    pytest.importorskip("piper")
+    from tts_engines.piper_engine import PiperTTSEngine
+
+    voice_id = "en_US-test-medium"
+    monkeypatch.setattr(PiperTTSEngine, 'MODELS_DIR', tmp_path / "models")
+    (tmp_path / "models").mkdir()
+    for suffix in (".onnx", ".onnx.json"):
+        (tmp_path / "models" / f"{voice_id}{suffix}").write_bytes(b"")
+
+    def engine_with(voice):
+        engine = PiperTTSEngine()
+        engine.normalize_text = False
+        engine.lexicons = LexiconStore(tmp_path / "lexicon")
+        engine._loaded_voice, engine._loaded_voice_id = voice, voice_id
+        return engine
+
+    clean = tmp_path / "clean.wav"
+    engine_with(FakePiperVoice()).generate_stream(SEGMENTS, voice_id, str(clean))
+
+    path = tmp_path / "out.wav"
+    with pytest.raises(RuntimeError):
+        engine_with(FakePiperVoice(fail_on=SEGMENTS[3])).generate_stream(SEGMENTS, voice_id, str(path))
+    assert has_journal(str(path))
+
+    voice = FakePiperVoice()
+    engine_with(voice).generate_stream(SEGMENTS, voice_id, str(path))
+    assert voice.synthesized == SEGMENTS[3:]
+    assert path.read_bytes() == clean.read_bytes()
+    assert not has_journal(str(path))
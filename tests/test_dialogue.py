@@ -0,0 +1,11 @@
+"""Tests for dialogue script parsing"""
+
+from tts_engines.dialogue import parse_script
+
+
+def test_times_are_not_speakers():
+    script = parse_script("ALICE: We met at the station.\nAt 10:30 we left.\nBob : Late again?\n")
+    assert [(line.speaker, line.text) for line in script.lines] == [
+        ("ALICE", "We met at the station. At 10:30 we left."),
+        ("BOB", "Late again?"),
+    ]
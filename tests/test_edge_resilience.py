@@ -0,0 +1,83 @@
+"""Tests for EdgeTTSEngine's retry, backoff and resume path against a flaky stand-in service"""
+
+import os
+
+import pytest
+
+from fault_injection import FlakyEdgeService, InjectedConnectionError
+from tts_engines.checkpoint import has_journal
+from tts_engines.edge_engine import EdgeTTSEngine
+from tts_engines.lexicon import LexiconStore
+from tts_engines.retry import RetryPolicy
+
+VOICE = "en-US-AriaNeural"
+SEGMENTS = [
+    "The first segment of the story. ",
+    "The second segment goes on a little longer than the first. ",
+    "The third segment closes the story. ",
+]
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Backoff delays the engine waits out (without actually sleeping)"""
+    delays = []
+    monkeypatch.setattr(RetryPolicy, 'sleep', lambda self, delay, cancel_token=None: delays.append(delay))
+    return delays
+
+
+def make_engine(service, tmp_path, max_attempts=5):
+    engine = EdgeTTSEngine(
+        retry_policy=RetryPolicy(max_attempts=max_attempts, base_delay=0.5, jitter=False),
+        communicate_factory=service
+    )
+    # Send the text exactly as given
+    engine.normalize_text = False
+    engine.lexicons = LexiconStore(tmp_path / "lexicon")
+    return engine
+
+
+def render(engine, path):
+    engine.generate_stream(SEGMENTS, VOICE, str(path))
+    return path.read_bytes()
+
+
+def test_retries_with_backoff_then_matches_clean_output(tmp_path, sleeps):
+    clean = render(make_engine(FlakyEdgeService(failures=0), tmp_path), tmp_path / "clean.mp3")
+
+    service = FlakyEdgeService(failures=2, fail_after_chunks=1, chunk_chars=10)
+    output = tmp_path / "flaky.mp3"
+    assert render(make_engine(service, tmp_path), output) == clean
+
+    # The first segment was sent three times, the others once
+    assert service.requests == [SEGMENTS[0]] * 3 + SEGMENTS[1:]
+    assert sleeps == [0.5, 1.0]
+    assert not has_journal(str(output))
+
+
+def test_resume_after_outage_is_byte_identical(tmp_path, sleeps):
+    clean = render(make_engine(FlakyEdgeService(failures=0), tmp_path), tmp_path / "clean.mp3")
+
+    # The connection dies after the first segment and stays down past every retry
+    output = tmp_path / "resumed.mp3"
+    outage = FlakyEdgeService(failures=10, healthy_requests=1)
+    with pytest.raises(InjectedConnectionError):
+        render(make_engine(outage, tmp_path, max_attempts=3), output)
+    assert outage.requests == [SEGMENTS[0]] + [SEGMENTS[1]] * 3
+    assert sleeps == [0.5, 1.0]
+    assert has_journal(str(output))
+
+    # Running the job again sends only what is missing
+    recovered = FlakyEdgeService(failures=0)
+    assert render(make_engine(recovered, tmp_path), output) == clean
+    assert recovered.requests == SEGMENTS[1:]
+    assert not has_journal(str(output))
+
+
+def test_failure_before_any_segment_removes_output(tmp_path, sleeps):
+    output = tmp_path / "failed.mp3"
+    with pytest.raises(InjectedConnectionError):
+        render(make_engine(FlakyEdgeService(failures=10), tmp_path, max_attempts=2), output)
+    assert sleeps == [0.5]
+    assert not os.path.exists(output)
+    assert not has_journal(str(output))
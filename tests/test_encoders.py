@@ -0,0 +1,95 @@
+"""Tests for the built-in FLAC encoder and encoder selection"""
+
+import hashlib
+import math
+import random
+import struct
+
+import pytest
+
+from tts_engines import encoders
+from tts_engines.encoders import FLAC_BLOCK_SIZE, FlacWriter, available_formats, open_audio_sink
+from tts_engines.wav_writer import WavWriter
+
+
+def speech_like(frames: int, channels: int) -> bytes:
+    rng = random.Random(frames * channels)
+    samples = []
+    for i in range(frames):
+        for channel in range(channels):
+            value = 12000 * math.sin(i * (0.03 + 0.01 * channel)) + rng.randint(-800, 800)
+            samples.append(max(-32768, min(32767, int(value))))
+    # Full-scale extremes exercise the largest residuals
+    samples[:4] = [32767, -32768, 32767, -32768][:len(samples[:4])]
+    return struct.pack(f'<{len(samples)}h', *samples)
+
+
+def write_flac(path, pcm: bytes, sample_rate: int, channels: int):
+    with FlacWriter(str(path), sample_rate, channels) as flac:
+        for start in range(0, len(pcm), 5000):  # Chunks straddle frame boundaries
+            flac.write(pcm[start:start + 5000])
+
+
+@pytest.mark.parametrize("channels", [1, 2])
+def test_flac_round_trip(tmp_path, channels):
+    soundfile = pytest.importorskip("soundfile")
+    frames = FLAC_BLOCK_SIZE * 3 + 1234  # Ends with a short frame
+    pcm = speech_like(frames, channels)
+    path = tmp_path / "out.flac"
+    write_flac(path, pcm, 22050, channels)
+
+    decoded, sample_rate = soundfile.read(str(path), dtype='int16', always_2d=True)
+    assert sample_rate == 22050
+    assert decoded.shape == (frames, channels)
+    assert decoded.tobytes() == pcm
+
+
+def test_flac_streaminfo(tmp_path):
+    frames = FLAC_BLOCK_SIZE + 100
+    pcm = speech_like(frames, 1)
+    path = tmp_path / "out.flac"
+    write_flac(path, pcm, 16000, 1)
+
+    data = path.read_bytes()
+    assert data[:4] == b'fLaC'
+    assert data[4] == 0x80 and int.from_bytes(data[5:8], 'big') == 34  # Last block, STREAMINFO
+    info = data[8:42]
+    packed = int.from_bytes(info[10:18], 'big')
+    assert packed >> 44 == 16000
+    assert packed & ((1 << 36) - 1) == frames
+    assert info[18:34] == hashlib.md5(pcm).digest()
+
+
+def fake_which(installed):
+    return lambda name: f"/usr/bin/{name}" if name in installed else None
+
+
+class RecordingPipe:
+    def __init__(self, command, output_path):
+        self.command = command
+
+
+@pytest.mark.parametrize("installed, expected", [
+    ({'flac', 'ffmpeg', 'opusenc'}, {'.flac': 'flac', '.opus': 'opusenc', '.mp3': 'ffmpeg'}),
+    ({'ffmpeg'}, {'.flac': 'ffmpeg', '.opus': 'ffmpeg', '.mp3': 'ffmpeg'}),
+    ({'opusenc'}, {'.flac': FlacWriter, '.opus': 'opusenc', '.mp3': None}),
+    (set(), {'.flac': FlacWriter, '.opus': None, '.mp3': None}),
+])
+def test_encoder_fallbacks(tmp_path, monkeypatch, installed, expected):
+    monkeypatch.setattr(encoders.shutil, 'which', fake_which(installed))
+    monkeypatch.setattr(encoders, 'PipeEncoder', RecordingPipe)
+
+    assert isinstance(open_audio_sink(str(tmp_path / "out.wav"), 22050), WavWriter)
+    for ext, choice in expected.items():
+        path = str(tmp_path / f"out{ext}")
+        if choice is None:
+            with pytest.raises(ValueError):
+                open_audio_sink(path, 22050)
+        elif choice is FlacWriter:
+            sink = open_audio_sink(path, 22050)
+            assert isinstance(sink, FlacWriter)
+            sink.abort()
+        else:
+            assert open_audio_sink(path, 22050).command[0] == choice
+
+    assert available_formats() == ['.wav', '.flac'] + [ext for ext in ('.opus', '.mp3') if expected[ext]]
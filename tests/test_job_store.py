@@ -0,0 +1,84 @@
+"""Tests for the SQLite job store: atomic claims, leases and restart recovery"""
+
+import threading
+import time
+
+from tts_engines.job_queue import DONE, FAILED, QUEUED, RUNNING
+from tts_engines.job_store import JobStore
+
+
+def test_racing_connections_never_claim_the_same_job(tmp_path):
+    path = tmp_path / "jobs.db"
+    JobStore(path).submit_many({'engine': 'piper', 'text': f"job {i}"} for i in range(200))
+
+    # One store (and so one connection) per worker, all claiming at once
+    workers = 8
+    start = threading.Barrier(workers)
+    claimed = [[] for _ in range(workers)]
+
+    def work(index):
+        store = JobStore(path)
+        start.wait()
+        while True:
+            jobs = store.claim(f"worker-{index}", limit=3)
+            if not jobs:
+                break
+            claimed[index].extend(job.job_id for job in jobs)
+        store.close()
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    ids = [job_id for ids in claimed for job_id in ids]
+    assert len(ids) == len(set(ids)) == 200
+    assert JobStore(path).counts()[RUNNING] == 200
+
+
+def test_expired_lease_is_reclaimed(tmp_path):
+    store = JobStore(tmp_path / "jobs.db", lease_seconds=0.05)
+    job_id = store.submit('edge', {'text': "hello"})
+
+    (first,) = store.claim("worker-1")
+    assert (first.job_id, first.attempts) == (job_id, 1)
+    assert store.claim("worker-2") == []  # Still leased
+
+    time.sleep(0.1)  # worker-1 stops heartbeating
+    (second,) = store.claim("worker-2")
+    assert (second.job_id, second.attempts, second.worker_id) == (job_id, 2, "worker-2")
+
+    # The old holder has lost the job
+    assert not store.heartbeat(job_id, "worker-1")
+    assert not store.complete(job_id, "worker-1", {'late': True})
+    assert store.complete(job_id, "worker-2", {'ok': True})
+    job = store.get(job_id)
+    assert (job.status, job.result) == (DONE, {'ok': True})
+
+
+def test_expired_lease_out_of_attempts_fails(tmp_path):
+    store = JobStore(tmp_path / "jobs.db", lease_seconds=0.05, max_attempts=1)
+    job_id = store.submit('edge', {'text': "hello"})
+    store.claim("worker-1")
+    time.sleep(0.1)
+
+    assert store.requeue_expired() == 0
+    job = store.get(job_id)
+    assert (job.status, job.error) == (FAILED, 'Lease expired')
+
+
+def test_restart_recovers_jobs_of_a_dead_worker(tmp_path):
+    path = tmp_path / "jobs.db"
+    store = JobStore(path, lease_seconds=0.05)
+    running = store.submit('piper', {'text': "in flight"})
+    waiting = store.submit('piper', {'text': "never started"})
+    store.claim("worker-1")
+    store.close()  # The process dies without completing anything
+
+    time.sleep(0.1)
+    restarted = JobStore(path, lease_seconds=0.05)
+    assert restarted.requeue_expired() == 1
+    assert restarted.get(running).status == QUEUED
+    assert restarted.get(waiting).payload == {'text': "never started"}
+    assert [job.job_id for job in restarted.claim("worker-2", limit=2)] == [running, waiting]
@@ -0,0 +1,94 @@
+"""Tests for pronunciation lexicons: Aho-Corasick matching and hot reload"""
+
+import os
+import random
+
+import pytest
+
+from tts_engines.lexicon import AhoCorasick, Lexicon, LexiconStore, parse_lexicon
+
+
+def lexicon(text: str) -> Lexicon:
+    return Lexicon(*parse_lexicon(text))
+
+
+def test_automaton_finds_every_occurrence():
+    rng = random.Random(7)
+    for _ in range(300):
+        keys = list({''.join(rng.choice('ab') for _ in range(rng.randint(1, 4))) for _ in range(6)})
+        text = ''.join(rng.choice('ab') for _ in range(30))
+        expected = sorted(
+            (i, i + len(key), index)
+            for index, key in enumerate(keys)
+            for i in range(len(text)) if text.startswith(key, i)
+        )
+        assert sorted(AhoCorasick(keys).iter_matches(text)) == expected
+
+
+def test_overlapping_and_suffix_terms_take_the_longest():
+    lex = lexicon("new york = N Y\nyork = Y\nnew york city = N Y C\n")
+    assert lex.apply("From new york city to new york and York.") == "From N Y C to N Y and Y."
+
+
+def test_whole_words_only():
+    lex = lexicon("aws = A W S\nC++ = C plus plus\nk8s = kubernetes\n")
+    assert lex.apply("awsome laws (aws), C++ and k8s.") == "awsome laws (A W S), C plus plus and kubernetes."
+    assert lex.apply("C+++ k8sx") == "C plus plus+ k8sx"
+
+
+def test_case_rules():
+    lex = lexicon("nginx = engine x\nSQL = sequel\nsql = S Q L\n")
+    # Lowercase terms match any case; others only as written (and win when they do)
+    assert lex.apply("NGINX, Nginx, nginx") == "engine x, engine x, engine x"
+    assert lex.apply("SQL and sql and Sql") == "sequel and S Q L and S Q L"
+
+    only_exact = lexicon("AWS = A W S\n")
+    assert only_exact.apply("AWS aws Aws") == "A W S aws Aws"
+
+
+def test_parse_lexicon_formats():
+    entries, skipped = parse_lexicon("# comment\n\nAWS = A W S\nk8s\tkubernetes\nno separator\nAWS = amazon\n")
+    assert skipped == 1
+    assert {entry.term: entry.replacement for entry in entries} == {'AWS': 'amazon', 'k8s': 'kubernetes'}
+
+
+def touch_later(path, text):
+    """Rewrite a lexicon so its mtime visibly changes"""
+    stat = os.stat(path) if os.path.exists(path) else None
+    path.write_text(text, encoding='utf-8')
+    if stat is not None:
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_store_reloads_when_the_file_changes(tmp_path):
+    store = LexiconStore(tmp_path, check_interval=0)
+    assert store.get('en') is None
+    assert store.apply("AWS", 'en') == "AWS"
+
+    path = tmp_path / "en.txt"
+    touch_later(path, "AWS = A W S\n")
+    first = store.get('en')
+    assert store.apply("AWS now", 'en') == "A W S now"
+    assert store.get('en') is first  # Unchanged file: no recompile
+
+    touch_later(path, "AWS = amazon web services\n")
+    assert store.apply("AWS now", 'en') == "amazon web services now"
+    assert store.apply("AWS now", 'de') == "AWS now"
+
+    path.unlink()
+    assert store.get('en') is None
+
+
+def test_store_rechecks_at_most_once_per_interval(tmp_path):
+    path = tmp_path / "en.txt"
+    touch_later(path, "AWS = A W S\n")
+    store = LexiconStore(tmp_path, check_interval=3600)
+    assert store.apply("AWS", 'en') == "A W S"
+
+    touch_later(path, "AWS = amazon\n")
+    assert store.apply("AWS", 'en') == "A W S"  # Not re-stat'ed yet
+
+
+@pytest.mark.parametrize("text", ["", "nothing to replace here"])
+def test_no_matches_returns_text_unchanged(text):
+    assert lexicon("aws = A W S\n").apply(text) == text
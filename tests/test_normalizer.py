@@ -0,0 +1,15 @@
+"""Tests for the text normalization front-end"""
+
+import pytest
+
+from tts_engines.normalizer import normalizer_for
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("In 1999, we moved.", "In nineteen ninety-nine, we moved."),
+    ("He scored 42, then left.", "He scored forty-two, then left."),
+    ("I have 3, 4 or 5", "I have three, four or five"),
+    ("1,234 people", "one thousand two hundred thirty-four people"),
+])
+def test_numbers_before_commas(text, expected):
+    assert normalizer_for('en').normalize(text) == expected
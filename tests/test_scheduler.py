@@ -0,0 +1,92 @@
+"""Tests for voice-affinity lane planning and model-load accounting"""
+
+import threading
+
+from tts_engines.scheduler import RenderItem, ScheduleReport, VoiceAffinityScheduler, naive_model_loads
+
+
+class CountingEngine:
+    """Offline engine stand-in that counts model loads (voice switches)"""
+
+    is_online = False
+    instances = []
+    lock = threading.Lock()
+
+    def __init__(self):
+        self.voice = None
+        self.loads = 0
+        self.rendered = []
+        with self.lock:
+            self.instances.append(self)
+
+    def generate(self, text, voice, output_path, **kwargs):
+        if voice != self.voice:
+            self.loads += 1
+            self.voice = voice
+        self.rendered.append(output_path)
+        return True
+
+
+def make_scheduler(workers):
+    CountingEngine.instances = []
+    scheduler = VoiceAffinityScheduler(CountingEngine, workers=workers, load_cost_chars=600)
+    CountingEngine.instances = []  # Drop the probe
+    return scheduler
+
+
+def items_for(voices, chars=200):
+    return [RenderItem("x" * chars, voice, f"{i}") for i, voice in enumerate(voices)]
+
+
+def test_interleaved_voices_stay_on_their_lanes():
+    scheduler = make_scheduler(workers=2)
+    items = items_for("abababababab")
+    schedule = scheduler.plan(items)
+
+    assert sorted(i for lane in schedule for i in lane) == list(range(len(items)))
+    assert sorted({items[i].voice for i in lane} for lane in schedule) == [{'a'}, {'b'}]
+    for lane in schedule:
+        assert lane == sorted(lane)  # Original order within a voice
+
+
+def test_report_matches_actual_model_loads():
+    scheduler = make_scheduler(workers=2)
+    items = items_for("aabbaabbccaacc")
+    report = scheduler.render(items)
+
+    actual = sum(engine.loads for engine in CountingEngine.instances)
+    assert report.model_loads == actual == 3
+    assert report.naive_loads == naive_model_loads([item.voice for item in items], [None, None])
+    assert report.loads_saved == report.naive_loads - report.model_loads > 0
+    rendered = sorted(path for engine in CountingEngine.instances for path in engine.rendered)
+    assert rendered == sorted(item.output_path for item in items)
+
+
+def test_lanes_keep_their_voice_between_batches():
+    scheduler = make_scheduler(workers=2)
+    scheduler.render(items_for("aabb"))
+    report = scheduler.render(items_for("bbaa"))
+    assert report.model_loads == 0
+
+
+def test_large_single_voice_batch_spreads_over_lanes():
+    scheduler = make_scheduler(workers=4)
+    items = items_for("a" * 8, chars=5000)
+    schedule = scheduler.plan(items)
+    report = scheduler.render(items)
+
+    assert sum(1 for lane in schedule if lane) == 4
+    # The baseline runs on the same four lanes, so nothing is claimed as saved
+    assert (report.model_loads, report.naive_loads, report.loads_saved) == (4, 4, 0)
+
+
+def test_naive_baseline_uses_contiguous_chunks_per_lane():
+    assert naive_model_loads(list("aaaa")) == 1
+    assert naive_model_loads(list("abab"), [None, None]) == 4
+    assert naive_model_loads(list("aabb"), [None, None]) == 2
+    assert naive_model_loads(list("aabb"), ['a', 'b']) == 0
+
+
+def test_regressions_are_reported():
+    report = ScheduleReport(items=4, voices=2, model_loads=3, naive_loads=2)
+    assert report.loads_saved == -1
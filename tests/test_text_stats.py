@@ -0,0 +1,133 @@
+"""Tests for the GUI's incremental character/word counts, on a stand-in text widget"""
+
+import re
+
+import pytest
+
+pytest.importorskip("customtkinter")
+from edge_tts_gui import IncrementalTextStats
+
+
+class FakeText:
+    """
+    Just enough of a Tk text widget for IncrementalTextStats: the Tcl
+    command (renamed and proxied), index arithmetic with Tk's implicit
+    trailing newline, get, insert, delete and after().
+    """
+
+    _MODIFIER = re.compile(r"\s*([+-])\s*(\d+)\s*c(?:hars)?")
+
+    def __init__(self, content: str = ""):
+        self.content = content
+        self.insert_mark = len(content)
+        self._w = ".text"
+        self.tk = self
+        self._commands = {}
+        self._real = self._w
+
+    # ----- Tcl command plumbing -----
+
+    def call(self, name, *args):
+        if name == "rename":
+            self._real = args[1]
+            return ""
+        if name == self._w and name in self._commands:
+            return self._commands[name](*args)
+        assert name == self._real
+        return getattr(self, "_op_" + args[0])(*args[1:])
+
+    def createcommand(self, name, func):
+        self._commands[name] = func
+
+    def after(self, ms, func):
+        return "after#1"
+
+    def after_cancel(self, job):
+        pass
+
+    def command(self, *args):
+        """What a keystroke or script sends to the widget"""
+        return self.call(self._w, *args)
+
+    # ----- indices -----
+
+    def _offset(self, index: str) -> int:
+        base, rest = re.match(r"(end|insert|\d+\.(?:\d+|end))(.*)$", index).groups()
+        if base == "end":
+            offset = len(self.content) + 1
+        elif base == "insert":
+            offset = self.insert_mark
+        else:
+            line, column = base.split(".")
+            lines = (self.content + "\n").split("\n")
+            if int(line) > len(lines) - 1:
+                offset = len(self.content) + 1
+            else:
+                start = sum(len(text) + 1 for text in lines[:int(line) - 1])
+                length = len(lines[int(line) - 1])
+                offset = start + (length if column == "end" else min(int(column), length))
+        for sign, count in self._MODIFIER.findall(rest):
+            offset += int(count) if sign == "+" else -int(count)
+        return max(0, min(offset, len(self.content) + 1))
+
+    def _index_string(self, offset: int) -> str:
+        text = (self.content + "\n")[:offset]
+        return f"{text.count(chr(10)) + 1}.{offset - (text.rfind(chr(10)) + 1)}"
+
+    # ----- widget operations -----
+
+    def _op_index(self, index):
+        return self._index_string(self._offset(index))
+
+    def _op_get(self, start, end=None):
+        text = self.content + "\n"
+        begin = self._offset(start)
+        return text[begin:self._offset(end) if end else begin + 1]
+
+    def _op_insert(self, index, chars):
+        at = min(self._offset(index), len(self.content))
+        self.content = self.content[:at] + chars + self.content[at:]
+
+    def _op_delete(self, start, end=None):
+        begin = min(self._offset(start), len(self.content))
+        finish = begin + 1 if end is None else self._offset(end)
+        finish = min(finish, len(self.content))
+        if finish > begin:
+            self.content = self.content[:begin] + self.content[finish:]
+
+
+def make_stats(content):
+    widget = FakeText(content)
+    return widget, IncrementalTextStats(widget)
+
+
+def assert_counts(widget, stats):
+    assert (stats.chars, stats.words) == (len(widget.content), len(widget.content.split()))
+
+
+def test_backspace_at_line_start_joins_lines():
+    widget, stats = make_stats("ab\ncd")
+    widget.insert_mark = 3  # Start of line 2
+    widget.command("delete", "insert-1c")
+    assert widget.content == "abcd"
+    assert_counts(widget, stats)
+
+
+def test_single_index_delete_of_a_newline():
+    widget, stats = make_stats("ab\ncd")
+    widget.command("delete", "1.2")
+    assert (stats.chars, stats.words) == (4, 1)
+
+
+def test_delete_spanning_lines():
+    widget, stats = make_stats("one two\nthree\nfour five")
+    widget.command("delete", "1.4", "3.4")
+    assert widget.content == "one  five"
+    assert_counts(widget, stats)
+
+
+def test_multiline_insert_at_end():
+    widget, stats = make_stats("a\nb")
+    widget.command("insert", "end", "x\ny z")
+    assert widget.content == "a\nbx\ny z"
+    assert_counts(widget, stats)
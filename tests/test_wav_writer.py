@@ -0,0 +1,94 @@
+"""Tests for the streaming WAV/RF64 writer and crash repair"""
+
+import os
+import struct
+import wave
+
+from tts_engines.audio_merge import read_wav_info
+from tts_engines.wav_writer import HEADER_ALIGNMENT, WavWriter, repair_wav
+
+
+def pcm(frames: int, start: int = 0) -> bytes:
+    return struct.pack(f'<{frames}h', *((start + i) % 30000 for i in range(frames)))
+
+
+def read_frames(path) -> bytes:
+    with wave.open(str(path), 'rb') as wav:
+        assert (wav.getnchannels(), wav.getsampwidth(), wav.getframerate()) == (1, 2, 22050)
+        return wav.readframes(wav.getnframes())
+
+
+def test_round_trip_with_aligned_header(tmp_path):
+    path = tmp_path / "out.wav"
+    audio = pcm(50000)
+    with WavWriter(str(path), sample_rate=22050, block_size=8192) as writer:
+        for start in range(0, len(audio), 3001):
+            writer.write(audio[start:start + 3001])
+        assert writer.frames_written == 50000
+
+    assert read_wav_info(str(path)).data_offset == HEADER_ALIGNMENT
+    assert read_frames(path) == audio
+
+
+def test_checkpoints_keep_an_unclosed_file_playable(tmp_path):
+    path = tmp_path / "crashed.wav"
+    writer = WavWriter(str(path), sample_rate=22050, block_size=4096, checkpoint_bytes=16384)
+    audio = pcm(30000)
+    writer.write(audio)
+    writer._file.flush()  # What the OS has when the process dies here
+
+    # The header covers at least every checkpoint, never more than is on disk
+    on_disk = os.path.getsize(path) - HEADER_ALIGNMENT
+    covered = read_wav_info(str(path)).data_size
+    assert 16384 <= covered <= on_disk
+    assert read_frames(path) == audio[:covered]
+
+    # Repair recovers everything that reached the disk
+    assert repair_wav(str(path)) == on_disk // 2
+    assert read_frames(path) == audio[:on_disk]
+    writer._file.close()
+
+
+def test_repair_of_truncated_file(tmp_path):
+    path = tmp_path / "truncated.wav"
+    audio = pcm(10000)
+    with WavWriter(str(path), sample_rate=22050) as writer:
+        writer.write(audio)
+    # Cut mid-frame, as a crash during a write might
+    with open(path, 'r+b') as f:
+        f.truncate(HEADER_ALIGNMENT + 6001)
+
+    assert repair_wav(str(path)) == 3000
+    assert os.path.getsize(path) == HEADER_ALIGNMENT + 6000
+    assert read_frames(path) == audio[:6000]
+
+
+def test_resume_discards_audio_after_offset(tmp_path):
+    path = tmp_path / "resumed.wav"
+    audio = pcm(8000)
+    with WavWriter(str(path), sample_rate=22050) as writer:
+        writer.write(audio[:8000])
+        writer.flush()
+        offset = writer.end_offset
+        writer.write(pcm(500, start=999))  # Rendered after the checkpoint, then lost
+
+    with WavWriter(str(path), sample_rate=22050, resume_offset=offset) as writer:
+        writer.write(audio[8000:])
+    assert read_frames(path) == audio
+
+
+def test_upgrades_to_rf64_past_4_gib(tmp_path):
+    path = tmp_path / "huge.wav"
+    size = 0x100000000 + 4096  # Just past the RIFF limit (sparse on disk)
+    with WavWriter(str(path), sample_rate=22050) as writer:
+        writer.write(pcm(100))
+        with writer.raw_append() as f:
+            f.truncate(HEADER_ALIGNMENT + size)
+
+    with open(path, 'rb') as f:
+        riff, riff_size, wave_id, ds64, _, riff64, data64 = struct.unpack('<4sI4s4sIQQ', f.read(36))
+    assert (riff, riff_size, wave_id, ds64) == (b'RF64', 0xFFFFFFFF, b'WAVE', b'ds64')
+    assert data64 == size
+    assert riff64 == HEADER_ALIGNMENT - 8 + size
+    info = read_wav_info(str(path))
+    assert (info.data_offset, info.data_size) == (HEADER_ALIGNMENT, size)
@@ -2,5 +2,43 @@
 from .base_engine import BaseTTSEngine
 from .edge_engine import EdgeTTSEngine
 from .piper_engine import PiperTTSEngine
+from .cancellation import CancellationToken, GenerationCancelled
+from .job_queue import GenerationJob, GenerationQueue
+from .text_source import FileTextSource
+from .mixed_language import MixedLanguageSynthesizer, segment_by_language
+from .voice_views import VoiceListView, VoiceViewCache
+from .worker import SynthesisWorker, WorkerCrashed
+from .router import EngineRouter, RoutedResult
+from .audio_merge import merge_audio
+from .wav_writer import WavWriter
+from .encoders import FORMAT_LABELS, available_formats, open_audio_sink
+from .checkpoint import CheckpointJournal, has_journal
+from .job_store import JobStore, StoredJob
+from .scheduler import RenderItem, ScheduleReport, VoiceAffinityScheduler
+from .dialogue import DialogueRenderer, parse_script
+from .audiobook import AudiobookRenderer, find_chapters
+from .document_source import DOCUMENT_EXTENSIONS, DocumentTextSource, open_text_source
+from .subtitles import SUBTITLE_EXTENSIONS, SubtitleRenderer, looks_like_subtitles, parse_subtitles
+from .normalizer import LanguageRules, TextNormalizer, normalizer_for
+from .lexicon import AhoCorasick, Lexicon, LexiconStore, shared_lexicons
 
-__all__ = ['BaseTTSEngine', 'EdgeTTSEngine', 'PiperTTSEngine']
+__all__ = [
+    'BaseTTSEngine', 'EdgeTTSEngine', 'PiperTTSEngine',
+    'CancellationToken', 'GenerationCancelled',
+    'GenerationJob', 'GenerationQueue', 'FileTextSource',
+    'MixedLanguageSynthesizer', 'segment_by_language',
+    'VoiceListView', 'VoiceViewCache',
+    'SynthesisWorker', 'WorkerCrashed',
+    'EngineRouter', 'RoutedResult',
+    'merge_audio', 'WavWriter',
+    'FORMAT_LABELS', 'available_formats', 'open_audio_sink',
+    'CheckpointJournal', 'has_journal',
+    'JobStore', 'StoredJob',
+    'RenderItem', 'ScheduleReport', 'VoiceAffinityScheduler',
+    'DialogueRenderer', 'parse_script',
+    'AudiobookRenderer', 'find_chapters',
+    'DOCUMENT_EXTENSIONS', 'DocumentTextSource', 'open_text_source',
+    'SUBTITLE_EXTENSIONS', 'SubtitleRenderer', 'looks_like_subtitles', 'parse_subtitles',
+    'LanguageRules', 'TextNormalizer', 'normalizer_for',
+    'AhoCorasick', 'Lexicon', 'LexiconStore', 'shared_lexicons',
+]
@@ -0,0 +1,405 @@
+"""
+Audio Merge - Join generated WAV or MP3 files without re-encoding
+
+WAV parts are joined by copying their PCM payloads behind a single new
+header (RF64 past 4 GB). MP3 parts are joined at the frame level: ID3 tags and Xing/Info/VBRI
+header frames are dropped so players don't insert a gap between parts.
+Nothing is decoded; only WAV parts whose sample rate differs from the
+output are resampled, on the fly, while they are copied.
+"""
+
+import os
+import struct
+from array import array
+from collections import Counter
+from typing import BinaryIO, NamedTuple, Optional, Sequence
+
+from .encoders import open_audio_sink
+from .wav_writer import WavWriter
+
+# Optional fast resampling
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Bytes copied per read/write (or sendfile call)
+COPY_BLOCK_SIZE = 1024 * 1024
+
+# Frames resampled per block
+RESAMPLE_BLOCK_FRAMES = 64 * 1024
+
+
+# ----- WAV -----
+
+class WavInfo(NamedTuple):
+    """Format and payload location of a PCM WAV file"""
+    channels: int
+    sample_rate: int
+    sample_width: int
+    data_offset: int
+    data_size: int
+
+    @property
+    def frame_size(self) -> int:
+        return self.channels * self.sample_width
+
+    @property
+    def frames(self) -> int:
+        return self.data_size // self.frame_size
+
+
+def read_wav_info(path: str) -> WavInfo:
+    """Locate the fmt and data chunks of a RIFF/RF64 PCM WAV file"""
+    with open(path, 'rb') as f:
+        riff, _, wave_id = struct.unpack('<4sI4s', f.read(12))
+        if riff not in (b'RIFF', b'RF64') or wave_id != b'WAVE':
+            raise ValueError(f"Not a WAV file: {os.path.basename(path)}")
+
+        fmt = None
+        rf64_data_size = None
+        file_size = os.fstat(f.fileno()).st_size
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError(f"No audio data in {os.path.basename(path)}")
+            chunk_id, chunk_size = struct.unpack('<4sI', header)
+            if chunk_id == b'ds64':
+                _, rf64_data_size = struct.unpack('<QQ', f.read(16))
+                f.seek(chunk_size - 16, 1)
+            elif chunk_id == b'fmt ':
+                fmt = struct.unpack('<HHIIHH', f.read(16))
+                f.seek(chunk_size - 16, 1)
+            elif chunk_id == b'data':
+                if fmt is None:
+                    raise ValueError(f"Missing format chunk in {os.path.basename(path)}")
+                audio_format, channels, sample_rate, _, _, bits = fmt
+                if audio_format not in (1, 0xFFFE):
+                    raise ValueError(f"Not PCM audio: {os.path.basename(path)}")
+                data_offset = f.tell()
+                if chunk_size == 0xFFFFFFFF and rf64_data_size is not None:
+                    chunk_size = rf64_data_size
+                # Tolerate headers of interrupted renders: never read past EOF
+                data_size = min(chunk_size, file_size - data_offset)
+                return WavInfo(channels, sample_rate, bits // 8, data_offset, data_size)
+            else:
+                f.seek(chunk_size + (chunk_size & 1), 1)
+
+
+def _copy_range(src: BinaryIO, dst: BinaryIO, offset: int, length: int):
+    """Copy length bytes from src at offset to dst's position, via sendfile when possible"""
+    if hasattr(os, 'sendfile') and hasattr(dst, 'fileno'):
+        dst.flush()
+        out_fd, in_fd = dst.fileno(), src.fileno()
+        position = dst.tell()
+        os.lseek(out_fd, position, os.SEEK_SET)
+        try:
+            while length > 0:
+                sent = os.sendfile(out_fd, in_fd, offset, min(length, COPY_BLOCK_SIZE))
+                if sent == 0:
+                    break
+                offset += sent
+                length -= sent
+                position += sent
+            dst.seek(position)
+            return
+        except OSError:
+            dst.seek(position)  # sendfile not supported for these files: fall back
+    src.seek(offset)
+    while length > 0:
+        block = src.read(min(length, COPY_BLOCK_SIZE))
+        if not block:
+            break
+        dst.write(block)
+        length -= len(block)
+
+
+def _resampled_frames(frames: int, source_rate: int, target_rate: int) -> int:
+    return (frames * target_rate) // source_rate
+
+
+def _resample_block(samples, position: float, step: float, count: int, channels: int):
+    """Linear interpolation of count output frames starting at source frame `position`"""
+    if NUMPY_AVAILABLE:
+        src = np.frombuffer(samples, dtype='<i2').reshape(-1, channels).astype(np.float64)
+        points = position + step * np.arange(count)
+        index = np.arange(len(src))
+        out = np.empty((count, channels), dtype=np.float64)
+        for channel in range(channels):
+            out[:, channel] = np.interp(points, index, src[:, channel])
+        return np.clip(np.round(out), -32768, 32767).astype('<i2').tobytes()
+
+    src = array('h', samples)
+    out = array('h', bytes(count * channels * 2))
+    last = len(src) // channels - 1
+    for i in range(count):
+        x = position + step * i
+        left = min(int(x), last)
+        right = min(left + 1, last)
+        frac = x - left
+        for channel in range(channels):
+            a = src[left * channels + channel]
+            b = src[right * channels + channel]
+            out[i * channels + channel] = int(round(a + (b - a) * frac))
+    return out.tobytes()
+
+
+def _copy_resampled(src: BinaryIO, dst: BinaryIO, info: WavInfo, target_rate: int):
+    """Stream a 16-bit part into dst at target_rate, block by block"""
+    if info.sample_width != 2:
+        raise ValueError("Only 16-bit WAV parts can be resampled")
+    step = info.sample_rate / target_rate
+    total_out = _resampled_frames(info.frames, info.sample_rate, target_rate)
+    frame_size = info.frame_size
+    produced = 0
+    while produced < total_out:
+        count = min(RESAMPLE_BLOCK_FRAMES, total_out - produced)
+        position = produced * step
+        first = int(position)
+        # One extra source frame on the right for interpolation
+        last = min(info.frames - 1, int(position + step * (count - 1)) + 1)
+        src.seek(info.data_offset + first * frame_size)
+        samples = src.read((last - first + 1) * frame_size)
+        dst.write(_resample_block(samples, position - first, step, count, info.channels))
+        produced += count
+
+
+def merge_wav(paths: Sequence[str], output_path: str, sample_rate: Optional[int] = None):
+    """
+    Concatenate PCM WAV files into one.
+
+    Args:
+        paths: Parts in order
+        output_path: Destination (.wav, or .flac/.opus/.mp3 via an encoder)
+        sample_rate: Output rate; default is the rate most parts already use
+                     (ties go to the higher rate), so most parts are copied as-is
+
+    Raises:
+        ValueError: Parts differ in channel count or sample width
+    """
+    infos = [read_wav_info(path) for path in paths]
+    if not infos:
+        raise ValueError("Nothing to merge")
+    first = infos[0]
+    for path, info in zip(paths, infos):
+        if (info.channels, info.sample_width) != (first.channels, first.sample_width):
+            raise ValueError(
+                f"Can't join {os.path.basename(path)}: "
+                f"{info.channels} ch / {info.sample_width * 8}-bit vs "
+                f"{first.channels} ch / {first.sample_width * 8}-bit"
+            )
+
+    if sample_rate is None:
+        rates = Counter(info.sample_rate for info in infos)
+        sample_rate = max(rates, key=lambda rate: (rates[rate], rate))
+
+    def copy_parts(out):
+        for path, info in zip(paths, infos):
+            with open(path, 'rb') as src:
+                if info.sample_rate == sample_rate:
+                    _copy_range(src, out, info.data_offset, info.frames * info.frame_size)
+                else:
+                    _copy_resampled(src, out, info, sample_rate)
+
+    if not output_path.lower().endswith('.wav'):
+        # Compressed output: the joined PCM streams straight into the encoder
+        with open_audio_sink(output_path, sample_rate, first.channels) as sink:
+            copy_parts(sink)
+        return
+
+    # WavWriter switches to RF64 if the joined audio passes 4 GB
+    with WavWriter(output_path, sample_rate, first.channels, first.sample_width) as writer:
+        with writer.raw_append() as out:
+            copy_parts(out)
+
+
+def write_wav_silence(output_path: str, seconds: float, sample_rate: int, channels: int = 1, sample_width: int = 2):
+    """Write a WAV file of digital silence"""
+    frames = round(seconds * sample_rate)
+    with WavWriter(output_path, sample_rate, channels, sample_width) as writer:
+        writer.write(bytes(frames * channels * sample_width))
+
+
+# ----- MP3 -----
+
+# Layer III bitrates (kbit/s) by bitrate index
+_BITRATES_V1 = (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320)
+_BITRATES_V2 = (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160)
+
+# Sample rates by MPEG version bits (0 = 2.5, 2 = 2, 3 = 1)
+_SAMPLE_RATES = {
+    0: (11025, 12000, 8000),
+    2: (22050, 24000, 16000),
+    3: (44100, 48000, 32000),
+}
+
+
+class Mp3Frame(NamedTuple):
+    """Parsed MPEG Layer III frame header"""
+    version: int      # 3 = MPEG1, 2 = MPEG2, 0 = MPEG2.5
+    sample_rate: int
+    channels: int
+    length: int
+
+
+def parse_mp3_frame_header(header: bytes) -> Optional[Mp3Frame]:
+    """Decode a 4-byte Layer III frame header, or None if it isn't one"""
+    if len(header) < 4 or header[0] != 0xFF or (header[1] & 0xE0) != 0xE0:
+        return None
+    version = (header[1] >> 3) & 0x03
+    layer = (header[1] >> 1) & 0x03
+    bitrate_index = header[2] >> 4
+    rate_index = (header[2] >> 2) & 0x03
+    if version == 1 or layer != 1 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    padding = (header[2] >> 1) & 0x01
+    channels = 1 if (header[3] >> 6) == 3 else 2
+    sample_rate = _SAMPLE_RATES[version][rate_index]
+    if version == 3:
+        length = 144000 * _BITRATES_V1[bitrate_index] // sample_rate + padding
+    else:
+        length = 72000 * _BITRATES_V2[bitrate_index] // sample_rate + padding
+    return Mp3Frame(version, sample_rate, channels, length)
+
+
+def _is_info_frame(frame: Mp3Frame, data: bytes) -> bool:
+    """Xing/Info (LAME) or VBRI header frame - metadata only, no audio"""
+    if frame.version == 3:
+        side_info = 17 if frame.channels == 1 else 32
+    else:
+        side_info = 9 if frame.channels == 1 else 17
+    tag = data[4 + side_info:8 + side_info]
+    return tag in (b'Xing', b'Info') or data[36:40] == b'VBRI'
+
+
+def _mp3_audio_range(f: BinaryIO, path: str):
+    """(offset, length, sample_rate) of the audio frames, skipping tags and info frames"""
+    size = os.fstat(f.fileno()).st_size
+    start, end = 0, size
+
+    # ID3v2 at the start (syncsafe size, optional 10-byte footer)
+    f.seek(0)
+    head = f.read(10)
+    if head[:3] == b'ID3' and len(head) == 10:
+        tag_size = (head[6] << 21) | (head[7] << 14) | (head[8] << 7) | head[9]
+        start = 10 + tag_size + (10 if head[5] & 0x10 else 0)
+
+    # ID3v1 at the end
+    if size - start >= 128:
+        f.seek(size - 128)
+        if f.read(3) == b'TAG':
+            end = size - 128
+
+    # Walk the frames: drop a leading info frame and any trailing garbage
+    position = start
+    sample_rate = None
+    audio_start = None
+    f.seek(position)
+    while position + 4 <= end:
+        f.seek(position)
+        frame = parse_mp3_frame_header(f.read(4))
+        if frame is None:
+            if audio_start is None:
+                position += 1  # Resync past junk before the first frame
+                continue
+            break
+        if audio_start is None:
+            f.seek(position)
+            if _is_info_frame(frame, f.read(min(frame.length, 64))):
+                position += frame.length
+                continue
+            audio_start = position
+            sample_rate = frame.sample_rate
+        elif frame.sample_rate != sample_rate:
+            raise ValueError(f"Sample rate changes inside {os.path.basename(path)}")
+        if position + frame.length > end:
+            break  # Truncated last frame
+        position += frame.length
+
+    if audio_start is None:
+        return start, 0, None
+    return audio_start, position - audio_start, sample_rate
+
+
+def merge_mp3(paths: Sequence[str], output_path: str):
+    """
+    Concatenate MP3 files frame by frame, without decoding.
+
+    Raises:
+        ValueError: Parts use different sample rates (MP3 can't be resampled
+                    without decoding; Edge voices all use the same rate)
+    """
+    if not paths:
+        raise ValueError("Nothing to merge")
+    sample_rate = None
+    with open(output_path, 'wb') as out:
+        for path in paths:
+            with open(path, 'rb') as src:
+                offset, length, rate = _mp3_audio_range(src, path)
+                if rate is not None:
+                    if sample_rate is not None and rate != sample_rate:
+                        raise ValueError(
+                            f"Can't join MP3s with different sample rates: "
+                            f"{rate} Hz vs {sample_rate} Hz"
+                        )
+                    sample_rate = rate
+                _copy_range(src, out, offset, length)
+
+
+def write_mp3_silence(template_path: str, seconds: float, output_path: str):
+    """
+    Write silent MP3 frames in the same format as template_path, so they
+    can be joined with it by merge_mp3(). Each frame reuses the template's
+    header with zeroed side info and no main data, which decodes to silence.
+    """
+    with open(template_path, 'rb') as f:
+        offset, length, sample_rate = _mp3_audio_range(f, template_path)
+        if not length:
+            raise ValueError(f"No MP3 audio in {os.path.basename(template_path)}")
+        f.seek(offset)
+        header = bytearray(f.read(4))
+    header[1] |= 0x01   # No CRC
+    header[2] &= ~0x02  # No padding
+    frame = parse_mp3_frame_header(bytes(header))
+    samples_per_frame = 1152 if frame.version == 3 else 576
+    count = round(seconds * sample_rate / samples_per_frame)
+    silent_frame = bytes(header) + bytes(frame.length - 4)
+    with open(output_path, 'wb') as out:
+        out.write(silent_frame * count)
+
+
+def merge_audio(paths: Sequence[str], output_path: str):
+    """
+    Merge parts into output_path: MP3 parts frame by frame, WAV parts into
+    any format open_audio_sink() supports (.wav, .flac, .opus, .mp3)
+    """
+    if paths and all(path.lower().endswith('.mp3') for path in paths):
+        if not output_path.lower().endswith('.mp3'):
+            raise ValueError("MP3 parts can only be joined into an MP3 file")
+        merge_mp3(paths, output_path)
+    else:
+        merge_wav(paths, output_path)
+
+
+def audio_duration(path: str) -> Optional[float]:
+    """Length in seconds of a WAV or MP3 file (None for other formats)"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.wav':
+        info = read_wav_info(path)
+        return info.frames / info.sample_rate
+    if ext == '.mp3':
+        with open(path, 'rb') as f:
+            offset, length, sample_rate = _mp3_audio_range(f, path)
+            if not length:
+                return 0.0
+            frames = 0
+            position = offset
+            while position < offset + length:
+                f.seek(position)
+                frame = parse_mp3_frame_header(f.read(4))
+                frames += 1
+                position += frame.length
+        samples_per_frame = 1152 if frame.version == 3 else 576
+        return frames * samples_per_frame / sample_rate
+    return None
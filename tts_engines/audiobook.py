@@ -0,0 +1,375 @@
+"""
+Audiobook - One audio file per chapter, chapters rendered in parallel processes
+
+find_chapters() scans a text file line by line for chapter boundaries
+(headings such as "Chapter 7" or "# Part Two", form-feed page breaks, or a
+custom regex) and returns byte ranges, so the book is never loaded whole.
+AudiobookRenderer hands the chapters to a pool of worker processes, each
+with its own engine (Piper keeps its model loaded between chapters), writes
+numbered chapter files plus an M3U playlist, and reports throughput.
+"""
+
+import multiprocessing
+import os
+import re
+import threading
+import time
+from concurrent.futures import FIRST_EXCEPTION, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Pattern, Union
+
+from .audio_merge import audio_duration
+from .cancellation import CancellationToken, GenerationCancelled
+
+# Lines that start a chapter in 'headings' mode (short lines only): a
+# keyword, an optional number ("7", "IV", "Two", "Twenty-One") and an
+# optional title after ':', '.' or a dash - "Chapter 7", "Part Two",
+# "Prologue", "CHAPTER IV: The Storm" - but not "Part of me wanted to stay."
+_NUMBER_WORDS = (
+    r"(?:one|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve|thirteen|fourteen|"
+    r"fifteen|sixteen|seventeen|eighteen|nineteen|twenty|thirty|forty|fifty|sixty|seventy|"
+    r"eighty|ninety|hundred|first|second|third|fourth|fifth|sixth|seventh|eighth|ninth|"
+    r"tenth|last|final)"
+)
+_HEADING_NUMBER = (
+    r"(?:\d+"
+    r"|(?=[ivxlcdm]+\b)m{0,4}(?:cm|cd|d?c{0,3})(?:xc|xl|l?x{0,3})(?:ix|iv|v?i{0,3})"
+    rf"|{_NUMBER_WORDS}(?:[- ]{_NUMBER_WORDS})?)"
+)
+_HEADING_TITLE = r"\s*[:.\-\u2013\u2014]\s*\S.*"
+CHAPTER_HEADING = re.compile(
+    r"^(?:#{1,2}\s+\S.*"
+    r"|(?:chapter|part|book|prologue|epilogue|preface|foreword|introduction|afterword|interlude)"
+    rf"(?:\s+{_HEADING_NUMBER}\b(?:{_HEADING_TITLE}|\.)?"
+    r"|\s*[:\-\u2013\u2014]\s*\S.*)?)$",
+    re.IGNORECASE
+)
+HEADING_MAX_CHARS = 100
+
+# Chapters with less body text than this are folded into the next one
+# (e.g. a table of contents listing every heading)
+MIN_CHAPTER_CHARS = 200
+
+# Worker processes per engine: Piper uses every core, Edge waits on the network
+DEFAULT_PROCESSES = {
+    'piper': os.cpu_count() or 2,
+    'edge': 8,
+}
+
+
+@dataclass
+class Chapter:
+    """A chapter's title and where its text is in the source file"""
+    index: int
+    title: str
+    offset: int      # Byte offset in the source file
+    length: int      # Byte length
+    chars: int
+
+    def read_text(self, path: str, encoding: str = 'utf-8') -> str:
+        with open(path, 'rb') as f:
+            f.seek(self.offset)
+            return f.read(self.length).decode(encoding, errors='replace')
+
+
+def _boundary_title(line: str, mode: str, pattern: Optional[Pattern]) -> Optional[str]:
+    """Title if this line starts a chapter ('' when it has no usable title), else None"""
+    stripped = line.strip().lstrip('\f').strip()
+    if pattern is not None:
+        is_boundary = bool(pattern.search(line))
+    elif mode == 'page_breaks':
+        is_boundary = line.startswith('\f')
+    else:
+        is_boundary = bool(stripped) and len(stripped) <= HEADING_MAX_CHARS and bool(CHAPTER_HEADING.match(stripped))
+    if not is_boundary:
+        return None
+    return stripped.lstrip('#').strip() if len(stripped) <= HEADING_MAX_CHARS else ""
+
+
+def find_chapters(
+    path: str,
+    mode: str = 'headings',
+    pattern: Optional[Union[str, Pattern]] = None,
+    encoding: str = 'utf-8'
+) -> List[Chapter]:
+    """
+    Split a text file into chapters without reading it into memory.
+
+    Args:
+        path: Text file
+        mode: 'headings' (Chapter/Part/Prologue... or Markdown # lines) or
+              'page_breaks' (form feeds)
+        pattern: Regex matching chapter-start lines; overrides mode
+        encoding: File encoding
+
+    Text before the first boundary becomes an untitled opening chapter.
+    """
+    if isinstance(pattern, str):
+        pattern = re.compile(pattern, re.MULTILINE)
+
+    chapters: List[Chapter] = []
+    title, start, chars, body_chars = "Opening", 0, 0, 0
+    offset = 0
+
+    def close_chapter(end):
+        if end > start and chars:
+            chapters.append(Chapter(len(chapters), title or f"Chapter {len(chapters) + 1}", start, end - start, chars))
+
+    with open(path, 'rb') as f:
+        for raw in f:
+            line = raw.decode(encoding, errors='replace')
+            new_title = _boundary_title(line, mode, pattern)
+            if new_title is not None:
+                if body_chars >= MIN_CHAPTER_CHARS:
+                    close_chapter(offset)
+                    start, chars, body_chars = offset, 0, 0
+                # Otherwise the text so far is folded into this chapter;
+                # the heading closest to the body names it
+                title = new_title
+            else:
+                body_chars += len(line.strip())
+            chars += len(line)
+            offset += len(raw)
+    close_chapter(offset)
+
+    # A short tail is appended to the previous chapter
+    if len(chapters) > 1 and chapters[-1].chars < MIN_CHAPTER_CHARS:
+        tail = chapters.pop()
+        last = chapters[-1]
+        chapters[-1] = Chapter(last.index, last.title, last.offset, last.length + tail.length, last.chars + tail.chars)
+    return chapters
+
+
+def chapter_filename(chapter: Chapter, count: int, ext: str) -> str:
+    """'07 - Chapter Seven.mp3' (zero-padded to sort correctly)"""
+    width = max(2, len(str(count)))
+    title = re.sub(r'[\\/:*?"<>|\s]+', ' ', chapter.title).strip()[:60].rstrip('. ')
+    return f"{chapter.index + 1:0{width}d} - {title or 'Chapter'}{ext}"
+
+
+# ----- worker processes -----
+
+_process_state: Dict[str, object] = {}
+
+
+def _init_process(cancel_event):
+    _process_state['cancel_event'] = cancel_event
+    _process_state['engines'] = {}
+
+
+def _render_chapter(task: dict) -> dict:
+    """Runs in a worker process: render one chapter to its file"""
+    from .edge_engine import EdgeTTSEngine
+    from .piper_engine import PiperTTSEngine
+
+    engines = _process_state['engines']
+    if task['engine'] not in engines:
+        engines[task['engine']] = {'edge': EdgeTTSEngine, 'piper': PiperTTSEngine}[task['engine']]()
+    engine = engines[task['engine']]
+
+    # Mirror the parent's cancel event onto a token the engine understands
+    cancel_event = _process_state['cancel_event']
+    token = CancellationToken()
+    finished = threading.Event()
+
+    def watch():
+        while not finished.is_set():
+            if cancel_event.wait(0.2):
+                token.cancel("Cancelled by user")
+                return
+
+    threading.Thread(target=watch, daemon=True).start()
+    started = time.time()
+    try:
+        with open(task['source_path'], 'rb') as f:
+            f.seek(task['offset'])
+            text = f.read(task['length']).decode(task['encoding'], errors='replace')
+        engine.generate(
+            text=text,
+            voice=task['voice'],
+            output_path=task['output_path'],
+            speed=task['speed'],
+            pitch=task['pitch'],
+            volume=task['volume'],
+            cancel_token=token
+        )
+    finally:
+        finished.set()
+    return {'index': task['index'], 'seconds': time.time() - started}
+
+
+# ----- rendering -----
+
+@dataclass
+class ChapterResult:
+    chapter: Chapter
+    output_path: str
+    render_seconds: float
+    audio_seconds: Optional[float]
+
+
+@dataclass
+class AudiobookResult:
+    chapters: List[ChapterResult]
+    playlist_path: str
+    elapsed: float
+    processes: int
+
+    @property
+    def total_chars(self) -> int:
+        return sum(result.chapter.chars for result in self.chapters)
+
+    @property
+    def audio_seconds(self) -> float:
+        return sum(result.audio_seconds or 0.0 for result in self.chapters)
+
+    @property
+    def chars_per_second(self) -> float:
+        return self.total_chars / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def realtime_factor(self) -> float:
+        """Seconds of audio produced per second of wall time"""
+        return self.audio_seconds / self.elapsed if self.elapsed else 0.0
+
+
+class AudiobookRenderer:
+    """
+    Renders chapters in parallel worker processes.
+
+    Args:
+        engine: 'piper' or 'edge'
+        processes: Worker processes (default: every core for Piper, 8 for Edge)
+    """
+
+    def __init__(self, engine: str, processes: Optional[int] = None):
+        if engine not in DEFAULT_PROCESSES:
+            raise ValueError(f"Unknown engine: {engine}")
+        self.engine = engine
+        self.processes = processes or DEFAULT_PROCESSES[engine]
+
+    def render(
+        self,
+        source_path: str,
+        chapters: List[Chapter],
+        output_dir: str,
+        voice: str,
+        ext: str,
+        speed: float = 1.0,
+        pitch: int = 0,
+        volume: int = 0,
+        encoding: str = 'utf-8',
+        playlist_name: Optional[str] = None,
+        progress_callback: Optional[Callable[[float, str], None]] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> AudiobookResult:
+        """
+        Render every chapter to output_dir as numbered files and write an M3U
+        playlist (playlist_name, default "<folder name>.m3u").
+
+        Chapters finished by an earlier, interrupted run are resumed from
+        their journals (see checkpoint.py).
+        """
+        if not chapters:
+            raise ValueError("No chapters to render")
+        os.makedirs(output_dir, exist_ok=True)
+        started = time.time()
+
+        if self.engine == 'piper':
+            # Download the voice once here, not in every process at the same time
+            from .piper_engine import PiperTTSEngine
+            piper = PiperTTSEngine()
+            if not piper.is_voice_downloaded(voice):
+                piper.download_voice(voice, progress_callback, cancel_token)
+
+        tasks = []
+        for chapter in chapters:
+            tasks.append({
+                'index': chapter.index,
+                'engine': self.engine,
+                'source_path': os.path.abspath(source_path),
+                'offset': chapter.offset,
+                'length': chapter.length,
+                'encoding': encoding,
+                'voice': voice,
+                'output_path': os.path.join(output_dir, chapter_filename(chapter, len(chapters), ext)),
+                'speed': speed,
+                'pitch': pitch,
+                'volume': volume,
+            })
+
+        # spawn: clean interpreters, never a fork of the Tk process
+        ctx = multiprocessing.get_context('spawn')
+        cancel_event = ctx.Event()
+        if cancel_token:
+            cancel_token.add_callback(cancel_event.set)
+        processes = min(self.processes, len(tasks))
+        render_seconds: Dict[int, float] = {}
+        total_chars = sum(chapter.chars for chapter in chapters) or 1
+        done_chars = 0
+
+        if progress_callback:
+            progress_callback(0.02, f"Rendering {len(chapters)} chapters in {processes} processes...")
+        with ProcessPoolExecutor(
+            max_workers=processes, mp_context=ctx,
+            initializer=_init_process, initargs=(cancel_event,)
+        ) as pool:
+            # Longest chapters first so the last few don't run alone
+            order = sorted(range(len(tasks)), key=lambda i: chapters[i].chars, reverse=True)
+            futures = {pool.submit(_render_chapter, tasks[i]): i for i in order}
+            pending = set(futures)
+            while pending:
+                finished, pending = wait(pending, timeout=0.25, return_when=FIRST_EXCEPTION)
+                if cancel_token and cancel_token.cancelled:
+                    cancel_event.set()
+                for future in finished:
+                    error = future.exception()
+                    if error is not None:
+                        cancel_event.set()
+                        for other in pending:
+                            other.cancel()
+                        if cancel_token and cancel_token.cancelled:
+                            raise GenerationCancelled(cancel_token.reason)
+                        raise error
+                    chapter = chapters[futures[future]]
+                    render_seconds[chapter.index] = future.result()['seconds']
+                    done_chars += chapter.chars
+                    if progress_callback:
+                        elapsed = time.time() - started
+                        progress_callback(
+                            0.02 + 0.96 * done_chars / total_chars,
+                            f"{len(render_seconds)}/{len(chapters)} chapters "
+                            f"({done_chars / elapsed:,.0f} chars/s)"
+                        )
+
+        results = []
+        for chapter, task in zip(chapters, tasks):
+            try:
+                duration = audio_duration(task['output_path'])
+            except (OSError, ValueError):
+                duration = None
+            results.append(ChapterResult(chapter, task['output_path'], render_seconds[chapter.index], duration))
+
+        playlist_path = os.path.join(
+            output_dir, playlist_name or f"{os.path.basename(os.path.normpath(output_dir))}.m3u"
+        )
+        write_m3u(playlist_path, results)
+
+        result = AudiobookResult(results, playlist_path, time.time() - started, processes)
+        if progress_callback:
+            progress_callback(
+                1.0,
+                f"Complete! {len(results)} chapters, {result.chars_per_second:,.0f} chars/s"
+            )
+        return result
+
+
+def write_m3u(playlist_path: str, results: List[ChapterResult]):
+    """Extended M3U with chapter titles and durations; paths relative to the playlist"""
+    base = os.path.dirname(os.path.abspath(playlist_path))
+    with open(playlist_path, 'w', encoding='utf-8') as f:
+        f.write("#EXTM3U\n")
+        for result in results:
+            seconds = round(result.audio_seconds) if result.audio_seconds is not None else -1
+            f.write(f"#EXTINF:{seconds},{result.chapter.title}\n")
+            f.write(os.path.relpath(result.output_path, base).replace(os.sep, '/') + "\n")
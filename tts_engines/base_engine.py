@@ -3,13 +3,26 @@ Base TTS Engine - Abstract interface for all TTS engines
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional
 from pathlib import Path
 
+from .cancellation import CancellationToken
+from .checkpoint import CheckpointJournal, remove_journal
+from .lexicon import LexiconStore, shared_lexicons
+from .normalizer import normalizer_for
+
 
 class BaseTTSEngine(ABC):
     """Abstract base class for TTS engines"""
 
+    # Spell out numbers, dates, currency, abbreviations and URLs before
+    # synthesis (see normalizer.py); False sends the text unchanged
+    normalize_text = True
+
+    # Pronunciation lexicons applied before normalization (see lexicon.py);
+    # None uses the shared store over models/lexicon
+    lexicons: Optional[LexiconStore] = None
+
     @property
     @abstractmethod
     def name(self) -> str:
@@ -22,6 +35,14 @@ class BaseTTSEngine(ABC):
         """Whether this engine requires internet"""
         pass
 
+    @property
+    def voices_generation(self):
+        """
+        Token that changes whenever the voice list may have changed
+        (e.g. a voice was installed). Used to invalidate cached views.
+        """
+        return 0
+
     @abstractmethod
     def get_voices(self) -> Dict[str, Dict[str, str]]:
         """
@@ -39,7 +60,8 @@ class BaseTTSEngine(ABC):
         speed: float = 1.0,
         pitch: int = 0,
         volume: int = 0,
-        progress_callback: Optional[callable] = None
+        progress_callback: Optional[callable] = None,
+        cancel_token: Optional[CancellationToken] = None
     ) -> bool:
         """
         Generate audio from text.
@@ -52,12 +74,44 @@ class BaseTTSEngine(ABC):
             pitch: Pitch adjustment in Hz (-50 to +50)
             volume: Volume adjustment in % (-50 to +50)
             progress_callback: Optional callback(progress: float, status: str)
+            cancel_token: Optional CancellationToken; engines stop at the next
+                          safe point and raise GenerationCancelled when it is
+                          cancelled or its deadline passes
 
         Returns:
             True if successful, False otherwise
         """
         pass
 
+    @abstractmethod
+    def generate_stream(
+        self,
+        segments: Iterable[str],
+        voice: str,
+        output_path: str,
+        speed: float = 1.0,
+        pitch: int = 0,
+        volume: int = 0,
+        progress_callback: Optional[callable] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        total_chars: Optional[int] = None
+    ) -> bool:
+        """
+        Generate one audio file from an iterable of text segments.
+
+        Segments are consumed lazily, so callers can stream text from disk
+        without ever holding the whole document in memory.
+
+        Args:
+            segments: Iterable of text segments, synthesized in order
+            total_chars: Total text length if known, used for progress
+            (other args as in generate)
+
+        Returns:
+            True if successful
+        """
+        pass
+
     @abstractmethod
     def is_available(self) -> bool:
         """Check if this engine is available (dependencies installed)"""
@@ -66,3 +120,57 @@ class BaseTTSEngine(ABC):
     def get_output_extension(self) -> str:
         """Get the output file extension for this engine"""
         return ".mp3"
+
+    def get_output_formats(self) -> List[str]:
+        """
+        Extensions this engine can write; the output path's extension
+        selects the format. The first entry is the native one.
+        """
+        return [self.get_output_extension()]
+
+    def get_voice_language(self, voice_id: str) -> Optional[str]:
+        """Extract language code from voice_id (e.g., 'en-US-JennyNeural' -> 'en')"""
+        if not voice_id:
+            return None
+        return voice_id.split('-')[0].split('_')[0].lower()
+
+    def _prepared_segments(self, segments: Iterable[str], voice: str) -> Iterable[str]:
+        """
+        Segments passed lazily through the voice language's lexicon, then its
+        normalizer (so lexicon terms containing digits match as written)
+        """
+        lang = self.get_voice_language(voice)
+        store = self.lexicons or shared_lexicons()
+        # Looked up per segment so an edited lexicon takes effect mid-job
+        segments = (store.apply(segment, lang) for segment in segments)
+        normalizer = normalizer_for(lang) if self.normalize_text else None
+        return normalizer.normalize_segments(segments) if normalizer else segments
+
+    def _open_journal(self, output_path: str, voice: str, speed: float, pitch: int, volume: int) -> CheckpointJournal:
+        """Segment journal for a job; a re-run with the same settings resumes it"""
+        return CheckpointJournal(
+            output_path, engine=self.name, voice=voice, speed=speed, pitch=pitch, volume=volume
+        )
+
+    @classmethod
+    def _keep_or_remove_partial_output(cls, output_path: str, journal: Optional[CheckpointJournal]):
+        """
+        After a failed or cancelled job: keep the output and its journal if
+        completed segments were recorded (re-running resumes), else delete both
+        """
+        if journal is not None:
+            journal.close()
+            if journal.resumable:
+                return
+        cls._remove_partial_output(output_path)
+
+    @staticmethod
+    def _remove_partial_output(output_path: str):
+        """Delete a half-written output file (and its journal) after a failed or cancelled job"""
+        remove_journal(output_path)
+        try:
+            path = Path(output_path)
+            if path.exists():
+                path.unlink()
+        except OSError:
+            pass
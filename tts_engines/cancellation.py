@@ -0,0 +1,90 @@
+"""
+Cancellation - Cooperative cancellation tokens and deadlines for TTS jobs
+"""
+
+import threading
+import time
+from typing import Callable, List, Optional
+
+
+class GenerationCancelled(Exception):
+    """Raised when a generation or download is cancelled or runs past its deadline"""
+    pass
+
+
+class CancellationToken:
+    """
+    Thread-safe cancellation flag with an optional deadline.
+
+    The GUI (or any caller) keeps a reference and calls cancel(); engines poll
+    raise_if_cancelled() at safe points (between sentences, chunks or blocks).
+    """
+
+    def __init__(self, timeout: Optional[float] = None):
+        """
+        Args:
+            timeout: Optional number of seconds after which the token counts
+                     as cancelled (a deadline for the whole job)
+        """
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+        self._reason = ""
+        self._deadline = time.monotonic() + timeout if timeout is not None else None
+
+    def cancel(self, reason: str = "Cancelled by user"):
+        """Request cancellation and fire registered callbacks once"""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._reason = reason
+            self._event.set()
+            callbacks = list(self._callbacks)
+            self._callbacks.clear()
+
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                pass
+
+    def add_callback(self, callback: Callable[[], None]):
+        """Register a callback run on cancel (immediately if already cancelled)"""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def _check_deadline(self):
+        if self._deadline is not None and time.monotonic() >= self._deadline:
+            self.cancel("Deadline exceeded")
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether cancellation was requested or the deadline has passed"""
+        self._check_deadline()
+        return self._event.is_set()
+
+    @property
+    def reason(self) -> str:
+        return self._reason
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left until the deadline, or None if there is no deadline"""
+        if self._deadline is None:
+            return None
+        return max(0.0, self._deadline - time.monotonic())
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until cancelled, the deadline passes or timeout elapses"""
+        remaining = self.remaining()
+        if remaining is not None:
+            timeout = remaining if timeout is None else min(timeout, remaining)
+        self._event.wait(timeout)
+        return self.cancelled
+
+    def raise_if_cancelled(self):
+        """Raise GenerationCancelled if the job should stop"""
+        if self.cancelled:
+            raise GenerationCancelled(self._reason or "Cancelled")
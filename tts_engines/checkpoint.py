@@ -0,0 +1,147 @@
+"""
+Checkpoint - Segment journal that lets an interrupted generation resume
+
+While a long job renders, each finished segment is appended to a small
+journal next to the output ("<output>.journal"): its index, a hash of its
+text and the output offset once its audio is on disk. Running the same job
+again skips the segments whose text still matches, truncates the output to
+the last recorded offset and continues appending. The journal is deleted
+when the job completes.
+"""
+
+import hashlib
+import json
+import os
+from typing import List
+
+JOURNAL_SUFFIX = ".journal"
+JOURNAL_VERSION = 1
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+
+
+class CheckpointJournal:
+    """
+    Progress journal for one output file.
+
+    Args:
+        output_path: The audio file being rendered
+        job_key: Everything besides the text that shapes the audio (engine,
+                 voice, speed...); a journal written with a different key
+                 is discarded
+    """
+
+    def __init__(self, output_path: str, **job_key):
+        self.output_path = output_path
+        self.path = output_path + JOURNAL_SUFFIX
+        self.job_key = {k: job_key[k] for k in sorted(job_key)}
+        self._entries: List[dict] = []   # completed segments, in order
+        self._matched = 0                # leading entries confirmed by the new run
+        self._recorded = 0               # segments recorded by this run
+        self._file = None
+        self._load()
+
+    # ----- resuming -----
+
+    def _load(self):
+        if not os.path.exists(self.output_path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                header = json.loads(f.readline())
+                if header.get('version') != JOURNAL_VERSION or header.get('key') != self.job_key:
+                    return
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break  # Torn last line from a crash
+                    if entry.get('index') != len(self._entries):
+                        break
+                    self._entries.append(entry)
+        except (OSError, ValueError, AttributeError):
+            self._entries = []
+        # Entries past the end of the output never reached the disk (power loss)
+        size = os.path.getsize(self.output_path)
+        while self._entries and self._entries[-1].get('offset', size + 1) > size:
+            self._entries.pop()
+
+    @property
+    def completed(self) -> int:
+        """Segments recorded by a previous run"""
+        return len(self._entries)
+
+    def is_done(self, index: int, text: str) -> bool:
+        """
+        Whether segment `index` was already rendered with this exact text.
+        Call for segments in order; the first miss ends the resumable prefix.
+        """
+        if index != self._matched or index >= len(self._entries):
+            return False
+        if self._entries[index]['hash'] != _text_hash(text):
+            return False
+        self._matched += 1
+        return True
+
+    @property
+    def resume_offset(self) -> int:
+        """Output offset after the last segment this run can skip (0 = start over)"""
+        return self._entries[self._matched - 1]['offset'] if self._matched else 0
+
+    @property
+    def resumed_chars(self) -> int:
+        return sum(entry['chars'] for entry in self._entries[:self._matched])
+
+    # ----- recording -----
+
+    def record(self, index: int, text: str, offset: int):
+        """Note that segment `index` is complete and its audio ends at `offset` on disk"""
+        if self._file is None:
+            self._start_writing()
+        entry = {'index': index, 'hash': _text_hash(text), 'chars': len(text), 'offset': offset}
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._recorded += 1
+
+    def _start_writing(self):
+        # Rewrite the journal keeping only the prefix this run confirmed
+        kept = self._entries[:self._matched]
+        self._file = open(self.path, 'w', encoding='utf-8')
+        self._file.write(json.dumps({'version': JOURNAL_VERSION, 'key': self.job_key}) + "\n")
+        for entry in kept:
+            self._file.write(json.dumps(entry) + "\n")
+
+    def close(self):
+        """Stop recording; the journal stays for a later resume"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def finish(self):
+        """The job completed: delete the journal"""
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    @property
+    def resumable(self) -> bool:
+        """Whether a re-run could skip work (keep the partial output on failure)"""
+        return self._matched + self._recorded > 0
+
+
+def has_journal(output_path: str) -> bool:
+    """Whether an interrupted job left a journal (re-running it resumes)"""
+    return os.path.exists(output_path + JOURNAL_SUFFIX)
+
+
+def remove_journal(output_path: str):
+    """Delete a leftover journal (e.g. when the user discards a partial output)"""
+    try:
+        os.remove(output_path + JOURNAL_SUFFIX)
+    except OSError:
+        pass
@@ -0,0 +1,344 @@
+"""
+Dialogue - Render "SPEAKER: line" scripts with a voice per speaker
+
+Script format:
+
+    @voice ALICE = edge:en-US-AriaNeural
+    @voice BOB = piper:en_US-ryan-medium
+    @pause 0.4
+    # comments are ignored
+    ALICE: Did you hear that?
+    BOB: Hear what?
+      (an indented line without a speaker continues the previous line)
+    [pause 2]
+    ALICE: Never mind.
+
+Speakers without an @voice line get voices automatically. Lines are rendered
+concurrently: Edge lines in parallel over the network, Piper lines on local
+cores (each on a VoiceAffinityScheduler, so a speaker's model stays loaded).
+Every line is kept as a stem file, and the stems are joined with pauses into
+one timeline file.
+"""
+
+import os
+import re
+import shutil
+import tempfile
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from .audio_merge import merge_audio, read_wav_info, write_mp3_silence, write_wav_silence
+from .base_engine import BaseTTSEngine
+from .cancellation import CancellationToken, GenerationCancelled
+from .encoders import decode_to_wav
+from .piper_engine import PiperTTSEngine
+from .scheduler import RenderItem, ScheduleReport, VoiceAffinityScheduler
+
+# Default silence between lines, and between lines of different speakers (seconds)
+LINE_PAUSE = 0.35
+SPEAKER_CHANGE_PAUSE = 0.6
+
+# Speaker names never end in a digit, so "At 10:30 we left." stays text
+_SPEAKER_LINE = re.compile(r"^([^\W\d][\w .'-]{0,39}?)(?<![\d ])\s*:\s*(.*)$")
+_VOICE_DIRECTIVE = re.compile(r"^@voice\s+(.+?)\s*=\s*(edge|piper)\s*:\s*(\S+)\s*$", re.IGNORECASE)
+_PAUSE_DIRECTIVE = re.compile(r"^@pause\s+([\d.]+)\s*$", re.IGNORECASE)
+_INLINE_PAUSE = re.compile(r"^\[pause\s+([\d.]+)\s*s?\]$", re.IGNORECASE)
+
+
+class SpeakerVoice(NamedTuple):
+    """Engine key ('edge' or 'piper') and voice for one speaker"""
+    engine: str
+    voice: str
+
+
+@dataclass
+class DialogueLine:
+    """One spoken line of the script"""
+    index: int
+    speaker: str
+    text: str
+    extra_pause: float = 0.0  # From a [pause N] line before it
+
+
+@dataclass
+class DialogueScript:
+    lines: List[DialogueLine]
+    voices: Dict[str, SpeakerVoice] = field(default_factory=dict)  # From @voice lines
+    line_pause: Optional[float] = None                              # From @pause
+
+    @property
+    def speakers(self) -> List[str]:
+        """Speakers in order of first appearance"""
+        return list(dict.fromkeys(line.speaker for line in self.lines))
+
+
+def parse_script(text: str) -> DialogueScript:
+    """
+    Parse a dialogue script (see the module docstring for the format).
+
+    Raises:
+        ValueError: No "SPEAKER: line" lines found
+    """
+    script = DialogueScript(lines=[])
+    extra_pause = 0.0
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line or line.startswith('#'):
+            continue
+        match = _VOICE_DIRECTIVE.match(line)
+        if match:
+            speaker, engine, voice = match.groups()
+            script.voices[speaker.strip().upper()] = SpeakerVoice(engine.lower(), voice)
+            continue
+        match = _PAUSE_DIRECTIVE.match(line)
+        if match:
+            script.line_pause = float(match.group(1))
+            continue
+        match = _INLINE_PAUSE.match(line)
+        if match:
+            extra_pause += float(match.group(1))
+            continue
+        match = _SPEAKER_LINE.match(line)
+        if match and match.group(2) and not (raw[:1].isspace() and script.lines):
+            script.lines.append(DialogueLine(
+                len(script.lines), match.group(1).strip().upper(), match.group(2).strip(), extra_pause
+            ))
+            extra_pause = 0.0
+        elif script.lines:
+            # Continuation of the previous line
+            script.lines[-1].text += " " + line
+    if not script.lines:
+        raise ValueError('No dialogue lines found (expected "SPEAKER: line")')
+    return script
+
+
+@dataclass
+class DialogueResult:
+    output_path: str
+    stems: List[str]                       # One file per line, in script order
+    voices: Dict[str, SpeakerVoice]        # Voice used for each speaker
+    reports: Dict[str, ScheduleReport]     # Per engine
+
+
+class DialogueRenderer:
+    """
+    Renders a DialogueScript: lines in parallel per engine, then one timeline.
+
+    Args:
+        engine_factories: {'edge': EdgeTTSEngine, 'piper': PiperTTSEngine}
+        schedulers: Shared per-engine schedulers (created on demand otherwise);
+                    their worker counts set the parallelism
+        line_pause: Silence between lines of the same speaker (seconds)
+        speaker_change_pause: Silence when the speaker changes (seconds)
+    """
+
+    def __init__(
+        self,
+        engine_factories: Dict[str, Callable[[], BaseTTSEngine]],
+        schedulers: Optional[Dict[str, VoiceAffinityScheduler]] = None,
+        line_pause: float = LINE_PAUSE,
+        speaker_change_pause: float = SPEAKER_CHANGE_PAUSE
+    ):
+        self.engine_factories = engine_factories
+        self.schedulers = schedulers if schedulers is not None else {}
+        self.line_pause = line_pause
+        self.speaker_change_pause = speaker_change_pause
+        self._schedulers_lock = threading.Lock()
+
+    def _scheduler(self, engine_key: str) -> VoiceAffinityScheduler:
+        with self._schedulers_lock:
+            if engine_key not in self.schedulers:
+                self.schedulers[engine_key] = VoiceAffinityScheduler(self.engine_factories[engine_key])
+            return self.schedulers[engine_key]
+
+    def assign_voices(self, script: DialogueScript, default_engine: str, default_voice: str) -> Dict[str, SpeakerVoice]:
+        """
+        Voice per speaker: @voice lines first; the first other speaker gets
+        default_voice, the rest distinct voices in its language, alternating
+        genders (downloaded Piper voices first).
+        """
+        voices = dict(script.voices)
+        unmapped = [s for s in script.speakers if s not in voices]
+        if not unmapped:
+            return voices
+
+        engine = self.engine_factories[default_engine]()
+        lang = engine.get_voice_language(default_voice)
+        descriptions = {}
+        for category in engine.get_voices().values():
+            descriptions.update(category)
+
+        def downloaded(voice_id):
+            return isinstance(engine, PiperTTSEngine) and engine.is_voice_downloaded(voice_id)
+
+        taken = {v.voice for v in voices.values()}
+        others = sorted(
+            (v for v in descriptions
+             if engine.get_voice_language(v) == lang and v != default_voice and v not in taken),
+            key=lambda v: (not downloaded(v), v)
+        )
+        by_gender = {
+            'Female': [v for v in others if 'Female' in descriptions[v]],
+            'Male': [v for v in others if 'Male' in descriptions[v] and 'Female' not in descriptions[v]],
+        }
+        rest = [v for v in others if v not in by_gender['Female'] and v not in by_gender['Male']]
+
+        opposite = {'Female': 'Male', 'Male': 'Female'}
+        want = 'Male' if 'Female' in descriptions.get(default_voice, '') else 'Female'
+        pool = [default_voice] if default_voice not in taken else []
+        while by_gender['Female'] or by_gender['Male'] or rest:
+            source = by_gender[want] or by_gender[opposite[want]] or rest
+            pool.append(source.pop(0))
+            want = opposite[want]
+
+        for i, speaker in enumerate(unmapped):
+            # More speakers than voices: reuse them in turn
+            voice = pool[i % len(pool)] if pool else default_voice
+            voices[speaker] = SpeakerVoice(default_engine, voice)
+        return voices
+
+    def render(
+        self,
+        script: DialogueScript,
+        output_path: str,
+        voices: Dict[str, SpeakerVoice],
+        stems_dir: Optional[str] = None,
+        speed: float = 1.0,
+        pitch: int = 0,
+        volume: int = 0,
+        progress_callback: Optional[Callable[[float, str], None]] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> DialogueResult:
+        """
+        Render every line to a stem in stems_dir (default: "<output>_stems"
+        next to the output) and join them, with pauses, into output_path.
+        """
+        token = cancel_token or CancellationToken()
+        if stems_dir is None:
+            stems_dir = os.path.splitext(output_path)[0] + "_stems"
+        os.makedirs(stems_dir, exist_ok=True)
+
+        # One batch per engine; both engines run at the same time
+        batches: Dict[str, List[RenderItem]] = {}
+        extensions: Dict[str, str] = {}
+        stems: List[str] = []
+        for line in script.lines:
+            speaker_voice = voices[line.speaker]
+            if speaker_voice.engine not in extensions:
+                extensions[speaker_voice.engine] = self.engine_factories[speaker_voice.engine]().get_output_extension()
+            ext = extensions[speaker_voice.engine]
+            safe_speaker = re.sub(r'[^\w-]+', '_', line.speaker)
+            stem = os.path.join(stems_dir, f"{line.index + 1:04d}_{safe_speaker}{ext}")
+            stems.append(stem)
+            batches.setdefault(speaker_voice.engine, []).append(RenderItem(line.text, speaker_voice.voice, stem))
+
+        # Mixed with Piper (or into a non-MP3 output), Edge stems are decoded
+        # after every line is synthesized - fail before that, not after
+        all_mp3 = all(stem.lower().endswith('.mp3') for stem in stems)
+        needs_decode = any(stem.lower().endswith('.mp3') for stem in stems) and not (
+            all_mp3 and output_path.lower().endswith('.mp3')
+        )
+        if needs_decode and not shutil.which('ffmpeg'):
+            raise ValueError("Joining Edge (MP3) lines into this output needs ffmpeg (install it and add it to PATH)")
+
+        done = {key: 0.0 for key in batches}
+        total = len(script.lines)
+        progress_lock = threading.Lock()
+
+        def engine_progress(key):
+            def report(fraction, status):
+                with progress_lock:
+                    done[key] = fraction * len(batches[key])
+                    rendered = int(sum(done.values()))
+                if progress_callback:
+                    progress_callback(0.05 + 0.85 * rendered / total, f"Rendered {rendered}/{total} lines")
+            return report
+
+        reports: Dict[str, ScheduleReport] = {}
+        errors: List[BaseException] = []
+
+        def run_batch(key):
+            try:
+                reports[key] = self._scheduler(key).render(
+                    batches[key], speed, pitch, volume,
+                    progress_callback=engine_progress(key),
+                    cancel_token=token
+                )
+            except BaseException as e:
+                token.cancel("Line failed")
+                errors.append(e)
+
+        if progress_callback:
+            progress_callback(0.05, f"Rendering {total} lines for {len(voices)} speakers...")
+        threads = [threading.Thread(target=run_batch, args=(key,), daemon=True) for key in batches]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            # Prefer the real failure over the cancellations it caused
+            raise next((e for e in errors if not isinstance(e, GenerationCancelled)), errors[0])
+
+        if progress_callback:
+            progress_callback(0.92, "Assembling timeline...")
+        try:
+            self._assemble(script, stems, output_path, token)
+        except GenerationCancelled:
+            BaseTTSEngine._remove_partial_output(output_path)
+            raise
+
+        if progress_callback:
+            progress_callback(1.0, "Complete!")
+        return DialogueResult(output_path, stems, voices, reports)
+
+    def _pause_before(self, script: DialogueScript, line: DialogueLine) -> float:
+        if line.index == 0:
+            return line.extra_pause
+        previous = script.lines[line.index - 1]
+        line_pause = script.line_pause if script.line_pause is not None else self.line_pause
+        base = line_pause if previous.speaker == line.speaker else max(line_pause, self.speaker_change_pause)
+        return base + line.extra_pause
+
+    def _assemble(self, script: DialogueScript, stems: List[str], output_path: str, token: CancellationToken):
+        """Join the stems with silence between them into output_path"""
+        temp_dir = tempfile.mkdtemp(prefix="tts_dialogue_", dir=os.path.dirname(os.path.abspath(output_path)))
+        try:
+            all_mp3 = all(stem.lower().endswith('.mp3') for stem in stems)
+            if all_mp3 and output_path.lower().endswith('.mp3'):
+                # Edge only: silent frames slot in between MP3 stems, nothing decoded
+                parts = stems
+                make_silence = lambda seconds, path: write_mp3_silence(stems[0], seconds, path)
+                silence_ext = '.mp3'
+            else:
+                # WAV timeline; Edge stems are decoded when mixed with Piper
+                parts = []
+                for stem in stems:
+                    token.raise_if_cancelled()
+                    if stem.lower().endswith('.mp3'):
+                        decoded = os.path.join(temp_dir, os.path.basename(stem) + ".wav")
+                        decode_to_wav(stem, decoded)
+                        parts.append(decoded)
+                    else:
+                        parts.append(stem)
+                first = read_wav_info(parts[0])
+                make_silence = lambda seconds, path: write_wav_silence(
+                    path, seconds, first.sample_rate, first.channels, first.sample_width
+                )
+                silence_ext = '.wav'
+
+            silences: Dict[float, str] = {}
+            timeline = []
+            for line, part in zip(script.lines, parts):
+                pause = round(self._pause_before(script, line), 3)
+                if pause > 0:
+                    if pause not in silences:
+                        silences[pause] = os.path.join(temp_dir, f"silence_{len(silences)}{silence_ext}")
+                        make_silence(pause, silences[pause])
+                    timeline.append(silences[pause])
+                timeline.append(part)
+
+            token.raise_if_cancelled()
+            merge_audio(timeline, output_path)
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
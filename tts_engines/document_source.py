@@ -0,0 +1,456 @@
+"""
+Document Source - Stream EPUB, HTML and Markdown as clean text segments
+
+Each reader is a generator of DocumentSegments: structural markers
+('chapter') and spoken text ('heading', 'paragraph'). Files are read in
+blocks and parsed incrementally - EPUB chapters are decompressed from the
+zip as they are parsed - so nothing builds the whole document in memory
+and the first segment is ready almost immediately.
+
+DocumentTextSource wraps a reader with the FileTextSource interface, so
+documents drop into the same streaming synthesis path as large text files.
+"""
+
+import codecs
+import posixpath
+import re
+import zipfile
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+from urllib.parse import unquote
+from xml.etree import ElementTree
+
+from .cancellation import CancellationToken
+from .text_source import READ_BLOCK_SIZE, SEGMENT_CHARS, FileTextSource, split_sentences
+
+# Extensions handled here (anything else is read as plain text)
+DOCUMENT_EXTENSIONS = ('.epub', '.html', '.htm', '.xhtml', '.md', '.markdown')
+
+
+class DocumentSegment(NamedTuple):
+    """A piece of a document: 'chapter' (marker, text = title), 'heading' or 'paragraph'"""
+    kind: str
+    text: str
+    level: int = 0  # Heading level (1-6)
+
+
+# ----- HTML / XHTML -----
+
+_BLOCK_TAGS = {
+    'p', 'div', 'section', 'article', 'aside', 'header', 'footer', 'main',
+    'li', 'dt', 'dd', 'blockquote', 'pre', 'tr', 'caption', 'figcaption',
+    'table', 'ul', 'ol', 'dl', 'hr', 'body',
+}
+_HEADING_TAGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+_SKIP_TAGS = {'script', 'style', 'head', 'svg', 'math', 'noscript', 'template', 'rt', 'rp'}
+
+
+class _HTMLSegmenter(HTMLParser):
+    """Incremental HTML parser; completed segments collect in .segments"""
+
+    def __init__(self, h1_starts_chapter: bool = False):
+        super().__init__(convert_charrefs=True)
+        self.h1_starts_chapter = h1_starts_chapter
+        self.segments: List[DocumentSegment] = []
+        self._text: List[str] = []
+        self._skip_depth = 0
+        self._heading_level = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in _HEADING_TAGS:
+            self._flush()
+            self._heading_level = int(tag[1])
+        elif tag in _BLOCK_TAGS:
+            self._flush()
+        elif tag == 'br':
+            self._text.append(' ')
+
+    def handle_startendtag(self, tag, attrs):
+        # <br/>, <hr/>, <img/>...: never opens a skipped region
+        if tag not in _SKIP_TAGS:
+            self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in _HEADING_TAGS:
+            self._flush()
+            self._heading_level = 0
+        elif tag in _BLOCK_TAGS:
+            self._flush()
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self._text.append(data)
+
+    def close(self):
+        super().close()
+        self._flush()
+
+    def _flush(self):
+        text = ' '.join(''.join(self._text).split())
+        self._text = []
+        if not text:
+            return
+        if self._heading_level:
+            if self._heading_level == 1 and self.h1_starts_chapter:
+                self.segments.append(DocumentSegment('chapter', text))
+            self.segments.append(DocumentSegment('heading', text, self._heading_level))
+        else:
+            self.segments.append(DocumentSegment('paragraph', text))
+
+
+def _sniff_encoding(head: bytes, default: str = 'utf-8') -> str:
+    """Charset from a BOM, XML declaration or <meta> tag in the first bytes"""
+    if head.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return 'utf-16'
+    match = re.search(rb'''(?:charset|encoding)\s*=\s*["']?([\w.:-]+)''', head[:2048], re.IGNORECASE)
+    if match:
+        try:
+            return codecs.lookup(match.group(1).decode('ascii')).name
+        except LookupError:
+            pass
+    return default
+
+
+def _parse_html_stream(
+    stream: BinaryIO,
+    h1_starts_chapter: bool,
+    on_block: Optional[Callable[[int], None]] = None
+) -> Iterator[DocumentSegment]:
+    """Feed a binary HTML stream to the parser block by block, yielding segments as they complete"""
+    parser = _HTMLSegmenter(h1_starts_chapter)
+    decoder = None
+    while True:
+        raw = stream.read(READ_BLOCK_SIZE)
+        if decoder is None:
+            decoder = codecs.getincrementaldecoder(_sniff_encoding(raw))(errors='replace')
+        if on_block:
+            on_block(len(raw))
+        if not raw:
+            parser.feed(decoder.decode(b'', final=True))
+            parser.close()
+        else:
+            parser.feed(decoder.decode(raw))
+        yield from parser.segments
+        parser.segments.clear()
+        if not raw:
+            return
+
+
+def iter_html(path: str, on_block: Optional[Callable[[int], None]] = None) -> Iterator[DocumentSegment]:
+    """Segments of an HTML file; every <h1> also starts a chapter"""
+    with open(path, 'rb') as f:
+        yield from _parse_html_stream(f, h1_starts_chapter=True, on_block=on_block)
+
+
+# ----- EPUB -----
+
+_CONTAINER = 'META-INF/container.xml'
+
+
+def _local(tag: str) -> str:
+    """'{namespace}item' -> 'item'"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def _epub_spine(zf: zipfile.ZipFile) -> Tuple[List[str], Dict[str, str]]:
+    """Content documents in reading order, and chapter titles by document (from the NCX/nav TOC)"""
+    container = ElementTree.fromstring(zf.read(_CONTAINER))
+    rootfile = next(el for el in container.iter() if _local(el.tag) == 'rootfile')
+    opf_path = rootfile.get('full-path')
+    opf_dir = posixpath.dirname(opf_path)
+    opf = ElementTree.fromstring(zf.read(opf_path))
+
+    manifest: Dict[str, Tuple[str, str, str]] = {}
+    spine_ids: List[str] = []
+    toc_id = None
+    for el in opf.iter():
+        tag = _local(el.tag)
+        if tag == 'item':
+            href = posixpath.normpath(posixpath.join(opf_dir, unquote(el.get('href', ''))))
+            manifest[el.get('id')] = (href, el.get('media-type', ''), el.get('properties', ''))
+        elif tag == 'spine':
+            toc_id = el.get('toc')
+        elif tag == 'itemref' and el.get('linear', 'yes') != 'no':
+            spine_ids.append(el.get('idref'))
+
+    documents = [manifest[i][0] for i in spine_ids if i in manifest]
+
+    titles: Dict[str, str] = {}
+    nav = next((href for href, _, props in manifest.values() if 'nav' in props.split()), None)
+    ncx = manifest.get(toc_id, (None,))[0] if toc_id else None
+    try:
+        if ncx:
+            # EPUB 2: <navPoint><navLabel><text>Title</text></navLabel><content src="ch1.xhtml#x"/>
+            root = ElementTree.fromstring(zf.read(ncx))
+            base = posixpath.dirname(ncx)
+            for point in (el for el in root.iter() if _local(el.tag) == 'navPoint'):
+                label = next((el.text for el in point.iter() if _local(el.tag) == 'text'), None)
+                content = next((el for el in point if _local(el.tag) == 'content'), None)
+                if label and content is not None:
+                    href = posixpath.normpath(posixpath.join(base, unquote(content.get('src', '').split('#')[0])))
+                    titles.setdefault(href, ' '.join(label.split()))
+        elif nav:
+            # EPUB 3: <nav epub:type="toc"><ol><li><a href="ch1.xhtml">Title</a>
+            root = ElementTree.fromstring(zf.read(nav))
+            base = posixpath.dirname(nav)
+            for link in (el for el in root.iter() if _local(el.tag) == 'a' and el.get('href')):
+                label = ' '.join(''.join(link.itertext()).split())
+                href = posixpath.normpath(posixpath.join(base, unquote(link.get('href').split('#')[0])))
+                if label:
+                    titles.setdefault(href, label)
+    except (KeyError, ElementTree.ParseError):
+        pass  # No usable TOC: chapters go untitled
+    return documents, titles
+
+
+def iter_epub(path: str, on_block: Optional[Callable[[int], None]] = None) -> Iterator[DocumentSegment]:
+    """Segments of an EPUB: a 'chapter' marker per spine document, then its text"""
+    with zipfile.ZipFile(path) as zf:
+        documents, titles = _epub_spine(zf)
+        for number, name in enumerate(documents, 1):
+            try:
+                stream = zf.open(name)
+            except KeyError:
+                continue  # Broken manifest entry
+            yield DocumentSegment('chapter', titles.get(name, f"Chapter {number}"))
+            with stream:
+                # XHTML read straight out of the zip, decompressed block by block
+                yield from _parse_html_stream(stream, h1_starts_chapter=False, on_block=on_block)
+
+
+# ----- Markdown -----
+
+_MD_HEADING = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+_MD_SETEXT = re.compile(r'^(=+|-+)\s*$')
+_MD_FENCE = re.compile(r'^\s*(```|~~~)')
+_MD_RULE = re.compile(r'^\s*([-*_])(?:\s*\1){2,}\s*$')
+_MD_REFERENCE = re.compile(r'^\s*\[[^\]]+\]:\s*\S+')
+_MD_TABLE_RULE = re.compile(r'^[\s|:-]+$')
+_MD_LIST_ITEM = re.compile(r'^\s*(?:>\s*)*(?:[-*+]|\d+[.)])\s')
+_MD_LINE_PREFIX = re.compile(r'^\s*(?:>\s*)*(?:(?:[-*+]|\d+[.)])\s+(?:\[[ xX]\]\s+)?)?')
+_MD_INLINE = (
+    (re.compile(r'!\[[^\]]*\]\([^)]*\)'), ''),                # images
+    (re.compile(r'\[([^\]]+)\]\([^)]*\)'), r'\1'),             # [text](url)
+    (re.compile(r'\[([^\]]+)\]\[[^\]]*\]'), r'\1'),            # [text][ref]
+    (re.compile(r'`([^`]*)`'), r'\1'),                         # `code`
+    (re.compile(r'(\*\*|__|\*|_|~~)(?=\S)(.+?)(?<=\S)\1'), r'\2'),  # emphasis
+    (re.compile(r'<[^>]+>'), ''),                              # inline HTML
+)
+
+
+def _md_inline(text: str) -> str:
+    for pattern, replacement in _MD_INLINE:
+        text = pattern.sub(replacement, text)
+    return ' '.join(text.replace('|', ' ').split())
+
+
+def iter_markdown(path: str, on_block: Optional[Callable[[int], None]] = None) -> Iterator[DocumentSegment]:
+    """Segments of a Markdown file, line by line; '# ' headings also start chapters"""
+    paragraph: List[str] = []
+    in_fence = False
+
+    def flush():
+        text = _md_inline(' '.join(paragraph))
+        paragraph.clear()
+        return [DocumentSegment('paragraph', text)] if text else []
+
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        first = True
+        in_front_matter = False
+        for line in f:
+            if on_block:
+                on_block(len(line.encode('utf-8')))
+            stripped = line.strip()
+            if first:
+                first = False
+                if stripped == '---':
+                    in_front_matter = True  # YAML front matter
+                    continue
+            if in_front_matter:
+                in_front_matter = stripped not in ('---', '...')
+                continue
+            if _MD_FENCE.match(line):
+                in_fence = not in_fence  # Code blocks aren't read aloud
+                yield from flush()
+                continue
+            if in_fence:
+                continue
+
+            heading = _MD_HEADING.match(stripped)
+            setext = _MD_SETEXT.match(stripped) if len(paragraph) == 1 else None
+            if heading or setext:
+                if heading:
+                    yield from flush()
+                    level, text = len(heading.group(1)), _md_inline(heading.group(2))
+                else:
+                    level, text = (1 if stripped[0] == '=' else 2), _md_inline(paragraph.pop())
+                if text:
+                    if level == 1:
+                        yield DocumentSegment('chapter', text)
+                    yield DocumentSegment('heading', text, level)
+            elif not stripped or _MD_RULE.match(stripped):
+                yield from flush()
+            elif _MD_REFERENCE.match(stripped) or ('|' in stripped and _MD_TABLE_RULE.match(stripped)):
+                continue
+            else:
+                if _MD_LIST_ITEM.match(line):
+                    yield from flush()  # Each list item is its own paragraph
+                paragraph.append(_MD_LINE_PREFIX.sub('', line, count=1).strip())
+    yield from flush()
+
+
+_READERS = {
+    '.epub': iter_epub,
+    '.html': iter_html,
+    '.htm': iter_html,
+    '.xhtml': iter_html,
+    '.md': iter_markdown,
+    '.markdown': iter_markdown,
+}
+
+
+def iter_document(path: str, on_block: Optional[Callable[[int], None]] = None) -> Iterator[DocumentSegment]:
+    """Structural segments of an EPUB, HTML or Markdown file (by extension)"""
+    reader = _READERS.get(Path(path).suffix.lower())
+    if reader is None:
+        raise ValueError(f"Unsupported document type: {Path(path).suffix}")
+    return reader(path, on_block)
+
+
+# ----- pipeline adapter -----
+
+def _spoken(segment: DocumentSegment) -> str:
+    """Text to speak; headings get a full stop so the voice pauses after them"""
+    text = segment.text
+    if segment.kind == 'heading' and text[-1:].isalnum():
+        text += '.'
+    return text
+
+
+class DocumentTextSource:
+    """
+    FileTextSource-compatible source for EPUB/HTML/Markdown files.
+
+    iter_segments() packs paragraphs into segments of about segment_chars
+    (splitting very long paragraphs at sentence ends) and never lets a
+    segment cross a chapter boundary.
+    """
+
+    def __init__(self, path: str, segment_chars: int = SEGMENT_CHARS):
+        self.path = Path(path)
+        self.segment_chars = segment_chars
+        self.size_bytes = self.path.stat().st_size
+
+        self.char_count: Optional[int] = None
+        self.word_count: Optional[int] = None
+        self.chapter_titles: Optional[List[str]] = None
+
+    @property
+    def name(self) -> str:
+        return self.path.name
+
+    @property
+    def stats_ready(self) -> bool:
+        return self.char_count is not None
+
+    def iter_structure(self, cancel_token: Optional[CancellationToken] = None) -> Iterator[DocumentSegment]:
+        for segment in iter_document(str(self.path)):
+            if cancel_token:
+                cancel_token.raise_if_cancelled()
+            yield segment
+
+    def iter_segments(self, cancel_token: Optional[CancellationToken] = None) -> Iterator[str]:
+        """Spoken text in segments of about segment_chars, paragraph-aligned"""
+        buffer: List[str] = []
+        size = 0
+        for segment in self.iter_structure(cancel_token):
+            if segment.kind == 'chapter':
+                if buffer:
+                    yield from split_sentences("\n\n".join(buffer), self.segment_chars)
+                    buffer, size = [], 0
+                continue
+            text = _spoken(segment)
+            buffer.append(text)
+            size += len(text) + 2
+            if size >= self.segment_chars:
+                yield from split_sentences("\n\n".join(buffer), self.segment_chars)
+                buffer, size = [], 0
+        if buffer:
+            yield from split_sentences("\n\n".join(buffer), self.segment_chars)
+
+    def preview(self, max_chars: int = 5000) -> str:
+        """The beginning of the document as text (headings on their own lines)"""
+        parts: List[str] = []
+        size = 0
+        for segment in self.iter_structure():
+            if segment.kind == 'chapter':
+                continue
+            parts.append(segment.text)
+            size += len(segment.text) + 2
+            if size >= max_chars:
+                break
+        return "\n\n".join(parts)[:max_chars]
+
+    def write_text(self, path: str, cancel_token: Optional[CancellationToken] = None):
+        """
+        Write the document as plain text, streaming: chapters become
+        "# Title" lines so find_chapters() splits the text the same way
+        """
+        last_chapter = None
+        with open(path, 'w', encoding='utf-8') as f:
+            for segment in self.iter_structure(cancel_token):
+                if segment.kind == 'chapter':
+                    f.write(f"# {segment.text}\n\n")
+                elif segment.kind == 'heading' and segment.level == 1 and segment.text == last_chapter:
+                    continue  # Already written as the chapter line
+                else:
+                    f.write(_spoken(segment) + "\n\n")
+                last_chapter = segment.text if segment.kind == 'chapter' else None
+
+    def compute_stats(
+        self,
+        progress_callback: Optional[Callable[[int, int, float], None]] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> Tuple[int, int]:
+        """Count spoken characters and words in one streaming pass"""
+        chars = 0
+        words = 0
+        chapters: List[str] = []
+        bytes_read = [0]
+
+        def on_block(nbytes):
+            bytes_read[0] += nbytes
+
+        for segment in iter_document(str(self.path), on_block):
+            if cancel_token:
+                cancel_token.raise_if_cancelled()
+            if segment.kind == 'chapter':
+                chapters.append(segment.text)
+                continue
+            chars += len(segment.text)
+            words += len(segment.text.split())
+            if progress_callback and segment.kind == 'paragraph':
+                # EPUB counts uncompressed bytes, so the fraction is approximate
+                fraction = min(1.0, bytes_read[0] / self.size_bytes) if self.size_bytes else 1.0
+                progress_callback(chars, words, min(fraction, 0.99))
+
+        self.char_count = chars
+        self.word_count = words
+        self.chapter_titles = chapters
+        if progress_callback:
+            progress_callback(chars, words, 1.0)
+        return chars, words
+
+
+def open_text_source(path: str):
+    """DocumentTextSource for EPUB/HTML/Markdown, FileTextSource for anything else"""
+    if Path(path).suffix.lower() in DOCUMENT_EXTENSIONS:
+        return DocumentTextSource(path)
+    return FileTextSource(path)
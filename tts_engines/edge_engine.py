@@ -3,13 +3,398 @@ Edge TTS Engine - Microsoft Edge Neural Voices (Online)
 """
 
 import asyncio
-from typing import Dict, Optional
+import threading
+from typing import Callable, Dict, Iterable, List, Optional
 from .base_engine import BaseTTSEngine
+from .cancellation import CancellationToken, GenerationCancelled
+from .retry import RetryPolicy, is_transient_error
+from .text_source import split_sentences
+from .voice_catalog import EdgeVoiceCatalog
+
+# Text per websocket request in resilient mode; a dropped connection
+# costs at most one chunk of audio
+RESUME_CHUNK_CHARS = 800
+
+
+# Hand-maintained voice table: offline fallback for the catalog and source
+# of the curated descriptions
+BUNDLED_VOICES = {
+    # English voices
+    'English (US)': {
+        'en-US-JennyNeural': 'Jenny - Female, Friendly',
+        'en-US-GuyNeural': 'Guy - Male, Professional',
+        'en-US-AriaNeural': 'Aria - Female, Natural',
+        'en-US-DavisNeural': 'Davis - Male, Calm',
+        'en-US-AmberNeural': 'Amber - Female, Warm',
+        'en-US-AnaNeural': 'Ana - Female, Child',
+        'en-US-AndrewNeural': 'Andrew - Male, Warm',
+        'en-US-EmmaNeural': 'Emma - Female, Clear',
+        'en-US-BrianNeural': 'Brian - Male, Casual',
+        'en-US-ChristopherNeural': 'Christopher - Male, Authoritative',
+        'en-US-EricNeural': 'Eric - Male, Friendly',
+        'en-US-MichelleNeural': 'Michelle - Female, Professional',
+        'en-US-RogerNeural': 'Roger - Male, Elderly',
+        'en-US-SteffanNeural': 'Steffan - Male, News',
+    },
+    'English (UK)': {
+        'en-GB-SoniaNeural': 'Sonia - Female, British',
+        'en-GB-RyanNeural': 'Ryan - Male, British',
+        'en-GB-LibbyNeural': 'Libby - Female, British Warm',
+        'en-GB-MaisieNeural': 'Maisie - Female, Child',
+        'en-GB-ThomasNeural': 'Thomas - Male, British Friendly',
+    },
+    'English (Australia)': {
+        'en-AU-NatashaNeural': 'Natasha - Female, Australian',
+        'en-AU-WilliamNeural': 'William - Male, Australian',
+    },
+    'English (India)': {
+        'en-IN-NeerjaNeural': 'Neerja - Female, Indian',
+        'en-IN-PrabhatNeural': 'Prabhat - Male, Indian',
+    },
+    'English (Other)': {
+        'en-CA-ClaraNeural': 'Clara - Female, Canadian',
+        'en-CA-LiamNeural': 'Liam - Male, Canadian',
+        'en-IE-EmilyNeural': 'Emily - Female, Irish',
+        'en-IE-ConnorNeural': 'Connor - Male, Irish',
+        'en-NZ-MollyNeural': 'Molly - Female, New Zealand',
+        'en-NZ-MitchellNeural': 'Mitchell - Male, New Zealand',
+        'en-ZA-LeahNeural': 'Leah - Female, South African',
+        'en-ZA-LukeNeural': 'Luke - Male, South African',
+    },
+    # French voices
+    'French': {
+        'fr-FR-DeniseNeural': 'Denise - Female, French',
+        'fr-FR-HenriNeural': 'Henri - Male, French',
+        'fr-FR-EloiseNeural': 'Eloise - Female, Child',
+        'fr-CA-SylvieNeural': 'Sylvie - Female, Canadian French',
+        'fr-CA-JeanNeural': 'Jean - Male, Canadian French',
+        'fr-CA-AntoineNeural': 'Antoine - Male, Canadian French',
+        'fr-BE-CharlineNeural': 'Charline - Female, Belgian French',
+        'fr-BE-GerardNeural': 'Gerard - Male, Belgian French',
+        'fr-CH-ArianeNeural': 'Ariane - Female, Swiss French',
+        'fr-CH-FabriceNeural': 'Fabrice - Male, Swiss French',
+    },
+    # Spanish voices
+    'Spanish': {
+        'es-ES-ElviraNeural': 'Elvira - Female, Spanish',
+        'es-ES-AlvaroNeural': 'Alvaro - Male, Spanish',
+        'es-MX-DaliaNeural': 'Dalia - Female, Mexican',
+        'es-MX-JorgeNeural': 'Jorge - Male, Mexican',
+        'es-AR-ElenaNeural': 'Elena - Female, Argentine',
+        'es-AR-TomasNeural': 'Tomas - Male, Argentine',
+        'es-CO-SalomeNeural': 'Salome - Female, Colombian',
+        'es-CO-GonzaloNeural': 'Gonzalo - Male, Colombian',
+        'es-US-PalomaNeural': 'Paloma - Female, US Spanish',
+        'es-US-AlonsoNeural': 'Alonso - Male, US Spanish',
+    },
+    # German voices
+    'German': {
+        'de-DE-KatjaNeural': 'Katja - Female, German',
+        'de-DE-ConradNeural': 'Conrad - Male, German',
+        'de-DE-AmalaNeural': 'Amala - Female, Warm',
+        'de-DE-KillianNeural': 'Killian - Male, Friendly',
+        'de-AT-IngridNeural': 'Ingrid - Female, Austrian',
+        'de-AT-JonasNeural': 'Jonas - Male, Austrian',
+        'de-CH-LeniNeural': 'Leni - Female, Swiss German',
+        'de-CH-JanNeural': 'Jan - Male, Swiss German',
+    },
+    # Italian voices
+    'Italian': {
+        'it-IT-ElsaNeural': 'Elsa - Female, Italian',
+        'it-IT-DiegoNeural': 'Diego - Male, Italian',
+        'it-IT-IsabellaNeural': 'Isabella - Female, Warm',
+        'it-IT-GiuseppeNeural': 'Giuseppe - Male, Friendly',
+    },
+    # Portuguese voices
+    'Portuguese': {
+        'pt-BR-FranciscaNeural': 'Francisca - Female, Brazilian',
+        'pt-BR-AntonioNeural': 'Antonio - Male, Brazilian',
+        'pt-BR-ThalitaNeural': 'Thalita - Female, Warm',
+        'pt-PT-RaquelNeural': 'Raquel - Female, Portuguese',
+        'pt-PT-DuarteNeural': 'Duarte - Male, Portuguese',
+    },
+    # Russian voices
+    'Russian': {
+        'ru-RU-SvetlanaNeural': 'Svetlana - Female, Russian',
+        'ru-RU-DmitryNeural': 'Dmitry - Male, Russian',
+        'ru-RU-DariyaNeural': 'Dariya - Female, Warm',
+    },
+    # Chinese voices
+    'Chinese': {
+        'zh-CN-XiaoxiaoNeural': 'Xiaoxiao - Female, Mandarin',
+        'zh-CN-YunxiNeural': 'Yunxi - Male, Mandarin',
+        'zh-CN-YunjianNeural': 'Yunjian - Male, Narrator',
+        'zh-CN-XiaoyiNeural': 'Xiaoyi - Female, Friendly',
+        'zh-TW-HsiaoChenNeural': 'HsiaoChen - Female, Taiwanese',
+        'zh-TW-YunJheNeural': 'YunJhe - Male, Taiwanese',
+        'zh-HK-HiuMaanNeural': 'HiuMaan - Female, Cantonese',
+        'zh-HK-WanLungNeural': 'WanLung - Male, Cantonese',
+    },
+    # Japanese voices
+    'Japanese': {
+        'ja-JP-NanamiNeural': 'Nanami - Female, Japanese',
+        'ja-JP-KeitaNeural': 'Keita - Male, Japanese',
+        'ja-JP-AoiNeural': 'Aoi - Female, Child',
+        'ja-JP-DaichiNeural': 'Daichi - Male, Friendly',
+    },
+    # Korean voices
+    'Korean': {
+        'ko-KR-SunHiNeural': 'SunHi - Female, Korean',
+        'ko-KR-InJoonNeural': 'InJoon - Male, Korean',
+        'ko-KR-BongJinNeural': 'BongJin - Male, Friendly',
+        'ko-KR-GookMinNeural': 'GookMin - Male, Narrator',
+    },
+    # Arabic voices
+    'Arabic': {
+        'ar-SA-ZariyahNeural': 'Zariyah - Female, Saudi',
+        'ar-SA-HamedNeural': 'Hamed - Male, Saudi',
+        'ar-EG-SalmaNeural': 'Salma - Female, Egyptian',
+        'ar-EG-ShakirNeural': 'Shakir - Male, Egyptian',
+        'ar-AE-FatimaNeural': 'Fatima - Female, UAE',
+        'ar-AE-HamdanNeural': 'Hamdan - Male, UAE',
+    },
+    # Hindi voices
+    'Hindi': {
+        'hi-IN-SwaraNeural': 'Swara - Female, Hindi',
+        'hi-IN-MadhurNeural': 'Madhur - Male, Hindi',
+    },
+    # Dutch voices
+    'Dutch': {
+        'nl-NL-ColetteNeural': 'Colette - Female, Dutch',
+        'nl-NL-MaartenNeural': 'Maarten - Male, Dutch',
+        'nl-BE-DenaNeural': 'Dena - Female, Belgian Dutch',
+        'nl-BE-ArnaudNeural': 'Arnaud - Male, Belgian Dutch',
+    },
+    # Polish voices
+    'Polish': {
+        'pl-PL-AgnieszkaNeural': 'Agnieszka - Female, Polish',
+        'pl-PL-MarekNeural': 'Marek - Male, Polish',
+        'pl-PL-ZofiaNeural': 'Zofia - Female, Warm',
+    },
+    # Turkish voices
+    'Turkish': {
+        'tr-TR-EmelNeural': 'Emel - Female, Turkish',
+        'tr-TR-AhmetNeural': 'Ahmet - Male, Turkish',
+    },
+    # Vietnamese voices
+    'Vietnamese': {
+        'vi-VN-HoaiMyNeural': 'HoaiMy - Female, Vietnamese',
+        'vi-VN-NamMinhNeural': 'NamMinh - Male, Vietnamese',
+    },
+    # Thai voices
+    'Thai': {
+        'th-TH-PremwadeeNeural': 'Premwadee - Female, Thai',
+        'th-TH-NiwatNeural': 'Niwat - Male, Thai',
+    },
+    # Greek voices
+    'Greek': {
+        'el-GR-AthinaNeural': 'Athina - Female, Greek',
+        'el-GR-NestorasNeural': 'Nestoras - Male, Greek',
+    },
+    # Czech voices
+    'Czech': {
+        'cs-CZ-VlastaNeural': 'Vlasta - Female, Czech',
+        'cs-CZ-AntoninNeural': 'Antonin - Male, Czech',
+    },
+    # Romanian voices
+    'Romanian': {
+        'ro-RO-AlinaNeural': 'Alina - Female, Romanian',
+        'ro-RO-EmilNeural': 'Emil - Male, Romanian',
+    },
+    # Hungarian voices
+    'Hungarian': {
+        'hu-HU-NoemiNeural': 'Noemi - Female, Hungarian',
+        'hu-HU-TamasNeural': 'Tamas - Male, Hungarian',
+    },
+    # Danish voices
+    'Danish': {
+        'da-DK-ChristelNeural': 'Christel - Female, Danish',
+        'da-DK-JeppeNeural': 'Jeppe - Male, Danish',
+    },
+    # Finnish voices
+    'Finnish': {
+        'fi-FI-SelmaNeural': 'Selma - Female, Finnish',
+        'fi-FI-HarriNeural': 'Harri - Male, Finnish',
+    },
+    # Norwegian voices
+    'Norwegian': {
+        'nb-NO-PernilleNeural': 'Pernille - Female, Norwegian',
+        'nb-NO-FinnNeural': 'Finn - Male, Norwegian',
+    },
+    # Swedish voices
+    'Swedish': {
+        'sv-SE-SofieNeural': 'Sofie - Female, Swedish',
+        'sv-SE-MattiasNeural': 'Mattias - Male, Swedish',
+    },
+    # Ukrainian voices
+    'Ukrainian': {
+        'uk-UA-PolinaNeural': 'Polina - Female, Ukrainian',
+        'uk-UA-OstapNeural': 'Ostap - Male, Ukrainian',
+    },
+    # Hebrew voices
+    'Hebrew': {
+        'he-IL-HilaNeural': 'Hila - Female, Hebrew',
+        'he-IL-AvriNeural': 'Avri - Male, Hebrew',
+    },
+    # Indonesian voices
+    'Indonesian': {
+        'id-ID-GadisNeural': 'Gadis - Female, Indonesian',
+        'id-ID-ArdiNeural': 'Ardi - Male, Indonesian',
+    },
+    # Malay voices
+    'Malay': {
+        'ms-MY-YasminNeural': 'Yasmin - Female, Malay',
+        'ms-MY-OsmanNeural': 'Osman - Male, Malay',
+    },
+    # Filipino voices
+    'Filipino': {
+        'fil-PH-BlessicaNeural': 'Blessica - Female, Filipino',
+        'fil-PH-AngeloNeural': 'Angelo - Male, Filipino',
+    },
+    # Slovak voices
+    'Slovak': {
+        'sk-SK-ViktoriaNeural': 'Viktoria - Female, Slovak',
+        'sk-SK-LukasNeural': 'Lukas - Male, Slovak',
+    },
+    # Slovenian voices
+    'Slovenian': {
+        'sl-SI-PetraNeural': 'Petra - Female, Slovenian',
+        'sl-SI-RokNeural': 'Rok - Male, Slovenian',
+    },
+    # Croatian voices
+    'Croatian': {
+        'hr-HR-GabrijelaNeural': 'Gabrijela - Female, Croatian',
+        'hr-HR-SreckoNeural': 'Srecko - Male, Croatian',
+    },
+    # Bulgarian voices
+    'Bulgarian': {
+        'bg-BG-KalinaNeural': 'Kalina - Female, Bulgarian',
+        'bg-BG-BorislavNeural': 'Borislav - Male, Bulgarian',
+    },
+    # Serbian voices
+    'Serbian': {
+        'sr-RS-SophieNeural': 'Sophie - Female, Serbian',
+        'sr-RS-NicholasNeural': 'Nicholas - Male, Serbian',
+    },
+    # Catalan voices
+    'Catalan': {
+        'ca-ES-JoanaNeural': 'Joana - Female, Catalan',
+        'ca-ES-EnricNeural': 'Enric - Male, Catalan',
+    },
+    # Welsh voices
+    'Welsh': {
+        'cy-GB-NiaNeural': 'Nia - Female, Welsh',
+        'cy-GB-AledNeural': 'Aled - Male, Welsh',
+    },
+    # Irish voices
+    'Irish': {
+        'ga-IE-OrlaNeural': 'Orla - Female, Irish',
+        'ga-IE-ColmNeural': 'Colm - Male, Irish',
+    },
+    # Icelandic voices
+    'Icelandic': {
+        'is-IS-GudrunNeural': 'Gudrun - Female, Icelandic',
+        'is-IS-GunnarNeural': 'Gunnar - Male, Icelandic',
+    },
+    # Latvian voices
+    'Latvian': {
+        'lv-LV-EveritaNeural': 'Everita - Female, Latvian',
+        'lv-LV-NilsNeural': 'Nils - Male, Latvian',
+    },
+    # Lithuanian voices
+    'Lithuanian': {
+        'lt-LT-OnaNeural': 'Ona - Female, Lithuanian',
+        'lt-LT-LeonasNeural': 'Leonas - Male, Lithuanian',
+    },
+    # Estonian voices
+    'Estonian': {
+        'et-EE-AnuNeural': 'Anu - Female, Estonian',
+        'et-EE-KertNeural': 'Kert - Male, Estonian',
+    },
+    # Georgian voices
+    'Georgian': {
+        'ka-GE-EkaNeural': 'Eka - Female, Georgian',
+        'ka-GE-GiorgiNeural': 'Giorgi - Male, Georgian',
+    },
+    # Kazakh voices
+    'Kazakh': {
+        'kk-KZ-AigulNeural': 'Aigul - Female, Kazakh',
+        'kk-KZ-DauletNeural': 'Daulet - Male, Kazakh',
+    },
+    # Nepali voices
+    'Nepali': {
+        'ne-NP-HemkalaNeural': 'Hemkala - Female, Nepali',
+        'ne-NP-SagarNeural': 'Sagar - Male, Nepali',
+    },
+    # Bengali voices
+    'Bengali': {
+        'bn-BD-NabanitaNeural': 'Nabanita - Female, Bengali',
+        'bn-BD-PradeepNeural': 'Pradeep - Male, Bengali',
+        'bn-IN-TanishaaNeural': 'Tanishaa - Female, Bengali (India)',
+        'bn-IN-BashkarNeural': 'Bashkar - Male, Bengali (India)',
+    },
+    # Tamil voices
+    'Tamil': {
+        'ta-IN-PallaviNeural': 'Pallavi - Female, Tamil',
+        'ta-IN-ValluvarNeural': 'Valluvar - Male, Tamil',
+    },
+    # Telugu voices
+    'Telugu': {
+        'te-IN-ShrutiNeural': 'Shruti - Female, Telugu',
+        'te-IN-MohanNeural': 'Mohan - Male, Telugu',
+    },
+    # Swahili voices
+    'Swahili': {
+        'sw-KE-ZuriNeural': 'Zuri - Female, Swahili',
+        'sw-KE-RafikiNeural': 'Rafiki - Male, Swahili',
+    },
+    # Afrikaans voices
+    'Afrikaans': {
+        'af-ZA-AdriNeural': 'Adri - Female, Afrikaans',
+        'af-ZA-WillemNeural': 'Willem - Male, Afrikaans',
+    },
+}
+
+_shared_catalog: Optional[EdgeVoiceCatalog] = None
+_shared_catalog_lock = threading.Lock()
+
+
+def shared_voice_catalog() -> EdgeVoiceCatalog:
+    """Process-wide catalog shared by every EdgeTTSEngine instance"""
+    global _shared_catalog
+    with _shared_catalog_lock:
+        if _shared_catalog is None:
+            _shared_catalog = EdgeVoiceCatalog(BUNDLED_VOICES)
+        return _shared_catalog
 
 
 class EdgeTTSEngine(BaseTTSEngine):
     """Edge TTS engine using Microsoft Edge Neural Voices"""
 
+    def __init__(
+        self,
+        resilient: bool = True,
+        retry_policy: Optional[RetryPolicy] = None,
+        communicate_factory: Optional[Callable] = None,
+        catalog: Optional[EdgeVoiceCatalog] = None
+    ):
+        """
+        Args:
+            resilient: Send text in sentence-aligned chunks and, on a transient
+                       failure, retry from the last completed chunk with
+                       backoff instead of failing the whole job
+            retry_policy: Backoff settings (default: RetryPolicy())
+            communicate_factory: Replacement for edge_tts.Communicate, e.g. a
+                                 FlakyEdgeService (tests/fault_injection.py)
+            catalog: Voice catalog (default: the shared on-disk cached one)
+        """
+        self.resilient = resilient
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.communicate_factory = communicate_factory
+        self.catalog = catalog or shared_voice_catalog()
+        # Characters of the current job already saved to the output file
+        self.rendered_chars = 0
+
     @property
     def name(self) -> str:
         return "Edge TTS (Online)"
@@ -19,343 +404,12 @@ class EdgeTTSEngine(BaseTTSEngine):
         return True
 
     def get_voices(self) -> Dict[str, Dict[str, str]]:
-        """Get Edge TTS voices organized by category"""
-        return {
-            # English voices
-            'English (US)': {
-                'en-US-JennyNeural': 'Jenny - Female, Friendly',
-                'en-US-GuyNeural': 'Guy - Male, Professional',
-                'en-US-AriaNeural': 'Aria - Female, Natural',
-                'en-US-DavisNeural': 'Davis - Male, Calm',
-                'en-US-AmberNeural': 'Amber - Female, Warm',
-                'en-US-AnaNeural': 'Ana - Female, Child',
-                'en-US-AndrewNeural': 'Andrew - Male, Warm',
-                'en-US-EmmaNeural': 'Emma - Female, Clear',
-                'en-US-BrianNeural': 'Brian - Male, Casual',
-                'en-US-ChristopherNeural': 'Christopher - Male, Authoritative',
-                'en-US-EricNeural': 'Eric - Male, Friendly',
-                'en-US-MichelleNeural': 'Michelle - Female, Professional',
-                'en-US-RogerNeural': 'Roger - Male, Elderly',
-                'en-US-SteffanNeural': 'Steffan - Male, News',
-            },
-            'English (UK)': {
-                'en-GB-SoniaNeural': 'Sonia - Female, British',
-                'en-GB-RyanNeural': 'Ryan - Male, British',
-                'en-GB-LibbyNeural': 'Libby - Female, British Warm',
-                'en-GB-MaisieNeural': 'Maisie - Female, Child',
-                'en-GB-ThomasNeural': 'Thomas - Male, British Friendly',
-            },
-            'English (Australia)': {
-                'en-AU-NatashaNeural': 'Natasha - Female, Australian',
-                'en-AU-WilliamNeural': 'William - Male, Australian',
-            },
-            'English (India)': {
-                'en-IN-NeerjaNeural': 'Neerja - Female, Indian',
-                'en-IN-PrabhatNeural': 'Prabhat - Male, Indian',
-            },
-            'English (Other)': {
-                'en-CA-ClaraNeural': 'Clara - Female, Canadian',
-                'en-CA-LiamNeural': 'Liam - Male, Canadian',
-                'en-IE-EmilyNeural': 'Emily - Female, Irish',
-                'en-IE-ConnorNeural': 'Connor - Male, Irish',
-                'en-NZ-MollyNeural': 'Molly - Female, New Zealand',
-                'en-NZ-MitchellNeural': 'Mitchell - Male, New Zealand',
-                'en-ZA-LeahNeural': 'Leah - Female, South African',
-                'en-ZA-LukeNeural': 'Luke - Male, South African',
-            },
-            # French voices
-            'French': {
-                'fr-FR-DeniseNeural': 'Denise - Female, French',
-                'fr-FR-HenriNeural': 'Henri - Male, French',
-                'fr-FR-EloiseNeural': 'Eloise - Female, Child',
-                'fr-CA-SylvieNeural': 'Sylvie - Female, Canadian French',
-                'fr-CA-JeanNeural': 'Jean - Male, Canadian French',
-                'fr-CA-AntoineNeural': 'Antoine - Male, Canadian French',
-                'fr-BE-CharlineNeural': 'Charline - Female, Belgian French',
-                'fr-BE-GerardNeural': 'Gerard - Male, Belgian French',
-                'fr-CH-ArianeNeural': 'Ariane - Female, Swiss French',
-                'fr-CH-FabriceNeural': 'Fabrice - Male, Swiss French',
-            },
-            # Spanish voices
-            'Spanish': {
-                'es-ES-ElviraNeural': 'Elvira - Female, Spanish',
-                'es-ES-AlvaroNeural': 'Alvaro - Male, Spanish',
-                'es-MX-DaliaNeural': 'Dalia - Female, Mexican',
-                'es-MX-JorgeNeural': 'Jorge - Male, Mexican',
-                'es-AR-ElenaNeural': 'Elena - Female, Argentine',
-                'es-AR-TomasNeural': 'Tomas - Male, Argentine',
-                'es-CO-SalomeNeural': 'Salome - Female, Colombian',
-                'es-CO-GonzaloNeural': 'Gonzalo - Male, Colombian',
-                'es-US-PalomaNeural': 'Paloma - Female, US Spanish',
-                'es-US-AlonsoNeural': 'Alonso - Male, US Spanish',
-            },
-            # German voices
-            'German': {
-                'de-DE-KatjaNeural': 'Katja - Female, German',
-                'de-DE-ConradNeural': 'Conrad - Male, German',
-                'de-DE-AmalaNeural': 'Amala - Female, Warm',
-                'de-DE-KillianNeural': 'Killian - Male, Friendly',
-                'de-AT-IngridNeural': 'Ingrid - Female, Austrian',
-                'de-AT-JonasNeural': 'Jonas - Male, Austrian',
-                'de-CH-LeniNeural': 'Leni - Female, Swiss German',
-                'de-CH-JanNeural': 'Jan - Male, Swiss German',
-            },
-            # Italian voices
-            'Italian': {
-                'it-IT-ElsaNeural': 'Elsa - Female, Italian',
-                'it-IT-DiegoNeural': 'Diego - Male, Italian',
-                'it-IT-IsabellaNeural': 'Isabella - Female, Warm',
-                'it-IT-GiuseppeNeural': 'Giuseppe - Male, Friendly',
-            },
-            # Portuguese voices
-            'Portuguese': {
-                'pt-BR-FranciscaNeural': 'Francisca - Female, Brazilian',
-                'pt-BR-AntonioNeural': 'Antonio - Male, Brazilian',
-                'pt-BR-ThalitaNeural': 'Thalita - Female, Warm',
-                'pt-PT-RaquelNeural': 'Raquel - Female, Portuguese',
-                'pt-PT-DuarteNeural': 'Duarte - Male, Portuguese',
-            },
-            # Russian voices
-            'Russian': {
-                'ru-RU-SvetlanaNeural': 'Svetlana - Female, Russian',
-                'ru-RU-DmitryNeural': 'Dmitry - Male, Russian',
-                'ru-RU-DariyaNeural': 'Dariya - Female, Warm',
-            },
-            # Chinese voices
-            'Chinese': {
-                'zh-CN-XiaoxiaoNeural': 'Xiaoxiao - Female, Mandarin',
-                'zh-CN-YunxiNeural': 'Yunxi - Male, Mandarin',
-                'zh-CN-YunjianNeural': 'Yunjian - Male, Narrator',
-                'zh-CN-XiaoyiNeural': 'Xiaoyi - Female, Friendly',
-                'zh-TW-HsiaoChenNeural': 'HsiaoChen - Female, Taiwanese',
-                'zh-TW-YunJheNeural': 'YunJhe - Male, Taiwanese',
-                'zh-HK-HiuMaanNeural': 'HiuMaan - Female, Cantonese',
-                'zh-HK-WanLungNeural': 'WanLung - Male, Cantonese',
-            },
-            # Japanese voices
-            'Japanese': {
-                'ja-JP-NanamiNeural': 'Nanami - Female, Japanese',
-                'ja-JP-KeitaNeural': 'Keita - Male, Japanese',
-                'ja-JP-AoiNeural': 'Aoi - Female, Child',
-                'ja-JP-DaichiNeural': 'Daichi - Male, Friendly',
-            },
-            # Korean voices
-            'Korean': {
-                'ko-KR-SunHiNeural': 'SunHi - Female, Korean',
-                'ko-KR-InJoonNeural': 'InJoon - Male, Korean',
-                'ko-KR-BongJinNeural': 'BongJin - Male, Friendly',
-                'ko-KR-GookMinNeural': 'GookMin - Male, Narrator',
-            },
-            # Arabic voices
-            'Arabic': {
-                'ar-SA-ZariyahNeural': 'Zariyah - Female, Saudi',
-                'ar-SA-HamedNeural': 'Hamed - Male, Saudi',
-                'ar-EG-SalmaNeural': 'Salma - Female, Egyptian',
-                'ar-EG-ShakirNeural': 'Shakir - Male, Egyptian',
-                'ar-AE-FatimaNeural': 'Fatima - Female, UAE',
-                'ar-AE-HamdanNeural': 'Hamdan - Male, UAE',
-            },
-            # Hindi voices
-            'Hindi': {
-                'hi-IN-SwaraNeural': 'Swara - Female, Hindi',
-                'hi-IN-MadhurNeural': 'Madhur - Male, Hindi',
-            },
-            # Dutch voices
-            'Dutch': {
-                'nl-NL-ColetteNeural': 'Colette - Female, Dutch',
-                'nl-NL-MaartenNeural': 'Maarten - Male, Dutch',
-                'nl-BE-DenaNeural': 'Dena - Female, Belgian Dutch',
-                'nl-BE-ArnaudNeural': 'Arnaud - Male, Belgian Dutch',
-            },
-            # Polish voices
-            'Polish': {
-                'pl-PL-AgnieszkaNeural': 'Agnieszka - Female, Polish',
-                'pl-PL-MarekNeural': 'Marek - Male, Polish',
-                'pl-PL-ZofiaNeural': 'Zofia - Female, Warm',
-            },
-            # Turkish voices
-            'Turkish': {
-                'tr-TR-EmelNeural': 'Emel - Female, Turkish',
-                'tr-TR-AhmetNeural': 'Ahmet - Male, Turkish',
-            },
-            # Vietnamese voices
-            'Vietnamese': {
-                'vi-VN-HoaiMyNeural': 'HoaiMy - Female, Vietnamese',
-                'vi-VN-NamMinhNeural': 'NamMinh - Male, Vietnamese',
-            },
-            # Thai voices
-            'Thai': {
-                'th-TH-PremwadeeNeural': 'Premwadee - Female, Thai',
-                'th-TH-NiwatNeural': 'Niwat - Male, Thai',
-            },
-            # Greek voices
-            'Greek': {
-                'el-GR-AthinaNeural': 'Athina - Female, Greek',
-                'el-GR-NestorasNeural': 'Nestoras - Male, Greek',
-            },
-            # Czech voices
-            'Czech': {
-                'cs-CZ-VlastaNeural': 'Vlasta - Female, Czech',
-                'cs-CZ-AntoninNeural': 'Antonin - Male, Czech',
-            },
-            # Romanian voices
-            'Romanian': {
-                'ro-RO-AlinaNeural': 'Alina - Female, Romanian',
-                'ro-RO-EmilNeural': 'Emil - Male, Romanian',
-            },
-            # Hungarian voices
-            'Hungarian': {
-                'hu-HU-NoemiNeural': 'Noemi - Female, Hungarian',
-                'hu-HU-TamasNeural': 'Tamas - Male, Hungarian',
-            },
-            # Danish voices
-            'Danish': {
-                'da-DK-ChristelNeural': 'Christel - Female, Danish',
-                'da-DK-JeppeNeural': 'Jeppe - Male, Danish',
-            },
-            # Finnish voices
-            'Finnish': {
-                'fi-FI-SelmaNeural': 'Selma - Female, Finnish',
-                'fi-FI-HarriNeural': 'Harri - Male, Finnish',
-            },
-            # Norwegian voices
-            'Norwegian': {
-                'nb-NO-PernilleNeural': 'Pernille - Female, Norwegian',
-                'nb-NO-FinnNeural': 'Finn - Male, Norwegian',
-            },
-            # Swedish voices
-            'Swedish': {
-                'sv-SE-SofieNeural': 'Sofie - Female, Swedish',
-                'sv-SE-MattiasNeural': 'Mattias - Male, Swedish',
-            },
-            # Ukrainian voices
-            'Ukrainian': {
-                'uk-UA-PolinaNeural': 'Polina - Female, Ukrainian',
-                'uk-UA-OstapNeural': 'Ostap - Male, Ukrainian',
-            },
-            # Hebrew voices
-            'Hebrew': {
-                'he-IL-HilaNeural': 'Hila - Female, Hebrew',
-                'he-IL-AvriNeural': 'Avri - Male, Hebrew',
-            },
-            # Indonesian voices
-            'Indonesian': {
-                'id-ID-GadisNeural': 'Gadis - Female, Indonesian',
-                'id-ID-ArdiNeural': 'Ardi - Male, Indonesian',
-            },
-            # Malay voices
-            'Malay': {
-                'ms-MY-YasminNeural': 'Yasmin - Female, Malay',
-                'ms-MY-OsmanNeural': 'Osman - Male, Malay',
-            },
-            # Filipino voices
-            'Filipino': {
-                'fil-PH-BlessicaNeural': 'Blessica - Female, Filipino',
-                'fil-PH-AngeloNeural': 'Angelo - Male, Filipino',
-            },
-            # Slovak voices
-            'Slovak': {
-                'sk-SK-ViktoriaNeural': 'Viktoria - Female, Slovak',
-                'sk-SK-LukasNeural': 'Lukas - Male, Slovak',
-            },
-            # Slovenian voices
-            'Slovenian': {
-                'sl-SI-PetraNeural': 'Petra - Female, Slovenian',
-                'sl-SI-RokNeural': 'Rok - Male, Slovenian',
-            },
-            # Croatian voices
-            'Croatian': {
-                'hr-HR-GabrijelaNeural': 'Gabrijela - Female, Croatian',
-                'hr-HR-SreckoNeural': 'Srecko - Male, Croatian',
-            },
-            # Bulgarian voices
-            'Bulgarian': {
-                'bg-BG-KalinaNeural': 'Kalina - Female, Bulgarian',
-                'bg-BG-BorislavNeural': 'Borislav - Male, Bulgarian',
-            },
-            # Serbian voices
-            'Serbian': {
-                'sr-RS-SophieNeural': 'Sophie - Female, Serbian',
-                'sr-RS-NicholasNeural': 'Nicholas - Male, Serbian',
-            },
-            # Catalan voices
-            'Catalan': {
-                'ca-ES-JoanaNeural': 'Joana - Female, Catalan',
-                'ca-ES-EnricNeural': 'Enric - Male, Catalan',
-            },
-            # Welsh voices
-            'Welsh': {
-                'cy-GB-NiaNeural': 'Nia - Female, Welsh',
-                'cy-GB-AledNeural': 'Aled - Male, Welsh',
-            },
-            # Irish voices
-            'Irish': {
-                'ga-IE-OrlaNeural': 'Orla - Female, Irish',
-                'ga-IE-ColmNeural': 'Colm - Male, Irish',
-            },
-            # Icelandic voices
-            'Icelandic': {
-                'is-IS-GudrunNeural': 'Gudrun - Female, Icelandic',
-                'is-IS-GunnarNeural': 'Gunnar - Male, Icelandic',
-            },
-            # Latvian voices
-            'Latvian': {
-                'lv-LV-EveritaNeural': 'Everita - Female, Latvian',
-                'lv-LV-NilsNeural': 'Nils - Male, Latvian',
-            },
-            # Lithuanian voices
-            'Lithuanian': {
-                'lt-LT-OnaNeural': 'Ona - Female, Lithuanian',
-                'lt-LT-LeonasNeural': 'Leonas - Male, Lithuanian',
-            },
-            # Estonian voices
-            'Estonian': {
-                'et-EE-AnuNeural': 'Anu - Female, Estonian',
-                'et-EE-KertNeural': 'Kert - Male, Estonian',
-            },
-            # Georgian voices
-            'Georgian': {
-                'ka-GE-EkaNeural': 'Eka - Female, Georgian',
-                'ka-GE-GiorgiNeural': 'Giorgi - Male, Georgian',
-            },
-            # Kazakh voices
-            'Kazakh': {
-                'kk-KZ-AigulNeural': 'Aigul - Female, Kazakh',
-                'kk-KZ-DauletNeural': 'Daulet - Male, Kazakh',
-            },
-            # Nepali voices
-            'Nepali': {
-                'ne-NP-HemkalaNeural': 'Hemkala - Female, Nepali',
-                'ne-NP-SagarNeural': 'Sagar - Male, Nepali',
-            },
-            # Bengali voices
-            'Bengali': {
-                'bn-BD-NabanitaNeural': 'Nabanita - Female, Bengali',
-                'bn-BD-PradeepNeural': 'Pradeep - Male, Bengali',
-                'bn-IN-TanishaaNeural': 'Tanishaa - Female, Bengali (India)',
-                'bn-IN-BashkarNeural': 'Bashkar - Male, Bengali (India)',
-            },
-            # Tamil voices
-            'Tamil': {
-                'ta-IN-PallaviNeural': 'Pallavi - Female, Tamil',
-                'ta-IN-ValluvarNeural': 'Valluvar - Male, Tamil',
-            },
-            # Telugu voices
-            'Telugu': {
-                'te-IN-ShrutiNeural': 'Shruti - Female, Telugu',
-                'te-IN-MohanNeural': 'Mohan - Male, Telugu',
-            },
-            # Swahili voices
-            'Swahili': {
-                'sw-KE-ZuriNeural': 'Zuri - Female, Swahili',
-                'sw-KE-RafikiNeural': 'Rafiki - Male, Swahili',
-            },
-            # Afrikaans voices
-            'Afrikaans': {
-                'af-ZA-AdriNeural': 'Adri - Female, Afrikaans',
-                'af-ZA-WillemNeural': 'Willem - Male, Afrikaans',
-            },
-        }
+        """Get Edge TTS voices organized by category (cached catalog, never blocks)"""
+        return self.catalog.get_voices()
+
+    @property
+    def voices_generation(self):
+        return self.catalog.generation
 
     def generate(
         self,
@@ -365,11 +419,40 @@ class EdgeTTSEngine(BaseTTSEngine):
         speed: float = 1.0,
         pitch: int = 0,
         volume: int = 0,
-        progress_callback: Optional[callable] = None
+        progress_callback: Optional[callable] = None,
+        cancel_token: Optional[CancellationToken] = None
     ) -> bool:
         """Generate speech using Edge TTS"""
+        # Sentence-aligned segments give the journal resume points in long texts
+        return self.generate_stream(
+            split_sentences(text), voice, output_path, speed, pitch, volume,
+            progress_callback, cancel_token, total_chars=len(text)
+        )
+
+    def generate_stream(
+        self,
+        segments: Iterable[str],
+        voice: str,
+        output_path: str,
+        speed: float = 1.0,
+        pitch: int = 0,
+        volume: int = 0,
+        progress_callback: Optional[callable] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        total_chars: Optional[int] = None
+    ) -> bool:
+        """
+        Generate speech for a stream of segments, appending MP3 audio to one
+        file. Each finished segment is journaled: re-running an interrupted
+        job skips what is already on disk.
+        """
+        journal = None
         try:
-            import edge_tts
+            if self.communicate_factory is not None:
+                communicate_factory = self.communicate_factory
+            else:
+                import edge_tts
+                communicate_factory = edge_tts.Communicate
 
             # Convert parameters to Edge TTS format
             rate_percent = int((speed - 1.0) * 100)
@@ -377,34 +460,140 @@ class EdgeTTSEngine(BaseTTSEngine):
             pitch_str = f"+{pitch}Hz" if pitch >= 0 else f"{pitch}Hz"
             volume_str = f"+{volume}%" if volume >= 0 else f"{volume}%"
 
+            if cancel_token:
+                cancel_token.raise_if_cancelled()
+
             if progress_callback:
                 progress_callback(0.2, "Connecting to Edge TTS...")
 
-            async def run_edge_tts():
-                communicate = edge_tts.Communicate(
-                    text,
+            async def run_edge_tts(segment, audio_file):
+                communicate = communicate_factory(
+                    segment,
                     voice,
                     rate=rate,
                     pitch=pitch_str,
                     volume=volume_str
                 )
-                await communicate.save(output_path)
+                async for chunk in communicate.stream():
+                    if chunk["type"] == "audio":
+                        audio_file.write(chunk["data"])
+
+            async def run_cancellable(segment, audio_file):
+                # Run the stream as a task so a cancel can interrupt it mid-await;
+                # cancelling the task unwinds the websocket context and closes it
+                task = asyncio.ensure_future(run_edge_tts(segment, audio_file))
+                while not task.done():
+                    if cancel_token and cancel_token.cancelled:
+                        task.cancel()
+                        break
+                    await asyncio.wait({task}, timeout=0.1)
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    cancel_token.raise_if_cancelled()
+                    raise
 
             if progress_callback:
                 progress_callback(0.5, "Generating speech...")
 
-            asyncio.run(run_edge_tts())
+            def render_chunk(chunk, audio_file):
+                # Everything before this offset is complete audio for earlier chunks
+                resume_at = audio_file.tell()
+                attempt = 1
+                while True:
+                    try:
+                        asyncio.run(run_cancellable(chunk, audio_file))
+                        return
+                    except GenerationCancelled:
+                        raise
+                    except Exception as e:
+                        if (not self.resilient or not is_transient_error(e)
+                                or attempt >= self.retry_policy.max_attempts):
+                            raise
+                        # Drop the half-received chunk and resend just that chunk
+                        audio_file.seek(resume_at)
+                        audio_file.truncate()
+                        delay = self.retry_policy.delay(attempt)
+                        if progress_callback:
+                            progress_callback(
+                                progress_at(self.rendered_chars),
+                                f"Connection problem, retrying in {delay:.1f}s "
+                                f"({attempt}/{self.retry_policy.max_attempts - 1})..."
+                            )
+                        self.retry_policy.sleep(delay, cancel_token)
+                        attempt += 1
+
+            def progress_at(done_chars):
+                if total_chars:
+                    return 0.5 + 0.5 * min(1.0, done_chars / total_chars)
+                return 0.5
+
+            self.rendered_chars = 0
+            segments = self._prepared_segments(segments, voice)
+            journal = self._open_journal(output_path, voice, speed, pitch, volume)
+            if journal.completed:
+                audio_file = open(output_path, 'r+b')
+            else:
+                audio_file = open(output_path, 'wb')
+            trim_pending = True  # Cut the file back to the last checkpoint before appending
+            with audio_file:
+                for index, segment in enumerate(s for s in segments if s.strip()):
+                    number = index + 1
+                    if journal.is_done(index, segment):
+                        self.rendered_chars += len(segment)
+                        continue
+                    if trim_pending:
+                        trim_pending = False
+                        audio_file.seek(journal.resume_offset)
+                        audio_file.truncate()
+                        if journal.resume_offset and progress_callback:
+                            progress_callback(
+                                progress_at(self.rendered_chars),
+                                f"Resuming after {self.rendered_chars:,} characters..."
+                            )
+                    if cancel_token:
+                        cancel_token.raise_if_cancelled()
+                    chunks = self._resume_chunks(segment) if self.resilient else [segment]
+                    for chunk in chunks:
+                        render_chunk(chunk, audio_file)
+                        self.rendered_chars += len(chunk)
+                        if progress_callback:
+                            if total_chars:
+                                progress = progress_at(self.rendered_chars)
+                                progress_callback(progress, f"Generating speech... {int(progress * 100)}%")
+                            else:
+                                progress_callback(0.5, f"Generated segment {number}...")
+                    audio_file.flush()
+                    journal.record(index, segment, audio_file.tell())
+
+                if trim_pending:  # Every segment was already on disk
+                    audio_file.seek(journal.resume_offset)
+                    audio_file.truncate()
+
+            journal.finish()
 
             if progress_callback:
                 progress_callback(1.0, "Complete!")
 
             return True
 
+        except GenerationCancelled:
+            self._keep_or_remove_partial_output(output_path, journal)
+            if progress_callback:
+                progress_callback(0, "Cancelled")
+            raise
+
         except Exception as e:
+            self._keep_or_remove_partial_output(output_path, journal)
             if progress_callback:
                 progress_callback(0, f"Error: {str(e)}")
             raise
 
+    @staticmethod
+    def _resume_chunks(text: str) -> List[str]:
+        """Split text into sentence-aligned chunks of about RESUME_CHUNK_CHARS"""
+        return split_sentences(text, RESUME_CHUNK_CHARS)
+
     def is_available(self) -> bool:
         """Check if edge-tts is installed"""
         try:
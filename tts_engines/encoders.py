@@ -0,0 +1,357 @@
+"""
+Encoders - Compress PCM to FLAC/Opus/MP3 while it is being synthesized
+
+An audio sink takes 16-bit PCM as it is produced and leaves a finished file
+when closed; there is no intermediate WAV. open_audio_sink() picks the sink
+from the output extension:
+
+    .wav   WavWriter
+    .flac  flac or ffmpeg if installed, else the built-in FlacWriter
+    .opus  opusenc or ffmpeg
+    .mp3   ffmpeg
+"""
+
+import hashlib
+import os
+import shutil
+import struct
+import subprocess
+from array import array
+from typing import Dict, List
+
+from .wav_writer import WavWriter
+
+# Samples per channel in each frame written by FlacWriter
+FLAC_BLOCK_SIZE = 4096
+
+# Opus / MP3 quality settings for the external encoders
+OPUS_BITRATE = "48k"
+MP3_QUALITY = "4"  # LAME VBR quality (0 best - 9 smallest)
+
+
+# ----- external encoders -----
+
+def _encoder_commands(ext: str, output_path: str, sample_rate: int, channels: int) -> List[List[str]]:
+    """Candidate command lines (in order of preference) that read raw s16le PCM on stdin"""
+    ffmpeg_input = [
+        'ffmpeg', '-hide_banner', '-loglevel', 'error', '-y',
+        '-f', 's16le', '-ar', str(sample_rate), '-ac', str(channels), '-i', 'pipe:0'
+    ]
+    if ext == '.flac':
+        return [
+            ['flac', '--silent', '--force', '--force-raw-format', '--endian=little',
+             '--sign=signed', f'--channels={channels}', '--bps=16',
+             f'--sample-rate={sample_rate}', '-o', output_path, '-'],
+            ffmpeg_input + ['-c:a', 'flac', output_path],
+        ]
+    if ext == '.opus':
+        return [
+            ['opusenc', '--quiet', '--raw', f'--raw-rate={sample_rate}',
+             f'--raw-chan={channels}', '--raw-bits=16',
+             f'--bitrate={int(OPUS_BITRATE.rstrip("k"))}', '-', output_path],
+            ffmpeg_input + ['-c:a', 'libopus', '-b:a', OPUS_BITRATE, output_path],
+        ]
+    if ext == '.mp3':
+        return [ffmpeg_input + ['-c:a', 'libmp3lame', '-q:a', MP3_QUALITY, output_path]]
+    return []
+
+
+def available_formats() -> List[str]:
+    """Output extensions that can be produced on this machine"""
+    formats = ['.wav', '.flac']  # FLAC always works through FlacWriter
+    for ext in ('.opus', '.mp3'):
+        if any(shutil.which(cmd[0]) for cmd in _encoder_commands(ext, '', 1, 1)):
+            formats.append(ext)
+    return formats
+
+
+class PipeEncoder:
+    """Streams PCM into an encoder subprocess that writes the output file"""
+
+    def __init__(self, command: List[str], output_path: str):
+        self.output_path = output_path
+        self._process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0)
+        )
+        self.closed = False
+
+    def write(self, data: bytes):
+        try:
+            self._process.stdin.write(data)
+        except (BrokenPipeError, OSError):
+            self._fail()
+
+    def close(self):
+        """Finish the stream and wait for the encoder to write the file"""
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self._process.stdin.close()
+        except OSError:
+            pass
+        if self._process.wait() != 0:
+            self._fail()
+
+    def abort(self):
+        """Stop the encoder without finishing the file"""
+        self.closed = True
+        self._process.kill()
+        self._process.wait()
+
+    def _fail(self):
+        self.closed = True
+        self._process.kill()
+        stderr = self._process.stderr.read().decode('utf-8', 'replace').strip()
+        self._process.wait()
+        raise RuntimeError(f"Encoder {self._process.args[0]} failed: {stderr or 'no output'}")
+
+    def __enter__(self) -> "PipeEncoder":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def decode_to_wav(input_path: str, output_path: str):
+    """Decode any file ffmpeg can read (e.g. an Edge MP3) to 16-bit PCM WAV"""
+    if not shutil.which('ffmpeg'):
+        raise ValueError("Decoding MP3 needs ffmpeg (install it and add it to PATH)")
+    process = subprocess.run(
+        ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-y', '-i', input_path,
+         '-c:a', 'pcm_s16le', output_path],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0)
+    )
+    if process.returncode != 0:
+        stderr = process.stderr.decode('utf-8', 'replace').strip()
+        raise RuntimeError(f"ffmpeg could not decode {os.path.basename(input_path)}: {stderr or 'no output'}")
+
+
+# ----- pure-Python FLAC -----
+
+def _crc_table(poly: int, width: int) -> List[int]:
+    top = 1 << (width - 1)
+    mask = (1 << width) - 1
+    table = []
+    for byte in range(256):
+        crc = byte << (width - 8)
+        for _ in range(8):
+            crc = ((crc << 1) ^ poly) if crc & top else (crc << 1)
+        table.append(crc & mask)
+    return table
+
+
+_CRC8 = _crc_table(0x07, 8)
+_CRC16 = _crc_table(0x8005, 16)
+
+
+def _crc8(data: bytes) -> int:
+    crc = 0
+    for byte in data:
+        crc = _CRC8[crc ^ byte]
+    return crc
+
+
+def _crc16(data: bytes) -> int:
+    crc = 0
+    for byte in data:
+        crc = ((crc << 8) & 0xFFFF) ^ _CRC16[(crc >> 8) ^ byte]
+    return crc
+
+
+def _utf8_number(value: int) -> bytes:
+    """FLAC frame numbers use the UTF-8 variable-length coding"""
+    if value < 0x80:
+        return bytes([value])
+    length = 2
+    while value >= 1 << (5 * length + 1):
+        length += 1
+    out = []
+    for _ in range(length - 1):
+        out.append(0x80 | (value & 0x3F))
+        value >>= 6
+    lead = (0xFF00 >> length) & 0xFF
+    out.append(lead | value)
+    return bytes(reversed(out))
+
+
+class _BitWriter:
+    def __init__(self):
+        self._out = bytearray()
+        self._acc = 0
+        self._bits = 0
+
+    def write(self, value: int, bits: int):
+        self._acc = (self._acc << bits) | (value & ((1 << bits) - 1))
+        self._bits += bits
+        if self._bits >= 32:
+            whole = self._bits - self._bits % 8
+            self._out += (self._acc >> (self._bits - whole)).to_bytes(whole // 8, 'big')
+            self._bits -= whole
+            self._acc &= (1 << self._bits) - 1
+
+    def getvalue(self) -> bytes:
+        """Bytes written so far, zero-padded to a byte boundary"""
+        out = bytes(self._out)
+        if self._bits:
+            pad = (8 - self._bits % 8) % 8
+            out += (self._acc << pad).to_bytes((self._bits + pad) // 8, 'big')
+        return out
+
+
+def _rice_parameter(residual: List[int]) -> int:
+    if not residual:
+        return 0
+    mean = sum(abs(r) for r in residual) * 2 // len(residual)
+    return min(14, max(0, mean.bit_length() - 1))
+
+
+def _encode_subframe(writer: _BitWriter, samples: List[int]):
+    """FIXED subframe: pick prediction order 0-2 by residual size, Rice-code the residual"""
+    candidates = []
+    if len(samples) > 2:
+        candidates.append((2, [samples[i] - 2 * samples[i - 1] + samples[i - 2] for i in range(2, len(samples))]))
+    if len(samples) > 1:
+        candidates.append((1, [samples[i] - samples[i - 1] for i in range(1, len(samples))]))
+    candidates.append((0, samples))
+    order, residual = min(candidates, key=lambda c: sum(abs(r) for r in c[1]))
+
+    writer.write(0, 1)                      # zero padding bit
+    writer.write(0b001000 | order, 6)      # SUBFRAME_FIXED, order
+    writer.write(0, 1)                      # no wasted bits
+    for sample in samples[:order]:
+        writer.write(sample, 16)            # warm-up samples
+
+    k = _rice_parameter(residual)
+    writer.write(0, 2)                      # Rice coding, 4-bit parameter
+    writer.write(0, 4)                      # partition order 0
+    writer.write(k, 4)
+    write = writer.write
+    for r in residual:
+        u = (r << 1) if r >= 0 else ((-r << 1) - 1)
+        q = u >> k
+        write(1, q + 1)                     # q zeros then a one
+        if k:
+            write(u, k)
+
+
+class FlacWriter:
+    """
+    Minimal pure-Python FLAC encoder for 16-bit PCM (fixed predictors,
+    single Rice partition). Several times smaller than WAV for speech; used
+    when no flac/ffmpeg binary is installed.
+    """
+
+    def __init__(self, output_path: str, sample_rate: int, channels: int = 1):
+        self.output_path = output_path
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self._file = open(output_path, 'wb')
+        self._pending = bytearray()
+        self._frame_number = 0
+        self._total_samples = 0
+        self._md5 = hashlib.md5()
+        self._min_frame = None
+        self._max_frame = 0
+        self.closed = False
+        self._file.write(b'fLaC' + self._streaminfo())
+
+    def _streaminfo(self) -> bytes:
+        info = struct.pack('>HH', FLAC_BLOCK_SIZE, FLAC_BLOCK_SIZE)
+        info += (self._min_frame or 0).to_bytes(3, 'big') + self._max_frame.to_bytes(3, 'big')
+        packed = (self.sample_rate << 44) | ((self.channels - 1) << 41) | (15 << 36) | self._total_samples
+        info += packed.to_bytes(8, 'big') + self._md5.digest()
+        return bytes([0x80]) + len(info).to_bytes(3, 'big') + info  # last metadata block
+
+    def write(self, data: bytes):
+        self._pending += data
+        block_bytes = FLAC_BLOCK_SIZE * self.channels * 2
+        while len(self._pending) >= block_bytes:
+            self._write_frame(bytes(self._pending[:block_bytes]))
+            del self._pending[:block_bytes]
+
+    def _write_frame(self, pcm: bytes):
+        self._md5.update(pcm)
+        samples = array('h', pcm)
+        if samples.itemsize != 2:
+            raise RuntimeError("Unsupported platform sample size")
+        block = len(samples) // self.channels
+        self._total_samples += block
+
+        header = bytes([0xFF, 0xF8, 0x70, ((self.channels - 1) << 4) | 0x08])
+        header += _utf8_number(self._frame_number) + struct.pack('>H', block - 1)
+        header += bytes([_crc8(header)])
+
+        writer = _BitWriter()
+        for channel in range(self.channels):
+            _encode_subframe(writer, list(samples[channel::self.channels]))
+        frame = header + writer.getvalue()
+        frame += struct.pack('>H', _crc16(frame))
+
+        self._file.write(frame)
+        self._frame_number += 1
+        self._min_frame = len(frame) if self._min_frame is None else min(self._min_frame, len(frame))
+        self._max_frame = max(self._max_frame, len(frame))
+
+    def close(self):
+        """Flush the last (short) frame and fill in STREAMINFO"""
+        if self.closed:
+            return
+        self.closed = True
+        frame_bytes = self.channels * 2
+        tail = len(self._pending) - len(self._pending) % frame_bytes
+        if tail:
+            self._write_frame(bytes(self._pending[:tail]))
+        self._file.seek(4)
+        self._file.write(self._streaminfo())
+        self._file.close()
+
+    def abort(self):
+        self.closed = True
+        self._file.close()
+
+    def __enter__(self) -> "FlacWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+# ----- selection -----
+
+def open_audio_sink(output_path: str, sample_rate: int, channels: int = 1):
+    """
+    Sink for 16-bit PCM chosen by the output extension. Use as a context
+    manager; the finished file exists once it exits without an error.
+    """
+    ext = os.path.splitext(output_path)[1].lower()
+    if ext == '.wav':
+        return WavWriter(output_path, sample_rate, channels)
+    for command in _encoder_commands(ext, output_path, sample_rate, channels):
+        if shutil.which(command[0]):
+            return PipeEncoder(command, output_path)
+    if ext == '.flac':
+        return FlacWriter(output_path, sample_rate, channels)
+    raise ValueError(f"No encoder available for {ext or 'this'} output (install ffmpeg)")
+
+
+# Friendly names for format pickers
+FORMAT_LABELS: Dict[str, str] = {
+    '.wav': 'WAV',
+    '.flac': 'FLAC',
+    '.opus': 'Opus',
+    '.mp3': 'MP3',
+}
@@ -0,0 +1,244 @@
+"""
+Job Queue - Run many generation requests on bounded worker pools
+"""
+
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Union
+
+from .cancellation import CancellationToken, GenerationCancelled
+from .edge_engine import EdgeTTSEngine
+from .piper_engine import PiperTTSEngine
+from .document_source import DocumentTextSource
+from .text_source import FileTextSource
+from .worker import SynthesisWorker
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+_job_ids = itertools.count(1)
+
+
+@dataclass
+class GenerationJob:
+    """
+    A snapshot of one generation request (text, voice, parameters, output).
+
+    For large imported files and documents (EPUB/HTML/Markdown), text_source
+    streams the text from disk instead.
+    The output_path extension picks the format (see engine.get_output_formats()).
+    """
+    engine: str
+    text: str
+    voice: str
+    output_path: str
+    speed: float = 1.0
+    pitch: int = 0
+    volume: int = 0
+    text_source: Optional[Union[FileTextSource, DocumentTextSource]] = None
+    job_id: int = field(default_factory=lambda: next(_job_ids))
+    status: str = QUEUED
+    progress: float = 0.0
+    message: str = "Queued"
+    error: Optional[str] = None
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    cancel_token: CancellationToken = field(default_factory=CancellationToken, repr=False)
+
+    @property
+    def duration(self) -> Optional[float]:
+        """Seconds spent running (so far, if still running)"""
+        if self.started_at is None:
+            return None
+        end = self.finished_at if self.finished_at is not None else time.time()
+        return end - self.started_at
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+
+class GenerationQueue:
+    """
+    Accepts GenerationJobs and runs them on per-engine worker pools.
+
+    Edge jobs are network-bound and run concurrently; Piper jobs are CPU-bound
+    and limited by core count. Each Piper worker thread gets its own engine
+    instance because PiperTTSEngine caches one loaded model per instance.
+    """
+
+    def __init__(
+        self,
+        edge_workers: int = 4,
+        piper_workers: Optional[int] = None,
+        on_update: Optional[Callable[[GenerationJob], None]] = None,
+        worker: Optional[SynthesisWorker] = None
+    ):
+        """
+        Args:
+            edge_workers: Concurrent Edge (online) jobs
+            piper_workers: Concurrent Piper jobs (default: half the cores, min 1)
+            on_update: Called from worker threads whenever a job changes
+            worker: Optional SynthesisWorker; when given, jobs execute in its
+                    subprocess and the pools here only bound concurrency
+        """
+        if piper_workers is None:
+            piper_workers = max(1, (os.cpu_count() or 2) // 2)
+
+        self._pools = {
+            'edge': ThreadPoolExecutor(max_workers=edge_workers, thread_name_prefix="edge-job"),
+            'piper': ThreadPoolExecutor(max_workers=piper_workers, thread_name_prefix="piper-job"),
+        }
+        self._engine_factories = {
+            'edge': EdgeTTSEngine,
+            'piper': PiperTTSEngine,
+        }
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._jobs: Dict[int, GenerationJob] = {}
+        self.on_update = on_update
+        self.worker = worker
+
+    def submit(self, job: GenerationJob) -> GenerationJob:
+        """Queue a job; returns it so callers can track its status"""
+        if job.engine not in self._pools:
+            raise ValueError(f"Unknown engine: {job.engine}")
+        with self._lock:
+            self._jobs[job.job_id] = job
+        self._notify(job)
+        self._pools[job.engine].submit(self._run, job)
+        return job
+
+    def cancel(self, job_id: int):
+        """Cancel a queued or running job"""
+        job = self._jobs.get(job_id)
+        if job and not job.is_finished:
+            job.cancel_token.cancel()
+            if job.status == QUEUED:
+                self._finish(job, CANCELLED, "Cancelled")
+
+    def cancel_all(self):
+        for job_id in list(self._jobs):
+            self.cancel(job_id)
+
+    def jobs(self) -> List[GenerationJob]:
+        """All known jobs in submission order"""
+        with self._lock:
+            return list(self._jobs.values())
+
+    def clear_finished(self) -> List[int]:
+        """Forget finished jobs; returns their ids"""
+        with self._lock:
+            removed = [jid for jid, job in self._jobs.items() if job.is_finished]
+            for jid in removed:
+                del self._jobs[jid]
+        return removed
+
+    def shutdown(self):
+        """Cancel everything and stop accepting work"""
+        self.cancel_all()
+        for pool in self._pools.values():
+            pool.shutdown(wait=False)
+
+    def _engine_for(self, engine_key: str):
+        """Per-thread engine instance (Piper caches one loaded model per instance)"""
+        engines = getattr(self._local, 'engines', None)
+        if engines is None:
+            engines = self._local.engines = {}
+        if engine_key not in engines:
+            engines[engine_key] = self._engine_factories[engine_key]()
+        return engines[engine_key]
+
+    def _run(self, job: GenerationJob):
+        if job.is_finished:
+            return
+        if job.cancel_token.cancelled:
+            self._finish(job, CANCELLED, "Cancelled")
+            return
+
+        job.status = RUNNING
+        job.started_at = time.time()
+        job.message = "Starting..."
+        self._notify(job)
+
+        def progress_callback(progress, status):
+            job.progress = progress
+            job.message = status
+            self._notify(job)
+
+        try:
+            if self.worker is not None:
+                self._run_in_worker(job, progress_callback)
+            elif job.text_source is not None:
+                self._engine_for(job.engine).generate_stream(
+                    job.text_source.iter_segments(job.cancel_token),
+                    voice=job.voice,
+                    output_path=job.output_path,
+                    speed=job.speed,
+                    pitch=job.pitch,
+                    volume=job.volume,
+                    progress_callback=progress_callback,
+                    cancel_token=job.cancel_token,
+                    total_chars=job.text_source.char_count
+                )
+            else:
+                self._engine_for(job.engine).generate(
+                    text=job.text,
+                    voice=job.voice,
+                    output_path=job.output_path,
+                    speed=job.speed,
+                    pitch=job.pitch,
+                    volume=job.volume,
+                    progress_callback=progress_callback,
+                    cancel_token=job.cancel_token
+                )
+            job.progress = 1.0
+            self._finish(job, DONE, "Complete")
+        except GenerationCancelled as e:
+            self._finish(job, CANCELLED, str(e) or "Cancelled")
+        except Exception as e:
+            job.error = str(e)
+            self._finish(job, FAILED, f"Error: {e}")
+
+    def _run_in_worker(self, job: GenerationJob, progress_callback):
+        request = {
+            'engine': job.engine,
+            'voice': job.voice,
+            'output_path': job.output_path,
+            'speed': job.speed,
+            'pitch': job.pitch,
+            'volume': job.volume,
+        }
+        if job.text_source is not None:
+            request.update(
+                mode='file',
+                source_path=str(job.text_source.path),
+                total_chars=job.text_source.char_count
+            )
+        else:
+            request.update(mode='text', text=job.text)
+        self.worker.run(request, progress_callback, job.cancel_token)
+
+    def _finish(self, job: GenerationJob, status: str, message: str):
+        job.status = status
+        job.message = message
+        job.finished_at = time.time()
+        self._notify(job)
+
+    def _notify(self, job: GenerationJob):
+        if self.on_update:
+            try:
+                self.on_update(job)
+            except Exception:
+                pass
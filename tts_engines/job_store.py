@@ -0,0 +1,374 @@
+"""
+Job Store - Durable job queue in SQLite for batch and server modes
+
+Jobs are rows in one table. Worker processes claim queued jobs atomically
+(the claim runs in a write transaction, so no two workers get the same
+job) and hold them under a lease: a worker that stops heartbeating loses
+its jobs back to the queue when the lease expires. Finished jobs keep their
+timings, which the stats queries summarize.
+
+The database runs in WAL mode with relaxed syncing, so readers never block
+the writer and a claim or completion costs one short transaction.
+Payloads are free-form JSON; SynthesisWorker request dicts fit as-is.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from .job_queue import CANCELLED, DONE, FAILED, QUEUED, RUNNING
+
+# Seconds a claimed job stays with its worker without a heartbeat
+LEASE_SECONDS = 300.0
+
+# Attempts (first run plus retries) before a job is marked failed
+MAX_ATTEMPTS = 3
+
+# Seconds to wait for another process's write transaction
+BUSY_TIMEOUT = 30.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id            INTEGER PRIMARY KEY,
+    engine        TEXT NOT NULL,
+    payload       TEXT NOT NULL,
+    status        TEXT NOT NULL,
+    priority      INTEGER NOT NULL DEFAULT 0,
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    max_attempts  INTEGER NOT NULL,
+    worker_id     TEXT,
+    lease_expires REAL,
+    submitted_at  REAL NOT NULL,
+    started_at    REAL,
+    finished_at   REAL,
+    error         TEXT,
+    result        TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_queued ON jobs (engine, priority DESC, id) WHERE status = 'queued';
+CREATE INDEX IF NOT EXISTS jobs_leases ON jobs (lease_expires) WHERE status = 'running';
+CREATE INDEX IF NOT EXISTS jobs_finished ON jobs (finished_at) WHERE finished_at IS NOT NULL;
+"""
+
+_COLUMNS = (
+    "id, engine, payload, status, priority, attempts, max_attempts, worker_id, "
+    "lease_expires, submitted_at, started_at, finished_at, error, result"
+)
+
+
+@dataclass
+class StoredJob:
+    """One row of the job store"""
+    job_id: int
+    engine: str
+    payload: Dict[str, Any]
+    status: str
+    priority: int
+    attempts: int
+    max_attempts: int
+    worker_id: Optional[str]
+    lease_expires: Optional[float]
+    submitted_at: float
+    started_at: Optional[float]
+    finished_at: Optional[float]
+    error: Optional[str]
+    result: Optional[Dict[str, Any]]
+
+    @classmethod
+    def from_row(cls, row: Sequence) -> "StoredJob":
+        fields = list(row)
+        fields[2] = json.loads(fields[2])
+        fields[13] = json.loads(fields[13]) if fields[13] is not None else None
+        return cls(*fields)
+
+    @property
+    def wait_time(self) -> Optional[float]:
+        """Seconds between submission and the (latest) start"""
+        return None if self.started_at is None else self.started_at - self.submitted_at
+
+    @property
+    def run_time(self) -> Optional[float]:
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+
+class JobStore:
+    """
+    SQLite-backed job queue shared by any number of threads and processes.
+
+    Usage (one worker):
+        store = JobStore("jobs.db")
+        for job in store.claim("worker-1", limit=8):
+            try:
+                result = worker.run(job.payload)
+                store.complete(job.job_id, "worker-1", result)
+            except Exception as e:
+                store.fail(job.job_id, "worker-1", str(e))
+
+    Long jobs should call heartbeat() well within lease_seconds.
+    """
+
+    def __init__(self, path: str, lease_seconds: float = LEASE_SECONDS, max_attempts: int = MAX_ATTEMPTS):
+        """
+        Args:
+            path: Database file (created if missing)
+            lease_seconds: How long a claim lasts without a heartbeat
+            max_attempts: Default attempts per job before it is marked failed
+        """
+        self.path = os.fspath(path)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._connect().executescript(_SCHEMA)
+
+    # ----- connections -----
+
+    def _connect(self) -> sqlite3.Connection:
+        """Per-thread connection (sqlite3 connections are not shared between threads)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Autocommit mode; transactions are opened explicitly below
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")  # Durable across crashes; skips fsync per commit
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def _write(self, sql: str, params: Sequence = ()) -> sqlite3.Cursor:
+        return self._connect().execute(sql, params)
+
+    def _transaction(self):
+        return _Transaction(self._connect())
+
+    def close(self):
+        """Close every connection opened by this store"""
+        with self._connections_lock:
+            for conn in self._connections:
+                try:
+                    conn.close()
+                except sqlite3.ProgrammingError:
+                    pass  # Opened by another thread
+            self._connections.clear()
+        self._local = threading.local()
+
+    # ----- submitting -----
+
+    def submit(self, engine: str, payload: Dict[str, Any], priority: int = 0,
+               max_attempts: Optional[int] = None) -> int:
+        """Queue one job; returns its id"""
+        cursor = self._write(
+            "INSERT INTO jobs (engine, payload, status, priority, max_attempts, submitted_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (engine, json.dumps(payload), QUEUED, priority, max_attempts or self.max_attempts, time.time())
+        )
+        return cursor.lastrowid
+
+    def submit_many(self, jobs: Iterable[Dict[str, Any]], priority: int = 0) -> int:
+        """
+        Queue many jobs in one transaction. Each item is a payload with an
+        'engine' key. Returns the number queued.
+        """
+        now = time.time()
+        rows = [
+            (job['engine'], json.dumps(job), QUEUED, priority, self.max_attempts, now)
+            for job in jobs
+        ]
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT INTO jobs (engine, payload, status, priority, max_attempts, submitted_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+        return len(rows)
+
+    # ----- working -----
+
+    def claim(self, worker_id: str, engines: Optional[Sequence[str]] = None, limit: int = 1) -> List[StoredJob]:
+        """
+        Atomically take up to `limit` queued jobs (highest priority, then
+        oldest) and lease them to worker_id. Expired leases are requeued first.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            self._expire_leases(conn, now)
+            sql = "SELECT id FROM jobs WHERE status = ?"
+            params: List[Any] = [QUEUED]
+            if engines:
+                sql += f" AND engine IN ({','.join('?' * len(engines))})"
+                params.extend(engines)
+            sql += " ORDER BY priority DESC, id LIMIT ?"
+            params.append(limit)
+            ids = [row[0] for row in conn.execute(sql, params)]
+            if not ids:
+                return []
+            marks = ','.join('?' * len(ids))
+            conn.execute(
+                f"UPDATE jobs SET status = ?, worker_id = ?, lease_expires = ?, started_at = ?, "
+                f"attempts = attempts + 1 WHERE id IN ({marks})",
+                [RUNNING, worker_id, now + self.lease_seconds, now, *ids]
+            )
+            rows = conn.execute(f"SELECT {_COLUMNS} FROM jobs WHERE id IN ({marks}) ORDER BY priority DESC, id", ids)
+            return [StoredJob.from_row(row) for row in rows]
+
+    def heartbeat(self, job_id: int, worker_id: str) -> bool:
+        """Extend the lease; False means the job was taken away (stop working on it)"""
+        cursor = self._write(
+            "UPDATE jobs SET lease_expires = ? WHERE id = ? AND worker_id = ? AND status = ?",
+            (time.time() + self.lease_seconds, job_id, worker_id, RUNNING)
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: int, worker_id: str, result: Optional[Dict[str, Any]] = None) -> bool:
+        """Mark a leased job done. False if the lease was lost (the result is discarded)."""
+        cursor = self._write(
+            "UPDATE jobs SET status = ?, finished_at = ?, lease_expires = NULL, result = ?, error = NULL "
+            "WHERE id = ? AND worker_id = ? AND status = ?",
+            (DONE, time.time(), json.dumps(result) if result is not None else None, job_id, worker_id, RUNNING)
+        )
+        return cursor.rowcount == 1
+
+    def fail(self, job_id: int, worker_id: str, error: str, retry: bool = True) -> bool:
+        """
+        Record a failed attempt: requeue while attempts remain (and retry is
+        True), otherwise mark the job failed. False if the lease was lost.
+        """
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE id = ? AND worker_id = ? AND status = ?",
+                (job_id, worker_id, RUNNING)
+            ).fetchone()
+            if row is None:
+                return False
+            attempts, max_attempts = row
+            if retry and attempts < max_attempts:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, worker_id = NULL, lease_expires = NULL, error = ? WHERE id = ?",
+                    (QUEUED, error, job_id)
+                )
+            else:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, finished_at = ?, lease_expires = NULL, error = ? WHERE id = ?",
+                    (FAILED, time.time(), error, job_id)
+                )
+            return True
+
+    def cancel(self, job_id: int) -> bool:
+        """
+        Cancel a queued or running job. A running job's worker notices on its
+        next heartbeat or complete(), which return False.
+        """
+        cursor = self._write(
+            "UPDATE jobs SET status = ?, finished_at = ?, lease_expires = NULL WHERE id = ? AND status IN (?, ?)",
+            (CANCELLED, time.time(), job_id, QUEUED, RUNNING)
+        )
+        return cursor.rowcount == 1
+
+    def requeue_expired(self) -> int:
+        """Return jobs whose lease ran out to the queue; returns how many"""
+        with self._transaction() as conn:
+            return self._expire_leases(conn, time.time())
+
+    def _expire_leases(self, conn: sqlite3.Connection, now: float) -> int:
+        # A dead worker's attempt counts; jobs out of attempts fail instead
+        conn.execute(
+            "UPDATE jobs SET status = ?, finished_at = ?, lease_expires = NULL, error = 'Lease expired' "
+            "WHERE status = ? AND lease_expires < ? AND attempts >= max_attempts",
+            (FAILED, now, RUNNING, now)
+        )
+        return conn.execute(
+            "UPDATE jobs SET status = ?, worker_id = NULL, lease_expires = NULL, error = 'Lease expired' "
+            "WHERE status = ? AND lease_expires < ?",
+            (QUEUED, RUNNING, now)
+        ).rowcount
+
+    # ----- queries -----
+
+    def get(self, job_id: int) -> Optional[StoredJob]:
+        row = self._connect().execute(f"SELECT {_COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return StoredJob.from_row(row) if row else None
+
+    def jobs(self, status: Optional[str] = None, limit: int = 100) -> List[StoredJob]:
+        """Most recent jobs, optionally with one status"""
+        sql = f"SELECT {_COLUMNS} FROM jobs"
+        params: List[Any] = []
+        if status:
+            sql += " WHERE status = ?"
+            params.append(status)
+        sql += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        return [StoredJob.from_row(row) for row in self._connect().execute(sql, params)]
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs in each state"""
+        counts = {state: 0 for state in (QUEUED, RUNNING, DONE, FAILED, CANCELLED)}
+        for status, count in self._connect().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status"):
+            counts[status] = count
+        return counts
+
+    def throughput(self, window: float = 60.0) -> float:
+        """Jobs completed per minute over the last `window` seconds"""
+        since = time.time() - window
+        (count,) = self._connect().execute(
+            "SELECT COUNT(*) FROM jobs WHERE finished_at >= ? AND status = ?", (since, DONE)
+        ).fetchone()
+        return count * 60.0 / window
+
+    def latency_stats(self, window: Optional[float] = None, engine: Optional[str] = None) -> Dict[str, float]:
+        """
+        Timings of completed jobs (optionally the last `window` seconds or one
+        engine): count, mean queue wait, and mean / p50 / p95 / max run time.
+        """
+        sql = "SELECT started_at - submitted_at, finished_at - started_at FROM jobs WHERE status = ?"
+        params: List[Any] = [DONE]
+        if window is not None:
+            sql += " AND finished_at >= ?"
+            params.append(time.time() - window)
+        if engine:
+            sql += " AND engine = ?"
+            params.append(engine)
+        rows = self._connect().execute(sql, params).fetchall()
+        if not rows:
+            return {'count': 0}
+        waits = [wait for wait, _ in rows]
+        runs = sorted(run for _, run in rows)
+
+        def percentile(p: float) -> float:
+            return runs[min(len(runs) - 1, int(p * len(runs)))]
+
+        return {
+            'count': len(rows),
+            'mean_wait': sum(waits) / len(waits),
+            'mean_run': sum(runs) / len(runs),
+            'p50_run': percentile(0.50),
+            'p95_run': percentile(0.95),
+            'max_run': runs[-1],
+        }
+
+    def purge_finished(self, older_than: float = 7 * 24 * 3600) -> int:
+        """Delete finished jobs older than `older_than` seconds; returns how many"""
+        return self._write(
+            "DELETE FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?",
+            (time.time() - older_than,)
+        ).rowcount
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT/ROLLBACK; takes the write lock up front so claims can't race"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
@@ -0,0 +1,161 @@
+"""
+Language Detection - Unicode script fast path with a langdetect fallback
+"""
+
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Dict, Optional
+
+# Optional n-gram language detection for ambiguous scripts
+try:
+    from langdetect import DetectorFactory, detect, LangDetectException
+    DetectorFactory.seed = 0  # Deterministic results across runs
+    LANGDETECT_AVAILABLE = True
+except ImportError:
+    LANGDETECT_AVAILABLE = False
+
+# Characters examined by the script histogram
+SCRIPT_SAMPLE_CHARS = 2000
+
+# Characters handed to langdetect when the script is ambiguous
+LANGDETECT_SAMPLE_CHARS = 1000
+
+# Share of letters a script needs before it decides the language
+DOMINANT_SHARE = 0.6
+
+# (first code point, last code point, script) - sorted by first code point
+_SCRIPT_RANGES = [
+    (0x0041, 0x024F, 'Latin'),
+    (0x0370, 0x03FF, 'Greek'),
+    (0x0400, 0x052F, 'Cyrillic'),
+    (0x0530, 0x058F, 'Armenian'),
+    (0x0590, 0x05FF, 'Hebrew'),
+    (0x0600, 0x06FF, 'Arabic'),
+    (0x0750, 0x077F, 'Arabic'),
+    (0x0900, 0x097F, 'Devanagari'),
+    (0x0980, 0x09FF, 'Bengali'),
+    (0x0A00, 0x0A7F, 'Gurmukhi'),
+    (0x0A80, 0x0AFF, 'Gujarati'),
+    (0x0B80, 0x0BFF, 'Tamil'),
+    (0x0C00, 0x0C7F, 'Telugu'),
+    (0x0C80, 0x0CFF, 'Kannada'),
+    (0x0D00, 0x0D7F, 'Malayalam'),
+    (0x0D80, 0x0DFF, 'Sinhala'),
+    (0x0E00, 0x0E7F, 'Thai'),
+    (0x0E80, 0x0EFF, 'Lao'),
+    (0x1000, 0x109F, 'Myanmar'),
+    (0x10A0, 0x10FF, 'Georgian'),
+    (0x1100, 0x11FF, 'Hangul'),
+    (0x1200, 0x139F, 'Ethiopic'),
+    (0x1780, 0x17FF, 'Khmer'),
+    (0x1C90, 0x1CBF, 'Georgian'),
+    (0x1E00, 0x1EFF, 'Latin'),
+    (0x1F00, 0x1FFF, 'Greek'),
+    (0x3040, 0x309F, 'Kana'),
+    (0x30A0, 0x30FF, 'Kana'),
+    (0x3130, 0x318F, 'Hangul'),
+    (0x31F0, 0x31FF, 'Kana'),
+    (0x3400, 0x4DBF, 'Han'),
+    (0x4E00, 0x9FFF, 'Han'),
+    (0xAC00, 0xD7AF, 'Hangul'),
+    (0xF900, 0xFAFF, 'Han'),
+    (0xFB50, 0xFDFF, 'Arabic'),
+    (0xFE70, 0xFEFF, 'Arabic'),
+    (0xFF66, 0xFF9F, 'Kana'),
+]
+_RANGE_STARTS = [r[0] for r in _SCRIPT_RANGES]
+
+# Scripts that identify a single language outright
+SCRIPT_LANGUAGES = {
+    'Hangul': 'ko',
+    'Kana': 'ja',
+    'Han': 'zh',
+    'Thai': 'th',
+    'Georgian': 'ka',
+    'Greek': 'el',
+    'Hebrew': 'he',
+    'Devanagari': 'hi',
+    'Bengali': 'bn',
+    'Gurmukhi': 'pa',
+    'Gujarati': 'gu',
+    'Tamil': 'ta',
+    'Telugu': 'te',
+    'Kannada': 'kn',
+    'Malayalam': 'ml',
+    'Sinhala': 'si',
+    'Lao': 'lo',
+    'Myanmar': 'my',
+    'Khmer': 'km',
+    'Armenian': 'hy',
+    'Ethiopic': 'am',
+}
+
+# Scripts shared by many languages - these need the n-gram model
+AMBIGUOUS_SCRIPTS = ('Latin', 'Cyrillic', 'Arabic')
+
+
+def script_of(char: str) -> Optional[str]:
+    """Script name for a letter, or None for digits, punctuation and unknown blocks"""
+    cp = ord(char)
+    if cp < 0x80:
+        return 'Latin' if char.isalpha() else None
+    i = bisect_right(_RANGE_STARTS, cp) - 1
+    if i >= 0 and cp <= _SCRIPT_RANGES[i][1] and char.isalpha():
+        return _SCRIPT_RANGES[i][2]
+    return None
+
+
+def script_histogram(text: str, max_chars: int = SCRIPT_SAMPLE_CHARS) -> Dict[str, int]:
+    """Count letters per script over the first max_chars characters"""
+    counts: Dict[str, int] = {}
+    for char in text[:max_chars]:
+        script = script_of(char)
+        if script:
+            counts[script] = counts.get(script, 0) + 1
+    return counts
+
+
+def detect_script_language(text: str) -> Optional[str]:
+    """
+    Decide the language from the writing system alone.
+
+    Returns an ISO 639-1 code, or None when the text is mostly in a script
+    shared by many languages (Latin, Cyrillic, Arabic) or has no letters.
+    """
+    counts = script_histogram(text)
+    total = sum(counts.values())
+    if not total:
+        return None
+
+    # Japanese mixes Kana with Han; any real Kana presence means Japanese
+    kana = counts.get('Kana', 0)
+    if kana and (kana + counts.get('Han', 0)) / total >= DOMINANT_SHARE:
+        return 'ja'
+
+    script, count = max(counts.items(), key=lambda item: item[1])
+    if script in AMBIGUOUS_SCRIPTS or count / total < DOMINANT_SHARE:
+        return None
+    return SCRIPT_LANGUAGES.get(script)
+
+
+@lru_cache(maxsize=256)
+def _langdetect_cached(sample: str) -> Optional[str]:
+    try:
+        return detect(sample)
+    except (LangDetectException, Exception):
+        return None
+
+
+def detect_language(text: str) -> Optional[str]:
+    """Detect language from text. Returns ISO 639-1 code (e.g., 'en', 'ko', 'th')"""
+    if not text or not text.strip():
+        return None
+
+    lang = detect_script_language(text)
+    if lang:
+        return lang
+
+    if not LANGDETECT_AVAILABLE or len(text.strip()) < 10:
+        return None
+    # Only a prefix is needed for a stable guess; memoized for repeat calls
+    return _langdetect_cached(text[:LANGDETECT_SAMPLE_CHARS].strip())
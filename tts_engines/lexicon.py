@@ -0,0 +1,242 @@
+"""
+Lexicon - User pronunciation dictionaries, applied in one Aho-Corasick pass
+
+One file per language in models/lexicon/ (en.txt, de.txt...), one entry per
+line, "term = pronunciation" (or term<TAB>pronunciation):
+
+    # Products and acronyms
+    AWS = A W S
+    Kubernetes = koo ber net eez
+    nginx = engine x
+
+Terms match whole words. A term written entirely in lowercase matches any
+capitalization; any other term matches exactly as written. Each file is
+compiled once into an Aho-Corasick automaton, so a text is rewritten in a
+single pass however many entries there are, and is recompiled when the
+file changes on disk.
+"""
+
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+LEXICON_DIR = Path("models/lexicon")
+
+# How often a lexicon file is checked for changes (seconds)
+RELOAD_CHECK_SECONDS = 1.0
+
+
+class LexiconEntry(NamedTuple):
+    term: str
+    replacement: str
+    exact_case: bool
+
+
+def parse_lexicon(text: str) -> Tuple[List[LexiconEntry], int]:
+    """Entries of a lexicon file (later duplicates win) and the number of unreadable lines"""
+    entries: Dict[str, LexiconEntry] = {}
+    skipped = 0
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        term, sep, replacement = line.partition('\t') if '\t' in line else line.partition('=')
+        term, replacement = term.strip(), replacement.strip()
+        if not sep or not term:
+            skipped += 1
+            continue
+        entries[term] = LexiconEntry(term, replacement, exact_case=term != term.lower())
+    return list(entries.values()), skipped
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick automaton over a set of keys: finds every occurrence of
+    every key in one left-to-right scan of the text.
+    """
+
+    def __init__(self, keys: Iterable[str]):
+        self.keys = list(keys)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._key: List[int] = [-1]     # Key ending at this state (-1: none)
+        self._next_out: List[int] = [0]  # Nearest state on the fail chain that ends a key
+
+        for index, key in enumerate(self.keys):
+            state = 0
+            for char in key:
+                following = self._goto[state].get(char)
+                if following is None:
+                    following = len(self._goto)
+                    self._goto[state][char] = following
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._key.append(-1)
+                    self._next_out.append(0)
+                state = following
+            self._key[state] = index
+
+        # Breadth-first: a state's fail link is the longest proper suffix in the trie
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, following in self._goto[state].items():
+                queue.append(following)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[following] = target if target != following else 0
+                link = self._fail[following]
+                self._next_out[following] = link if self._key[link] >= 0 else self._next_out[link]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """(start, end, key index) for every occurrence, in order of end position"""
+        goto, fail, keys, next_out = self._goto, self._fail, self._key, self._next_out
+        lengths = [len(key) for key in self.keys]
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            found = state if keys[state] >= 0 else next_out[state]
+            while found:
+                key = keys[found]
+                yield position + 1 - lengths[key], position + 1, key
+                found = next_out[found]
+
+
+def _lower_same_length(text: str) -> str:
+    """text.lower(), keeping characters whose lowercase is longer (e.g. 'İ') as they are"""
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return ''.join(char.lower() if len(char.lower()) == 1 else char for char in text)
+
+
+class Lexicon:
+    """A compiled set of pronunciation entries"""
+
+    def __init__(self, entries: Iterable[LexiconEntry], skipped_lines: int = 0):
+        self.entries = list(entries)
+        self.skipped_lines = skipped_lines
+        # Entries share a key when they differ only in case; exact ones are tried first
+        by_key: Dict[str, List[LexiconEntry]] = {}
+        for entry in self.entries:
+            by_key.setdefault(_lower_same_length(entry.term), []).append(entry)
+        for candidates in by_key.values():
+            candidates.sort(key=lambda entry: not entry.exact_case)
+        self._candidates = list(by_key.values())
+        self._automaton = AhoCorasick(by_key)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def apply(self, text: str) -> str:
+        """Text with every whole-word term replaced (leftmost, then longest, wins)"""
+        if not self.entries or not text:
+            return text
+        matches = []
+        for start, end, key in self._automaton.iter_matches(_lower_same_length(text)):
+            # Whole words only, where the term itself starts or ends with a letter or digit
+            if start and text[start].isalnum() and text[start - 1].isalnum():
+                continue
+            if end < len(text) and text[end - 1].isalnum() and text[end].isalnum():
+                continue
+            for entry in self._candidates[key]:
+                if not entry.exact_case or text[start:end] == entry.term:
+                    matches.append((start, -end, entry.replacement))
+                    break
+        if not matches:
+            return text
+
+        matches.sort()
+        pieces = []
+        position = 0
+        for start, negative_end, replacement in matches:
+            if start < position:
+                continue  # Overlaps a match already taken
+            pieces.append(text[position:start])
+            pieces.append(replacement)
+            position = -negative_end
+        pieces.append(text[position:])
+        return ''.join(pieces)
+
+    def apply_segments(self, segments: Iterable[str]) -> Iterator[str]:
+        """apply() each segment lazily (for streamed generation)"""
+        for segment in segments:
+            yield self.apply(segment)
+
+
+class _CachedLexicon(NamedTuple):
+    signature: Optional[Tuple[int, int]]   # (mtime_ns, size) of the file; None if missing
+    lexicon: Optional[Lexicon]
+    checked: float
+
+
+class LexiconStore:
+    """
+    Per-language lexicons from a directory, compiled on first use and
+    recompiled when their file changes (checked at most once per
+    check_interval seconds, so lookups per segment stay cheap).
+    """
+
+    def __init__(self, directory: Path = LEXICON_DIR, check_interval: float = RELOAD_CHECK_SECONDS):
+        self.directory = Path(directory)
+        self.check_interval = check_interval
+        self._cache: Dict[str, _CachedLexicon] = {}
+        self._lock = threading.Lock()
+
+    def path_for(self, lang: str) -> Path:
+        return self.directory / f"{lang}.txt"
+
+    def get(self, lang: Optional[str]) -> Optional[Lexicon]:
+        """Compiled lexicon for a language code, or None if it has no (non-empty) file"""
+        if not lang:
+            return None
+        lang = lang.lower()
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(lang)
+            if cached and now - cached.checked < self.check_interval:
+                return cached.lexicon
+
+            path = self.path_for(lang)
+            try:
+                stat = path.stat()
+                signature = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                signature = None
+
+            if cached and cached.signature == signature:
+                lexicon = cached.lexicon
+            elif signature is None:
+                lexicon = None
+            else:
+                try:
+                    entries, skipped = parse_lexicon(path.read_text(encoding='utf-8-sig', errors='replace'))
+                except OSError:
+                    entries, skipped = [], 0  # Being rewritten; try again next check
+                    signature = None
+                lexicon = Lexicon(entries, skipped) if entries else None
+            self._cache[lang] = _CachedLexicon(signature, lexicon, now)
+            return lexicon
+
+    def apply(self, text: str, lang: Optional[str]) -> str:
+        lexicon = self.get(lang)
+        return lexicon.apply(text) if lexicon else text
+
+
+_shared_store: Optional[LexiconStore] = None
+_shared_store_lock = threading.Lock()
+
+
+def shared_lexicons() -> LexiconStore:
+    """Process-wide store over models/lexicon, shared by every engine"""
+    global _shared_store
+    with _shared_store_lock:
+        if _shared_store is None:
+            _shared_store = LexiconStore()
+        return _shared_store
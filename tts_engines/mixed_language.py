@@ -0,0 +1,199 @@
+"""
+Mixed Language - Split text by language and route each segment to a matching voice
+"""
+
+import os
+import re
+import shutil
+import tempfile
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from .audio_merge import merge_audio
+from .base_engine import BaseTTSEngine
+from .cancellation import CancellationToken, GenerationCancelled
+from .language_detect import detect_language
+from .piper_engine import PiperTTSEngine
+from .scheduler import RenderItem, ScheduleReport, VoiceAffinityScheduler
+
+# Blank lines separate paragraphs
+PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+
+# Sentence ends (Latin, CJK, Arabic, Devanagari punctuation)
+SENTENCE_BREAK = re.compile(r'(?<=[.!?。！？؟।])\s+')
+
+
+@dataclass
+class LanguageSegment:
+    """A run of text in one language and the voice chosen for it"""
+    index: int
+    text: str
+    lang: Optional[str]
+    voice: Optional[str] = None
+
+
+def _base_lang(code: Optional[str]) -> Optional[str]:
+    """'zh-cn' -> 'zh'; langdetect reports some regional variants"""
+    return code.split('-')[0].lower() if code else None
+
+
+def segment_by_language(
+    text: str,
+    default_lang: Optional[str] = None,
+    granularity: str = 'paragraph'
+) -> List[LanguageSegment]:
+    """
+    Split text into paragraphs (or sentences) and tag each with its language.
+
+    Segments whose language can't be detected (too short, digits only)
+    inherit the previous segment's language. Adjacent segments in the same
+    language are merged so each voice gets as much context as possible.
+
+    Args:
+        text: Input text
+        default_lang: Language assumed before anything is detected
+        granularity: 'paragraph' or 'sentence'
+    """
+    splitter = SENTENCE_BREAK if granularity == 'sentence' else PARAGRAPH_BREAK
+    pieces = [p.strip() for p in splitter.split(text) if p.strip()]
+
+    segments: List[LanguageSegment] = []
+    current_lang = default_lang
+    for piece in pieces:
+        lang = _base_lang(detect_language(piece)) or current_lang
+        current_lang = lang
+        if segments and segments[-1].lang == lang:
+            separator = " " if granularity == 'sentence' else "\n\n"
+            segments[-1].text += separator + piece
+        else:
+            segments.append(LanguageSegment(len(segments), piece, lang))
+    return segments
+
+
+class MixedLanguageSynthesizer:
+    """
+    Synthesizes a multi-language document with one voice per language.
+
+    Segments are rendered in parallel to temporary files by a
+    VoiceAffinityScheduler (each voice stays on a worker that has it
+    loaded), then the pieces are stitched into one output in order.
+    """
+
+    def __init__(
+        self,
+        engine_factory: Callable[[], BaseTTSEngine],
+        language_voices: Optional[Dict[str, str]] = None,
+        max_workers: Optional[int] = None,
+        scheduler: Optional[VoiceAffinityScheduler] = None
+    ):
+        """
+        Args:
+            engine_factory: Creates an engine (e.g. EdgeTTSEngine); one per worker
+            language_voices: Optional explicit {lang_code: voice_id} choices
+            max_workers: Parallel segments (default: 4 for online engines,
+                         half the cores for local ones)
+            scheduler: Shared scheduler for engine_factory, so loaded voices
+                       carry over between documents (default: a private one)
+        """
+        self.engine_factory = engine_factory
+        self.language_voices = dict(language_voices or {})
+        self._probe = engine_factory()
+        self.scheduler = scheduler or VoiceAffinityScheduler(engine_factory, workers=max_workers)
+        self.last_report: Optional[ScheduleReport] = None
+
+    def pick_voice(self, lang: Optional[str], preferred_voice: str) -> str:
+        """
+        Best available voice for a language.
+
+        Order: the preferred voice if it already speaks the language, an
+        explicit language_voices entry, then a catalog voice of the same
+        gender (downloaded Piper voices first). Falls back to preferred_voice.
+        """
+        engine = self._probe
+        if not lang or engine.get_voice_language(preferred_voice) == lang:
+            return preferred_voice
+        if lang in self.language_voices:
+            return self.language_voices[lang]
+
+        descriptions = {}
+        for voices in engine.get_voices().values():
+            descriptions.update(voices)
+
+        preferred_desc = descriptions.get(preferred_voice, "")
+        gender = "Female" if "Female" in preferred_desc else "Male" if "Male" in preferred_desc else None
+
+        def rank(voice_id):
+            downloaded = (
+                isinstance(engine, PiperTTSEngine) and engine.is_voice_downloaded(voice_id)
+            )
+            same_gender = bool(gender) and gender in descriptions[voice_id]
+            return (not downloaded, not same_gender)
+
+        candidates = [v for v in descriptions if engine.get_voice_language(v) == lang]
+        if not candidates:
+            return preferred_voice
+        return min(candidates, key=rank)
+
+    def plan(self, text: str, default_voice: str, granularity: str = 'paragraph') -> List[LanguageSegment]:
+        """Segment the text and assign a voice to every segment"""
+        default_lang = self._probe.get_voice_language(default_voice)
+        segments = segment_by_language(text, default_lang, granularity)
+        for segment in segments:
+            segment.voice = self.pick_voice(segment.lang, default_voice)
+        return segments
+
+    def generate(
+        self,
+        text: str,
+        default_voice: str,
+        output_path: str,
+        speed: float = 1.0,
+        pitch: int = 0,
+        volume: int = 0,
+        progress_callback: Optional[callable] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        granularity: str = 'paragraph'
+    ) -> List[LanguageSegment]:
+        """Render every segment with its routed voice and stitch one output file"""
+        segments = self.plan(text, default_voice, granularity)
+        if not segments:
+            raise ValueError("No text to synthesize")
+
+        if progress_callback:
+            langs = ", ".join(sorted({s.lang or '?' for s in segments}))
+            progress_callback(0.1, f"{len(segments)} segment(s) in: {langs}")
+
+        ext = self._probe.get_output_extension()
+        temp_dir = tempfile.mkdtemp(prefix="tts_mixed_", dir=os.path.dirname(os.path.abspath(output_path)))
+        token = cancel_token or CancellationToken()
+        items = [
+            RenderItem(segment.text, segment.voice, os.path.join(temp_dir, f"{segment.index:05d}{ext}"))
+            for segment in segments
+        ]
+
+        def render_progress(fraction, status):
+            if progress_callback:
+                progress_callback(0.1 + 0.8 * fraction, status)
+
+        try:
+            self.last_report = self.scheduler.render(
+                items, speed, pitch, volume,
+                progress_callback=render_progress,
+                cancel_token=token
+            )
+            part_paths = [item.output_path for item in items]
+
+            if progress_callback:
+                progress_callback(0.95, "Stitching segments...")
+            merge_audio(part_paths, output_path)
+
+            if progress_callback:
+                progress_callback(1.0, "Complete!")
+            return segments
+
+        except GenerationCancelled:
+            BaseTTSEngine._remove_partial_output(output_path)
+            raise
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
@@ -0,0 +1,445 @@
+"""
+Text Normalizer - Spell out numbers, dates, currency, abbreviations and URLs
+
+Each language's rules compile into one regular expression: an alternation
+of token patterns (URLs, e-mails, dates, times, amounts, percentages,
+ordinals, numbers with units, plain numbers, symbols) plus the language's
+abbreviations, which are first built into a character trie and emitted as
+a nested, prefix-sharing alternation. normalize() is then a single
+re.sub() pass, so text without anything to expand runs at regex speed.
+
+Numbers are spelled out for languages with a number speller (English);
+elsewhere they are kept as digits, which both engines' front ends read in
+the voice's language, and only the surrounding words are localized.
+"""
+
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+
+@dataclass(frozen=True)
+class LanguageRules:
+    """What a language's normalizer expands, and how it says it"""
+    abbreviations: Dict[str, str] = field(default_factory=dict)   # 'Dr.' -> 'Doctor'
+    titles: frozenset = frozenset()       # Abbreviations always followed by a name
+    symbols: Dict[str, str] = field(default_factory=dict)         # '&' -> 'and'
+    url_words: Dict[str, str] = field(default_factory=dict)       # '.' -> 'dot'
+    percent: str = "percent"
+    # Symbol -> (singular, plural, minor singular, minor plural); minor '' if none
+    currencies: Dict[str, Tuple[str, str, str, str]] = field(default_factory=dict)
+    # Unit -> (singular, plural); only expanded right after a number
+    units: Dict[str, Tuple[str, str]] = field(default_factory=dict)
+    months: Sequence[str] = ()
+    number_words: Optional[Callable[[int], str]] = None
+    ordinal_words: Optional[Callable[[int], str]] = None
+    year_words: Optional[Callable[[int], str]] = None
+    decimal_word: str = "point"
+    and_word: str = "and"
+    minus_word: str = "minus"
+    date_order: str = 'mdy'               # How to read 03/04/2025
+
+
+# ----- English numbers -----
+
+_EN_ONES = (
+    "zero", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten",
+    "eleven", "twelve", "thirteen", "fourteen", "fifteen", "sixteen", "seventeen",
+    "eighteen", "nineteen",
+)
+_EN_TENS = ("", "", "twenty", "thirty", "forty", "fifty", "sixty", "seventy", "eighty", "ninety")
+_EN_SCALES = ((10 ** 12, "trillion"), (10 ** 9, "billion"), (10 ** 6, "million"), (1000, "thousand"))
+_EN_ORDINAL_ENDINGS = {
+    "one": "first", "two": "second", "three": "third", "five": "fifth",
+    "eight": "eighth", "nine": "ninth", "twelve": "twelfth",
+}
+
+
+def _en_below_thousand(n: int) -> str:
+    words = []
+    if n >= 100:
+        words.append(f"{_EN_ONES[n // 100]} hundred")
+        n %= 100
+    if n >= 20:
+        words.append(_EN_TENS[n // 10] + (f"-{_EN_ONES[n % 10]}" if n % 10 else ""))
+    elif n or not words:
+        words.append(_EN_ONES[n])
+    return " ".join(words)
+
+
+def english_number(n: int) -> str:
+    """1234 -> 'one thousand two hundred thirty-four'"""
+    if n < 0:
+        return "minus " + english_number(-n)
+    if n >= 10 ** 15:
+        return " ".join(_EN_ONES[int(d)] for d in str(n))
+    words = []
+    for scale, name in _EN_SCALES:
+        if n >= scale:
+            words.append(f"{_en_below_thousand(n // scale)} {name}")
+            n %= scale
+    if n or not words:
+        words.append(_en_below_thousand(n))
+    return " ".join(words)
+
+
+def english_ordinal(n: int) -> str:
+    """21 -> 'twenty-first'"""
+    words = english_number(n)
+    head, sep, last = words.rpartition("-") if "-" in words.split(" ")[-1] else words.rpartition(" ")
+    if last in _EN_ORDINAL_ENDINGS:
+        last = _EN_ORDINAL_ENDINGS[last]
+    elif last.endswith("y"):
+        last = last[:-1] + "ieth"
+    else:
+        last += "th"
+    return head + sep + last
+
+
+def english_year(n: int) -> str:
+    """1999 -> 'nineteen ninety-nine', 2005 -> 'two thousand five', 2024 -> 'twenty twenty-four'"""
+    if not 1000 <= n <= 9999 or 2000 <= n <= 2009 or n % 1000 == 0:
+        return english_number(n)
+    high, low = divmod(n, 100)
+    if low == 0:
+        return f"{english_number(high)} hundred"
+    if low < 10:
+        return f"{english_number(high)} oh {_EN_ONES[low]}"
+    return f"{english_number(high)} {english_number(low)}"
+
+
+LANGUAGE_RULES: Dict[str, LanguageRules] = {
+    'en': LanguageRules(
+        abbreviations={
+            "Mr.": "Mister", "Mrs.": "Missus", "Ms.": "Miz", "Dr.": "Doctor", "Prof.": "Professor",
+            "Gov.": "Governor", "Sen.": "Senator", "Rep.": "Representative", "Gen.": "General",
+            "Capt.": "Captain", "Lt.": "Lieutenant", "Sgt.": "Sergeant", "Rev.": "Reverend",
+            "Jr.": "Junior", "Sr.": "Senior", "Mt.": "Mount", "Ave.": "Avenue", "Blvd.": "Boulevard",
+            "Inc.": "Incorporated", "Ltd.": "Limited", "Corp.": "Corporation", "Dept.": "Department",
+            "Univ.": "University", "approx.": "approximately", "vs.": "versus", "etc.": "et cetera",
+            "e.g.": "for example", "i.e.": "that is", "a.m.": "a m", "p.m.": "p m",
+            "Jan.": "January", "Feb.": "February", "Mar.": "March", "Apr.": "April",
+            "Jun.": "June", "Jul.": "July", "Aug.": "August", "Sep.": "September",
+            "Sept.": "September", "Oct.": "October", "Nov.": "November", "Dec.": "December",
+        },
+        titles=frozenset({
+            "Mr.", "Mrs.", "Ms.", "Dr.", "Prof.", "Gov.", "Sen.", "Rep.", "Gen.", "Capt.",
+            "Lt.", "Sgt.", "Rev.", "Mt.", "e.g.", "i.e.", "vs.",
+        }),
+        symbols={"&": "and"},
+        url_words={".": "dot", "/": "slash", "@": "at", "-": "dash", "_": "underscore", ":": "colon"},
+        currencies={
+            "$": ("dollar", "dollars", "cent", "cents"),
+            "€": ("euro", "euros", "cent", "cents"),
+            "£": ("pound", "pounds", "penny", "pence"),
+            "¥": ("yen", "yen", "", ""),
+            "₹": ("rupee", "rupees", "paisa", "paise"),
+        },
+        units={
+            "km": ("kilometer", "kilometers"), "cm": ("centimeter", "centimeters"),
+            "mm": ("millimeter", "millimeters"), "kg": ("kilogram", "kilograms"),
+            "mg": ("milligram", "milligrams"), "lb": ("pound", "pounds"), "lbs": ("pound", "pounds"),
+            "mph": ("mile per hour", "miles per hour"), "km/h": ("kilometer per hour", "kilometers per hour"),
+            "°C": ("degree Celsius", "degrees Celsius"), "°F": ("degree Fahrenheit", "degrees Fahrenheit"),
+            "KB": ("kilobyte", "kilobytes"), "MB": ("megabyte", "megabytes"),
+            "GB": ("gigabyte", "gigabytes"), "TB": ("terabyte", "terabytes"),
+            "ms": ("millisecond", "milliseconds"), "GHz": ("gigahertz", "gigahertz"),
+        },
+        months=(
+            "January", "February", "March", "April", "May", "June", "July",
+            "August", "September", "October", "November", "December",
+        ),
+        number_words=english_number,
+        ordinal_words=english_ordinal,
+        year_words=english_year,
+    ),
+    'de': LanguageRules(
+        abbreviations={
+            "z.B.": "zum Beispiel", "d.h.": "das heißt", "bzw.": "beziehungsweise",
+            "usw.": "und so weiter", "ca.": "circa", "Nr.": "Nummer", "Dr.": "Doktor",
+            "Prof.": "Professor", "Hr.": "Herr", "Fr.": "Frau", "inkl.": "inklusive",
+            "ggf.": "gegebenenfalls", "evtl.": "eventuell", "u.a.": "unter anderem",
+        },
+        titles=frozenset({"z.B.", "d.h.", "Nr.", "Dr.", "Prof.", "Hr.", "Fr.", "ca.", "inkl.", "u.a."}),
+        symbols={"&": "und"},
+        url_words={".": "Punkt", "/": "Schrägstrich", "@": "ät", "-": "Bindestrich", "_": "Unterstrich"},
+        percent="Prozent",
+        currencies={"€": ("Euro", "Euro", "Cent", "Cent"), "$": ("Dollar", "Dollar", "Cent", "Cent")},
+        units={"km": ("Kilometer", "Kilometer"), "kg": ("Kilogramm", "Kilogramm"), "°C": ("Grad", "Grad")},
+        and_word="und",
+    ),
+    'es': LanguageRules(
+        abbreviations={
+            "Sr.": "señor", "Sra.": "señora", "Srta.": "señorita", "Dr.": "doctor",
+            "Dra.": "doctora", "Ud.": "usted", "Uds.": "ustedes", "etc.": "etcétera", "aprox.": "aproximadamente",
+        },
+        titles=frozenset({"Sr.", "Sra.", "Srta.", "Dr.", "Dra.", "aprox."}),
+        symbols={"&": "y"},
+        url_words={".": "punto", "/": "barra", "@": "arroba", "-": "guion", "_": "guion bajo"},
+        percent="por ciento",
+        currencies={"€": ("euro", "euros", "céntimo", "céntimos"), "$": ("dólar", "dólares", "centavo", "centavos")},
+        units={"km": ("kilómetro", "kilómetros"), "kg": ("kilo", "kilos"), "°C": ("grado", "grados")},
+        and_word="y",
+        minus_word="menos",
+    ),
+    'fr': LanguageRules(
+        abbreviations={
+            "M.": "Monsieur", "Mme": "Madame", "Mlle": "Mademoiselle", "Dr": "Docteur",
+            "etc.": "et cetera", "env.": "environ",
+        },
+        titles=frozenset({"M.", "env."}),
+        symbols={"&": "et"},
+        url_words={".": "point", "/": "barre oblique", "@": "arobase", "-": "tiret", "_": "tiret bas"},
+        percent="pour cent",
+        currencies={"€": ("euro", "euros", "centime", "centimes"), "$": ("dollar", "dollars", "cent", "cents")},
+        units={"km": ("kilomètre", "kilomètres"), "kg": ("kilo", "kilos"), "°C": ("degré", "degrés")},
+        and_word="et",
+        minus_word="moins",
+    ),
+}
+
+
+# ----- compiling -----
+
+def trie_regex(words: Iterable[str]) -> str:
+    """
+    Regex matching any of words, built from a character trie so shared
+    prefixes are tested once ('Dr.', 'Dra.' -> 'Dr(?:a\\.|\\.)').
+    Longer words win over their prefixes.
+    """
+    trie: Dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def emit(node) -> str:
+        ends = '' in node
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return f'(?:{body})?' if ends else body
+
+    return emit(trie)
+
+
+_NUMBER = r'\d{1,3}(?:,\d{3})+|\d+'
+
+
+class TextNormalizer:
+    """
+    One language's normalizer. Build with normalizer_for(lang), which
+    caches the compiled pattern per language.
+    """
+
+    def __init__(self, rules: LanguageRules):
+        self.rules = rules
+        speller = rules.number_words is not None
+
+        # URLs and e-mails get their own pass, run only when the text has one
+        self.address_pattern = re.compile(
+            r'(?P<url>\b(?:https?://|www\.)[^\s<>"]+?)(?=[.,;:!?)\]]*(?:\s|$))'
+            r'|(?P<email>\b[\w.+-]+@[\w-]+(?:\.[\w-]+)+\b)'
+        )
+        self._url_split = re.compile(r'([' + re.escape(''.join(rules.url_words)) + r'/.?=&#@:_-])')
+
+        parts = []
+        first_chars = set('0123456789-')
+        if speller:
+            months = '|'.join(rules.months)
+            first_chars.update(month[0] for month in rules.months)
+            parts += [
+                r'(?P<date_iso>(?P<iso_y>\d{4})-(?P<iso_m>0[1-9]|1[0-2])-(?P<iso_d>0[1-9]|[12]\d|3[01])\b)',
+                r'(?P<date_slash>(?P<sl_a>\d{1,2})/(?P<sl_b>\d{1,2})/(?P<sl_y>\d{4}|\d{2})\b)',
+                rf'(?P<month_day>(?P<md_month>{months})\s+(?P<md_day>[12]\d|3[01]|0?[1-9])(?:st|nd|rd|th)?\b'
+                r'(?:,?\s+(?P<md_year>\d{4})\b)?)',
+                r'(?P<time>(?P<t_h>[01]?\d|2[0-3]):(?P<t_m>[0-5]\d)(?!:?\d)'
+                r'(?:\s*(?P<t_ampm>[aApP]\.?[mM]\b\.?))?)',
+            ]
+        if rules.currencies:
+            first_chars.update(rules.currencies)
+            symbols = '|'.join(re.escape(symbol) for symbol in rules.currencies)
+            parts.append(
+                rf'(?P<money>(?P<cur>{symbols})\s?(?P<cur_int>{_NUMBER})(?:\.(?P<cur_frac>\d{{1,2}}))?'
+                r'(?:\s?(?P<cur_scale>thousand|million|billion|trillion|[kKmM]|bn)\b)?)'
+            )
+        parts.append(rf'(?P<percent>(?P<pct>(?:{_NUMBER})(?:\.\d+)?)\s?%)')
+        if speller:
+            parts.append(r'(?P<ordinal>(?P<ord>\d+)(?:st|nd|rd|th)\b)')
+        if rules.units:
+            units = '|'.join(re.escape(unit) for unit in sorted(rules.units, key=len, reverse=True))
+            parts.append(
+                rf'(?P<measure>(?P<m_neg>-)?(?P<m_num>(?:{_NUMBER})(?:\.\d+)?)\s?(?P<m_unit>{units})(?![\w/]))'
+            )
+        if speller:
+            parts.append(rf'(?P<number>(?P<neg>-)?(?P<num>{_NUMBER})(?:\.(?P<dec>\d+))?(?!\w|,\d|\.\d))')
+        if rules.abbreviations:
+            first_chars.update(abbreviation[0] for abbreviation in rules.abbreviations)
+            parts.append(rf'(?P<abbr>{trie_regex(rules.abbreviations)}(?!\w))')
+        if rules.symbols:
+            first_chars.update(symbol[0] for symbol in rules.symbols)
+            parts.append('(?P<symbol>' + '|'.join(re.escape(s) for s in rules.symbols) + ')')
+
+        # Every token starts a word, with one of a few characters: checking
+        # that first lets the scan skip ordinary text without trying each branch
+        gate = '[' + ''.join(re.escape(char) for char in sorted(first_chars)) + ']'
+        self.pattern = re.compile(rf'(?<![\w.,])(?={gate})(?:' + '|'.join(parts) + ')')
+
+    # ----- public -----
+
+    def normalize(self, text: str) -> str:
+        """Expanded text; spacing and everything without a rule is left as is"""
+        if '@' in text or '://' in text or 'www.' in text:
+            text = self.address_pattern.sub(self._replace, text)
+        return self.pattern.sub(self._replace, text)
+
+    def normalize_segments(self, segments: Iterable[str]) -> Iterator[str]:
+        """normalize() each segment lazily (for streamed generation)"""
+        for segment in segments:
+            yield self.normalize(segment)
+
+    # ----- helpers -----
+
+    def _cardinal(self, digits: str) -> str:
+        """Spelled-out integer ('1,234'; '007' digit by digit); digits as-is without a speller"""
+        plain = digits.replace(',', '')
+        if self.rules.number_words is None:
+            return plain
+        if len(plain) > 1 and plain.startswith('0'):
+            return " ".join(self.rules.number_words(int(d)) for d in plain)
+        return self.rules.number_words(int(plain))
+
+    def _decimal(self, value: str) -> str:
+        whole, _, fraction = value.partition('.')
+        if self.rules.number_words is None:
+            return value.replace(',', '')
+        words = self._cardinal(whole)
+        if fraction:
+            words += f" {self.rules.decimal_word} " + " ".join(self.rules.number_words(int(d)) for d in fraction)
+        return words
+
+    @staticmethod
+    def _is_one(value: str) -> bool:
+        return value.replace(',', '') == '1'
+
+    def _replace(self, m: 're.Match') -> str:
+        # Each alternative's outer group names its handler: 'url' -> _expand_url
+        return getattr(self, '_expand_' + m.lastgroup)(m)
+
+    @staticmethod
+    def _ends_sentence(m: 're.Match') -> bool:
+        """Whether the dot a token swallowed probably also ended the sentence"""
+        rest = m.string[m.end():m.end() + 2].lstrip(' ')
+        return not rest or rest[0] == '\n' or rest[0].isupper()
+
+    def _spell_address(self, address: str) -> str:
+        words = []
+        for piece in self._url_split.split(address):
+            if piece:
+                words.append(self.rules.url_words.get(piece, piece if piece.isalnum() else ''))
+        return " ".join(word for word in words if word)
+
+    def _date(self, year: Optional[str], month: int, day: int) -> Optional[str]:
+        if not 1 <= month <= 12 or not 1 <= day <= 31:
+            return None
+        words = f"{self.rules.months[month - 1]} {self.rules.ordinal_words(day)}"
+        if year:
+            words += f", {self.rules.year_words(int(year))}"
+        return words
+
+    # ----- token handlers -----
+
+    def _expand_url(self, m) -> str:
+        return self._spell_address(re.sub(r'^(?:https?://)?(?:www\.)?', '', m.group('url')).rstrip('/'))
+
+    def _expand_email(self, m) -> str:
+        return self._spell_address(m.group('email'))
+
+    def _expand_date_iso(self, m) -> str:
+        return self._date(m.group('iso_y'), int(m.group('iso_m')), int(m.group('iso_d'))) or m.group(0)
+
+    def _expand_date_slash(self, m) -> str:
+        a, b, year = int(m.group('sl_a')), int(m.group('sl_b')), m.group('sl_y')
+        if len(year) == 2:
+            year = str(2000 + int(year) if int(year) < 50 else 1900 + int(year))
+        month, day = (a, b) if self.rules.date_order == 'mdy' else (b, a)
+        return self._date(year, month, day) or m.group(0)
+
+    def _expand_month_day(self, m) -> str:
+        month = self.rules.months.index(m.group('md_month')) + 1
+        return self._date(m.group('md_year'), month, int(m.group('md_day'))) or m.group(0)
+
+    def _expand_time(self, m) -> str:
+        hour, minute = int(m.group('t_h')), int(m.group('t_m'))
+        ampm = m.group('t_ampm')
+        words = self.rules.number_words(hour)
+        if minute == 0:
+            words += "" if ampm else " o'clock"
+        elif minute < 10:
+            words += f" oh {self.rules.number_words(minute)}"
+        else:
+            words += f" {self.rules.number_words(minute)}"
+        if ampm:
+            words += " " + " ".join(ampm.replace('.', '').lower())
+            if ampm.endswith('.') and self._ends_sentence(m):
+                words += '.'
+        return words
+
+    def _expand_money(self, m) -> str:
+        major, majors, minor, minors = self.rules.currencies[m.group('cur')]
+        amount, fraction, scale = m.group('cur_int'), m.group('cur_frac'), m.group('cur_scale')
+        if scale:
+            scale = _SCALE_WORDS.get(scale, scale)
+            return f"{self._decimal(amount + ('.' + fraction if fraction else ''))} {scale} {majors}"
+        cents = int(fraction.ljust(2, '0')) if fraction else 0
+        if cents and not minor:
+            return f"{self._decimal(amount + '.' + fraction)} {majors}"
+        words = f"{self._cardinal(amount)} {major if self._is_one(amount) else majors}"
+        if cents:
+            words += f" {self.rules.and_word} {self._cardinal(str(cents))} {minor if cents == 1 else minors}"
+        return words
+
+    def _expand_percent(self, m) -> str:
+        return f"{self._decimal(m.group('pct'))} {self.rules.percent}"
+
+    def _expand_ordinal(self, m) -> str:
+        return self.rules.ordinal_words(int(m.group('ord')))
+
+    def _expand_measure(self, m) -> str:
+        value = m.group('m_num')
+        singular, plural = self.rules.units[m.group('m_unit')]
+        words = f"{self._decimal(value)} {singular if self._is_one(value) else plural}"
+        return (f"{self.rules.minus_word} " if m.group('m_neg') else "") + words
+
+    def _expand_number(self, m) -> str:
+        digits, decimals = m.group('num'), m.group('dec')
+        if decimals is None and ',' not in digits and len(digits) == 4 and self.rules.year_words:
+            words = self.rules.year_words(int(digits))  # Bare four-digit numbers are usually years
+        else:
+            words = self._decimal(digits + ('.' + decimals if decimals else ''))
+        return (f"{self.rules.minus_word} " if m.group('neg') else "") + words
+
+    def _expand_abbr(self, m) -> str:
+        abbreviation = m.group('abbr')
+        words = self.rules.abbreviations[abbreviation]
+        # The abbreviation's dot may also end the sentence: keep a full stop
+        # unless it is a title (always followed by a name)
+        if abbreviation.endswith('.') and abbreviation not in self.rules.titles and self._ends_sentence(m):
+            words += '.'
+        return words
+
+    def _expand_symbol(self, m) -> str:
+        return self.rules.symbols[m.group('symbol')]
+
+
+_SCALE_WORDS = {'k': 'thousand', 'K': 'thousand', 'm': 'million', 'M': 'million', 'bn': 'billion'}
+
+
+@lru_cache(maxsize=None)
+def normalizer_for(lang: Optional[str]) -> Optional[TextNormalizer]:
+    """Compiled normalizer for a language code ('en', 'de'...); None if it has no rules"""
+    rules = LANGUAGE_RULES.get((lang or '').lower())
+    return TextNormalizer(rules) if rules else None
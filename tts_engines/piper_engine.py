@@ -3,19 +3,19 @@ Piper TTS Engine - Local Neural TTS (Offline)
 """
 
 import os
-import wave
 import json
+import itertools
 import urllib.request
 from pathlib import Path
-from typing import Dict, Optional, List
+from typing import Dict, Iterable, Optional, List
 from .base_engine import BaseTTSEngine
+from .cancellation import CancellationToken, GenerationCancelled
+from .encoders import available_formats, open_audio_sink
+from .text_source import split_sentences
+from .wav_writer import WavWriter
 
-# Optional language detection
-try:
-    from langdetect import detect, LangDetectException
-    LANGDETECT_AVAILABLE = True
-except ImportError:
-    LANGDETECT_AVAILABLE = False
+from . import language_detect
+from .language_detect import LANGDETECT_AVAILABLE
 
 
 class PiperTTSEngine(BaseTTSEngine):
@@ -374,6 +374,8 @@ class PiperTTSEngine(BaseTTSEngine):
         self.MODELS_DIR.mkdir(parents=True, exist_ok=True)
         self._loaded_voice = None
         self._loaded_voice_id = None
+        self._downloads_completed = 0
+        self._voices_cache = None
 
     @property
     def name(self) -> str:
@@ -383,8 +385,35 @@ class PiperTTSEngine(BaseTTSEngine):
     def is_online(self) -> bool:
         return False
 
+    @property
+    def voices_generation(self):
+        """
+        Changes whenever installed voices may have changed: after a download
+        here, or when files are added to or removed from the models folder.
+        """
+        try:
+            dir_mtime = self.MODELS_DIR.stat().st_mtime_ns
+        except OSError:
+            dir_mtime = 0
+        return (self._downloads_completed, dir_mtime)
+
     def get_voices(self) -> Dict[str, Dict[str, str]]:
-        """Get Piper voices organized by category"""
+        """
+        Get Piper voices organized by category.
+
+        The result scans the models folder, so it is cached until
+        voices_generation changes. Treat the returned dict as read-only.
+        """
+        generation = self.voices_generation
+        if self._voices_cache and self._voices_cache[0] == generation:
+            return self._voices_cache[1]
+
+        result = self._scan_voices()
+        self._voices_cache = (generation, result)
+        return result
+
+    def _scan_voices(self) -> Dict[str, Dict[str, str]]:
+        """Build the voice catalog with download status from disk"""
         result = {}
 
         # Add predefined voices from PIPER_VOICES
@@ -501,7 +530,8 @@ class PiperTTSEngine(BaseTTSEngine):
     def download_voice(
         self,
         voice_id: str,
-        progress_callback: Optional[callable] = None
+        progress_callback: Optional[callable] = None,
+        cancel_token: Optional[CancellationToken] = None
     ) -> bool:
         """Download a voice model"""
         info = self.get_voice_info(voice_id)
@@ -528,12 +558,14 @@ class PiperTTSEngine(BaseTTSEngine):
                     progress = min(0.9, (block_num * block_size / total_size) * 0.8 + 0.1)
                     progress_callback(progress, f"Downloading: {int(progress * 100)}%")
 
-            urllib.request.urlretrieve(model_url, model_path, reporthook=report_progress)
+            self._download_file(model_url, model_path, report_progress, cancel_token)
 
             # Download config
             if progress_callback:
                 progress_callback(0.95, "Downloading config...")
-            urllib.request.urlretrieve(config_url, config_path)
+            self._download_file(config_url, config_path, None, cancel_token)
+
+            self._downloads_completed += 1
 
             if progress_callback:
                 progress_callback(1.0, "Download complete!")
@@ -546,8 +578,49 @@ class PiperTTSEngine(BaseTTSEngine):
                 model_path.unlink()
             if config_path.exists():
                 config_path.unlink()
+            if isinstance(e, GenerationCancelled) and progress_callback:
+                progress_callback(0, "Download cancelled")
             raise
 
+    def _download_file(
+        self,
+        url: str,
+        dest: Path,
+        reporthook: Optional[callable] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ):
+        """
+        Stream a URL to disk in blocks, checking the cancel token between blocks.
+
+        Data goes to a .part file that is renamed only once complete, so an
+        aborted transfer never leaves a truncated model behind.
+        """
+        block_size = 64 * 1024
+        part_path = dest.with_name(dest.name + ".part")
+        timeout = 30
+        if cancel_token and cancel_token.remaining() is not None:
+            timeout = max(1.0, min(timeout, cancel_token.remaining()))
+
+        try:
+            with urllib.request.urlopen(url, timeout=timeout) as response, \
+                    open(part_path, 'wb') as out_file:
+                total_size = int(response.headers.get('Content-Length') or -1)
+                block_num = 0
+                while True:
+                    if cancel_token:
+                        cancel_token.raise_if_cancelled()
+                    block = response.read(block_size)
+                    if not block:
+                        break
+                    out_file.write(block)
+                    block_num += 1
+                    if reporthook:
+                        reporthook(block_num, block_size, total_size)
+            os.replace(part_path, dest)
+        finally:
+            if part_path.exists():
+                part_path.unlink()
+
     def generate(
         self,
         text: str,
@@ -556,9 +629,34 @@ class PiperTTSEngine(BaseTTSEngine):
         speed: float = 1.0,
         pitch: int = 0,
         volume: int = 0,
-        progress_callback: Optional[callable] = None
+        progress_callback: Optional[callable] = None,
+        cancel_token: Optional[CancellationToken] = None
     ) -> bool:
         """Generate speech using Piper TTS"""
+        # Sentence-aligned segments give the journal resume points in long texts
+        return self.generate_stream(
+            split_sentences(text), voice, output_path, speed, pitch, volume,
+            progress_callback, cancel_token, total_chars=len(text)
+        )
+
+    def generate_stream(
+        self,
+        segments: Iterable[str],
+        voice: str,
+        output_path: str,
+        speed: float = 1.0,
+        pitch: int = 0,
+        volume: int = 0,
+        progress_callback: Optional[callable] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        total_chars: Optional[int] = None
+    ) -> bool:
+        """
+        Generate speech for a stream of segments into a single audio file
+        (format from the extension). WAV output is checkpointed per segment:
+        re-running an interrupted job skips what is already on disk.
+        """
+        journal = None
         try:
             from piper import PiperVoice
 
@@ -566,10 +664,13 @@ class PiperTTSEngine(BaseTTSEngine):
             if not self.is_voice_downloaded(voice):
                 if progress_callback:
                     progress_callback(0.1, f"Downloading voice {voice}...")
-                self.download_voice(voice, progress_callback)
+                self.download_voice(voice, progress_callback, cancel_token)
 
             model_path = self.MODELS_DIR / f"{voice}.onnx"
 
+            if cancel_token:
+                cancel_token.raise_if_cancelled()
+
             if progress_callback:
                 progress_callback(0.3, "Loading voice model...")
 
@@ -585,20 +686,73 @@ class PiperTTSEngine(BaseTTSEngine):
             # Note: Piper doesn't support speed/pitch/volume adjustments directly
             # These would need post-processing (future enhancement)
 
-            with wave.open(output_path, 'wb') as wav_file:
-                wav_file.setnchannels(1)
-                wav_file.setsampwidth(2)
-                wav_file.setframerate(self._loaded_voice.config.sample_rate)
-
-                for audio_chunk in self._loaded_voice.synthesize(text):
-                    wav_file.writeframes(audio_chunk.audio_int16_bytes)
+            sample_rate = self._loaded_voice.config.sample_rate
+            segments = (segment for segment in self._prepared_segments(segments, voice) if segment.strip())
+            done_chars = 0
+            pending = None  # First segment not covered by the journal
+
+            # Encoders can't append to a finished file, so only WAV is checkpointed
+            if output_path.lower().endswith('.wav'):
+                journal = self._open_journal(output_path, voice, speed, pitch, volume)
+                for index, segment in enumerate(segments):
+                    if not journal.is_done(index, segment):
+                        pending = (index, segment)
+                        break
+                done_chars = journal.resumed_chars
+                if journal.resume_offset:
+                    audio_sink = WavWriter(output_path, sample_rate, resume_offset=journal.resume_offset)
+                    if progress_callback:
+                        progress_callback(0.5, f"Resuming after {journal.resumed_chars:,} characters...")
+                else:
+                    audio_sink = open_audio_sink(output_path, sample_rate)
+            else:
+                audio_sink = open_audio_sink(output_path, sample_rate)
+
+            remaining = enumerate(segments, pending[0] + 1 if pending else 0)
+            if pending:
+                remaining = itertools.chain([pending], remaining)
+            elif journal is not None:
+                remaining = iter(())  # The journal covered every segment
+
+            # PCM goes straight to the sink for the output extension: WavWriter
+            # (RF64 past 4 GB, valid even if interrupted) or a FLAC/Opus/MP3 encoder
+            with audio_sink:
+                for index, segment in remaining:
+                    number = index + 1
+                    # Piper yields one chunk per sentence - check for cancel in between
+                    for audio_chunk in self._loaded_voice.synthesize(segment):
+                        if cancel_token:
+                            cancel_token.raise_if_cancelled()
+                        audio_sink.write(audio_chunk.audio_int16_bytes)
+
+                    if journal is not None:
+                        audio_sink.flush()
+                        journal.record(index, segment, audio_sink.end_offset)
+
+                    done_chars += len(segment)
+                    if progress_callback:
+                        if total_chars:
+                            progress = 0.5 + 0.5 * min(1.0, done_chars / total_chars)
+                            progress_callback(progress, f"Generating speech... {int(progress * 100)}%")
+                        else:
+                            progress_callback(0.5, f"Generated segment {number}...")
+
+            if journal is not None:
+                journal.finish()
 
             if progress_callback:
                 progress_callback(1.0, "Complete!")
 
             return True
 
+        except GenerationCancelled:
+            self._keep_or_remove_partial_output(output_path, journal)
+            if progress_callback:
+                progress_callback(0, "Cancelled")
+            raise
+
         except Exception as e:
+            self._keep_or_remove_partial_output(output_path, journal)
             if progress_callback:
                 progress_callback(0, f"Error: {str(e)}")
             raise
@@ -614,6 +768,9 @@ class PiperTTSEngine(BaseTTSEngine):
     def get_output_extension(self) -> str:
         return ".wav"
 
+    def get_output_formats(self) -> List[str]:
+        return available_formats()
+
     def has_downloaded_voices_for_language(self, lang_code: str) -> bool:
         """Check if any voices are downloaded for a specific language"""
         all_voices = self.get_voices()
@@ -643,13 +800,13 @@ class PiperTTSEngine(BaseTTSEngine):
 
     @staticmethod
     def detect_language(text: str) -> Optional[str]:
-        """Detect language from text. Returns ISO 639-1 code (e.g., 'en', 'es', 'it')"""
-        if not LANGDETECT_AVAILABLE or not text or len(text.strip()) < 10:
-            return None
-        try:
-            return detect(text)
-        except (LangDetectException, Exception):
-            return None
+        """
+        Detect language from text. Returns ISO 639-1 code (e.g., 'en', 'es', 'it')
+
+        Scripts such as Hangul, Kana, Thai or Greek decide the language in one
+        pass; only Latin/Cyrillic/Arabic text falls through to langdetect.
+        """
+        return language_detect.detect_language(text)
 
     def get_voice_language(self, voice_id: str) -> Optional[str]:
         """Extract language code from voice_id (e.g., 'en_US-amy-medium' -> 'en')"""
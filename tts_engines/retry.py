@@ -0,0 +1,53 @@
+"""
+Retry - Exponential backoff with jitter for transient network failures
+"""
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from .cancellation import CancellationToken, GenerationCancelled
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    How often and how patiently to retry a failed network call.
+
+    Delays grow as base_delay * 2**(attempt - 1), capped at max_delay, with
+    "full jitter" (a random delay between 0 and that value) so many clients
+    failing together don't retry in lockstep.
+    """
+    max_attempts: int = 5
+    base_delay: float = 0.5
+    max_delay: float = 20.0
+    jitter: bool = True
+
+    def delay(self, attempt: int) -> float:
+        """Seconds to wait after the given (1-based) failed attempt"""
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, delay) if self.jitter else delay
+
+    def sleep(self, delay: float, cancel_token: Optional[CancellationToken] = None):
+        """Wait out a backoff delay, waking early (and raising) if cancelled"""
+        if cancel_token is None:
+            time.sleep(delay)
+            return
+        if cancel_token.wait(delay):
+            raise GenerationCancelled(cancel_token.reason or "Cancelled")
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """
+    Whether a failure is worth retrying: dropped connections, timeouts and
+    websocket/HTTP errors from aiohttp or edge_tts. Bad input (e.g. an
+    invalid voice, ValueError) is not.
+    """
+    if isinstance(error, (GenerationCancelled, ValueError, ImportError)):
+        return False
+    if isinstance(error, (OSError, asyncio.TimeoutError, EOFError)):
+        return True
+    module = type(error).__module__ or ""
+    return module.startswith(("aiohttp", "edge_tts"))
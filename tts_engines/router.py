@@ -0,0 +1,342 @@
+"""
+Engine Router - Pick the engine expected to finish first, with hedged requests
+
+Tracks recent latency and error rate per (engine, language). A request for
+a voice is routed to whichever engine in the voice's equivalence class
+(same language, same gender where possible) is expected to finish first.
+When the chosen engine is online and hasn't produced audio within the
+hedge delay, an offline equivalent is started as well; the first to finish
+wins and the other is cancelled.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .base_engine import BaseTTSEngine
+from .cancellation import CancellationToken, GenerationCancelled
+
+# Smoothing factor for latency / error moving averages
+STATS_ALPHA = 0.3
+
+# Seconds to wait for the first audio from an online engine before hedging
+DEFAULT_HEDGE_DELAY = 3.0
+
+# Prior (startup seconds, seconds per character) before anything is measured;
+# Piper's startup includes loading the voice model
+_PRIORS = {
+    'edge': (1.0, 0.004),
+    'piper': (2.0, 0.01),
+}
+
+
+class EngineStats:
+    """Moving averages of latency and failures for one engine and language"""
+
+    def __init__(self, startup: float, per_char: float):
+        self.startup = startup
+        self.per_char = per_char
+        self.error_rate = 0.0
+        self.samples = 0
+
+    def record_success(self, elapsed: float, chars: int):
+        if elapsed < self.startup:
+            # Faster than the assumed fixed cost (e.g. model already loaded)
+            self.startup += STATS_ALPHA * (elapsed - self.startup)
+        per_char = max(0.0, elapsed - self.startup) / max(1, chars)
+        if self.samples == 0:
+            self.per_char = per_char
+        else:
+            self.per_char += STATS_ALPHA * (per_char - self.per_char)
+        self.error_rate *= (1 - STATS_ALPHA)
+        self.samples += 1
+
+    def record_failure(self):
+        self.error_rate += STATS_ALPHA * (1 - self.error_rate)
+        self.samples += 1
+
+    def expected_seconds(self, chars: int) -> float:
+        """Expected time to finish, inflated by the chance of having to retry elsewhere"""
+        base = self.startup + self.per_char * chars
+        return base / max(0.05, 1 - self.error_rate)
+
+
+@dataclass
+class RoutedResult:
+    """Which engine and voice produced the output, and where it was written"""
+    engine: str
+    voice: str
+    output_path: str
+    hedged: bool = False
+
+
+class EngineRouter:
+    """
+    Routes generation requests across engines by expected completion time.
+
+    Engines run on the router's own threads, one engine instance per thread
+    and engine (Piper caches one loaded model per instance).
+    """
+
+    def __init__(
+        self,
+        engine_factories: Dict[str, Callable[[], BaseTTSEngine]],
+        hedge_delay: float = DEFAULT_HEDGE_DELAY,
+        max_workers: int = 4
+    ):
+        """
+        Args:
+            engine_factories: {engine_key: engine class or factory}
+            hedge_delay: Seconds without audio from an online engine before
+                         an offline equivalent is started (None disables hedging)
+            max_workers: Concurrent engine attempts across all requests
+        """
+        self.engine_factories = engine_factories
+        self.hedge_delay = hedge_delay
+        self._probes = {key: factory() for key, factory in engine_factories.items()}
+        self._stats: Dict[Tuple[str, str], EngineStats] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="router")
+
+    # ----- statistics -----
+
+    def stats(self, engine_key: str, lang: Optional[str]) -> EngineStats:
+        key = (engine_key, lang or '')
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = EngineStats(*_PRIORS.get(engine_key, (1.0, 0.01)))
+            return stats
+
+    def _record(self, engine_key: str, lang: Optional[str], elapsed: Optional[float], chars: int):
+        stats = self.stats(engine_key, lang)
+        with self._lock:
+            if elapsed is None:
+                stats.record_failure()
+            else:
+                stats.record_success(elapsed, chars)
+
+    # ----- voice equivalence -----
+
+    def equivalent_voice(self, voice: str, source_key: str, target_key: str) -> Optional[str]:
+        """
+        A voice on target_key matching voice on source_key: same language,
+        preferring the same locale and gender. Offline voices must already be
+        downloaded. Returns None when the target has no usable equivalent.
+        """
+        if source_key == target_key:
+            return voice
+        source, target = self._probes[source_key], self._probes[target_key]
+        lang = source.get_voice_language(voice)
+        if not lang:
+            return None
+
+        source_desc = ""
+        for voices in source.get_voices().values():
+            source_desc = voices.get(voice, source_desc)
+        gender = "Female" if "Female" in source_desc else "Male" if "Male" in source_desc else None
+        locale = _locale_of(voice)
+
+        candidates = []
+        for voices in target.get_voices().values():
+            for voice_id, desc in voices.items():
+                if target.get_voice_language(voice_id) != lang:
+                    continue
+                if not target.is_online and not _is_installed(target, voice_id):
+                    continue
+                rank = (_locale_of(voice_id) != locale, not (gender and gender in desc))
+                candidates.append((rank, voice_id))
+        return min(candidates)[1] if candidates else None
+
+    def candidates(self, engine_key: str, voice: str) -> List[Tuple[str, str]]:
+        """(engine_key, voice) for every engine that can speak this voice's class"""
+        result = []
+        for key in self.engine_factories:
+            equivalent = self.equivalent_voice(voice, engine_key, key)
+            if equivalent:
+                result.append((key, equivalent))
+        return result
+
+    def choose(self, engine_key: str, voice: str, chars: int) -> List[Tuple[str, str]]:
+        """Candidates ordered by expected completion time (fastest first)"""
+        lang = self._probes[engine_key].get_voice_language(voice)
+        return sorted(
+            self.candidates(engine_key, voice),
+            key=lambda c: self.stats(c[0], lang).expected_seconds(chars)
+        )
+
+    # ----- generation -----
+
+    def _engine(self, engine_key: str) -> BaseTTSEngine:
+        engines = getattr(self._local, 'engines', None)
+        if engines is None:
+            engines = self._local.engines = {}
+        if engine_key not in engines:
+            engines[engine_key] = self.engine_factories[engine_key]()
+        return engines[engine_key]
+
+    def generate(
+        self,
+        text: str,
+        engine_key: str,
+        voice: str,
+        output_path: str,
+        speed: float = 1.0,
+        pitch: int = 0,
+        volume: int = 0,
+        progress_callback: Optional[callable] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        hedge: bool = True
+    ) -> RoutedResult:
+        """
+        Generate with the engine expected to finish first.
+
+        The output extension follows the winning engine (.mp3 for Edge,
+        .wav for Piper), so callers should use RoutedResult.output_path.
+        Falls back to the next candidate if the chosen engine fails.
+        """
+        token = cancel_token or CancellationToken()
+        lang = self._probes[engine_key].get_voice_language(voice)
+        ranked = self.choose(engine_key, voice, len(text)) or [(engine_key, voice)]
+        base = os.path.splitext(output_path)[0]
+        progress = _MonotonicProgress(progress_callback)
+
+        primary, fallbacks = ranked[0], ranked[1:]
+        attempts = [self._start(primary, text, base, lang, speed, pitch, volume, progress, token)]
+        hedged = False
+
+        # Hedge only an online primary; a local engine doesn't stall on the network
+        hedge_delay = self.hedge_delay if hedge and fallbacks else None
+        if hedge_delay is not None and self._probes[primary[0]].is_online:
+            deadline = time.monotonic() + hedge_delay
+            while not attempts[0].future.done() and not attempts[0].has_audio():
+                if token.cancelled or time.monotonic() >= deadline:
+                    break
+                time.sleep(0.05)
+            if not attempts[0].future.done() and not attempts[0].has_audio() and not token.cancelled:
+                progress.status_prefix = "Hedging: "
+                hedged = True
+                attempts.append(self._start(fallbacks.pop(0), text, base, lang, speed, pitch, volume, progress, token))
+
+        last_error: Optional[BaseException] = None
+        while True:
+            pending = [a for a in attempts if not a.future.done()]
+            if pending:
+                wait([a.future for a in pending], return_when=FIRST_COMPLETED)
+            for attempt in attempts:
+                if not attempt.future.done() or attempt.collected:
+                    continue
+                attempt.collected = True
+                error = attempt.future.exception()
+                if error is None:
+                    for other in attempts:
+                        if other is not attempt:
+                            other.token.cancel("Another engine finished first")
+                            # A loser may also have finished (same wait() round, or
+                            # before it saw the cancel); its output goes either way
+                            other.future.add_done_callback(
+                                lambda _, path=other.path: BaseTTSEngine._remove_partial_output(path)
+                            )
+                    final_path = base + os.path.splitext(attempt.path)[1]
+                    os.replace(attempt.path, final_path)
+                    return RoutedResult(attempt.engine_key, attempt.voice, final_path, hedged)
+                last_error = error
+
+            if token.cancelled:
+                token.raise_if_cancelled()
+            if any(not a.future.done() for a in attempts):
+                continue
+            if not fallbacks or isinstance(last_error, GenerationCancelled):
+                raise last_error
+            # Every attempt so far failed: fail over to the next candidate
+            attempts.append(self._start(fallbacks.pop(0), text, base, lang, speed, pitch, volume, progress, token))
+
+    def _start(self, candidate, text, base, lang, speed, pitch, volume, progress, parent_token):
+        engine_key, voice = candidate
+        ext = self._probes[engine_key].get_output_extension()
+        attempt = _Attempt(engine_key, voice, f"{base}.{engine_key}.part{ext}", parent_token)
+
+        def run():
+            start = time.monotonic()
+            try:
+                self._engine(engine_key).generate(
+                    text=text,
+                    voice=voice,
+                    output_path=attempt.path,
+                    speed=speed,
+                    pitch=pitch,
+                    volume=volume,
+                    progress_callback=progress.callback,
+                    cancel_token=attempt.token
+                )
+            except GenerationCancelled:
+                # Losing the race without producing audio still counts against the engine
+                if not parent_token.cancelled and not attempt.has_audio():
+                    self._record(engine_key, lang, None, len(text))
+                BaseTTSEngine._remove_partial_output(attempt.path)
+                raise
+            except BaseException:
+                self._record(engine_key, lang, None, len(text))
+                BaseTTSEngine._remove_partial_output(attempt.path)
+                raise
+            self._record(engine_key, lang, time.monotonic() - start, len(text))
+
+        attempt.future = self._pool.submit(run)
+        return attempt
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False)
+
+
+class _Attempt:
+    """One engine working on a routed request, with a token linked to the request's"""
+
+    def __init__(self, engine_key: str, voice: str, path: str, parent_token: CancellationToken):
+        self.engine_key = engine_key
+        self.voice = voice
+        self.path = path
+        self.token = CancellationToken(timeout=parent_token.remaining())
+        parent_token.add_callback(lambda: self.token.cancel(parent_token.reason))
+        self.future = None
+        self.collected = False
+
+    def has_audio(self) -> bool:
+        """Engines write audio straight to the file, so any bytes mean audio arrived"""
+        try:
+            return os.path.getsize(self.path) > 0
+        except OSError:
+            return False
+
+
+class _MonotonicProgress:
+    """Merge progress from concurrent attempts without the bar jumping backwards"""
+
+    def __init__(self, progress_callback: Optional[callable]):
+        self.progress_callback = progress_callback
+        self.status_prefix = ""
+        self._best = 0.0
+        self._lock = threading.Lock()
+
+    def callback(self, progress: float, status: str):
+        if not self.progress_callback:
+            return
+        with self._lock:
+            if progress < self._best:
+                return
+            self._best = progress
+        self.progress_callback(progress, self.status_prefix + status)
+
+
+def _locale_of(voice_id: str) -> str:
+    """'en-US-AriaNeural' / 'en_US-amy-medium' -> 'en-us'"""
+    parts = voice_id.replace('_', '-').split('-')
+    return '-'.join(parts[:2]).lower()
+
+
+def _is_installed(engine: BaseTTSEngine, voice_id: str) -> bool:
+    is_downloaded = getattr(engine, 'is_voice_downloaded', None)
+    return is_downloaded(voice_id) if is_downloaded else True
@@ -0,0 +1,255 @@
+"""
+Scheduler - Group multi-voice work by voice and keep each voice on one worker
+
+A Piper engine holds one loaded model, so rendering items in their original
+order reloads the model at every speaker or language switch. The scheduler
+groups items by voice and hands each group to a lane (a worker thread with
+its own engine) that already has that voice loaded, or else to the least
+busy lane. Outputs are written per item, so the caller (or merge_into)
+reassembles them in the original order.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+
+from .audio_merge import merge_audio
+from .base_engine import BaseTTSEngine
+from .cancellation import CancellationToken
+
+# A model load costs about as much time as rendering this many characters
+LOAD_COST_CHARS = 600
+
+
+@dataclass
+class RenderItem:
+    """One piece of text, its voice, and where its audio goes"""
+    text: str
+    voice: str
+    output_path: str
+
+
+@dataclass
+class ScheduleReport:
+    """How a batch was scheduled"""
+    items: int
+    voices: int
+    model_loads: int     # loads with the voice-affinity schedule
+    naive_loads: int     # loads rendering the items in order, in contiguous chunks per lane
+
+    @property
+    def loads_saved(self) -> int:
+        """Loads avoided versus the baseline; negative if the schedule loaded more"""
+        return self.naive_loads - self.model_loads
+
+
+class _Lane:
+    """One worker thread with its own engine and the voice it has loaded"""
+
+    def __init__(self, index: int, engine_factory: Callable[[], BaseTTSEngine]):
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"voice-lane-{index}")
+        self.engine_factory = engine_factory
+        self.engine: Optional[BaseTTSEngine] = None
+        self.voice: Optional[str] = None
+
+    def run(self, job: Callable):
+        return self.executor.submit(job)
+
+
+def naive_model_loads(voices: Sequence[str], loaded: Sequence[Optional[str]] = (None,)) -> int:
+    """
+    Model loads when the voices are split in order into one contiguous chunk
+    per lane (one load per switch). loaded holds each lane's current voice,
+    so the baseline uses the same lanes as the voice-affinity schedule.
+    """
+    lanes = max(1, len(loaded))
+    size = -(-len(voices) // lanes) or 1
+    loads = 0
+    for lane_index, start in enumerate(range(0, len(voices), size)):
+        previous = loaded[lane_index]
+        for voice in voices[start:start + size]:
+            if voice != previous:
+                loads += 1
+                previous = voice
+    return loads
+
+
+class VoiceAffinityScheduler:
+    """
+    Runs RenderItems on a fixed set of lanes, minimizing model switches.
+
+    Lanes keep their engines (and loaded voices) between render() calls, so
+    keep one scheduler per engine type for the session.
+
+    Args:
+        engine_factory: Creates an engine for each lane
+        workers: Number of lanes (default: 4 for online engines, half the
+                 cores for local ones)
+        load_cost_chars: Cost of a model load in characters of rendering;
+                         0 for engines with nothing to load
+    """
+
+    def __init__(
+        self,
+        engine_factory: Callable[[], BaseTTSEngine],
+        workers: Optional[int] = None,
+        load_cost_chars: Optional[int] = None
+    ):
+        probe = engine_factory()
+        if workers is None:
+            workers = 4 if probe.is_online else max(1, (os.cpu_count() or 2) // 2)
+        if load_cost_chars is None:
+            load_cost_chars = 0 if probe.is_online else LOAD_COST_CHARS
+        self.load_cost_chars = load_cost_chars
+        self._lanes = [_Lane(i, engine_factory) for i in range(workers)]
+        self._lock = threading.Lock()  # One batch at a time keeps lane voices predictable
+
+    @property
+    def workers(self) -> int:
+        return len(self._lanes)
+
+    def plan(self, items: Sequence[RenderItem]) -> List[List[int]]:
+        """
+        Item indices for each lane, in the order the lane renders them.
+
+        Items are grouped by voice. A group much larger than a fair share of
+        the batch is split into contiguous runs so it can use several lanes.
+        Runs are placed largest first on the lane where they finish earliest,
+        counting a model load unless the lane already has that voice.
+        """
+        groups: Dict[str, List[int]] = {}
+        for index, item in enumerate(items):
+            groups.setdefault(item.voice, []).append(index)
+
+        total = sum(len(item.text) for item in items) or 1
+        fair_share = total / len(self._lanes)
+        runs: List[List[int]] = []
+        for indices in groups.values():
+            chars = sum(len(items[i].text) for i in indices)
+            pieces = max(1, min(len(self._lanes), len(indices), round(chars / fair_share)))
+            if chars <= fair_share + self.load_cost_chars:
+                pieces = 1
+            size = -(-len(indices) // pieces)
+            runs.extend(indices[start:start + size] for start in range(0, len(indices), size))
+
+        def run_chars(run):
+            return sum(len(items[i].text) for i in run)
+
+        loads = [0.0] * len(self._lanes)
+        voices = [lane.voice for lane in self._lanes]
+        assigned: List[List[List[int]]] = [[] for _ in self._lanes]
+        for run in sorted(runs, key=run_chars, reverse=True):
+            voice = items[run[0]].voice
+
+            def finish_time(lane_index):
+                # A lane that already has (or will have) this voice skips the load
+                has_voice = voices[lane_index] == voice or any(
+                    items[r[0]].voice == voice for r in assigned[lane_index]
+                )
+                return loads[lane_index] + run_chars(run) + (0 if has_voice else self.load_cost_chars)
+
+            best = min(range(len(self._lanes)), key=finish_time)
+            loads[best] = finish_time(best)
+            assigned[best].append(run)
+
+        schedule = []
+        for lane_index, lane_runs in enumerate(assigned):
+            # Loaded voice first, then one block per voice in original order
+            first_seen: Dict[str, int] = {}
+            for run in lane_runs:
+                first_seen.setdefault(items[run[0]].voice, run[0])
+            order = sorted(
+                first_seen,
+                key=lambda v: (v != voices[lane_index], first_seen[v])
+            )
+            lane_items = []
+            for voice in order:
+                lane_items.extend(sorted(i for run in lane_runs if items[run[0]].voice == voice for i in run))
+            schedule.append(lane_items)
+        return schedule
+
+    def _count_loads(self, items: Sequence[RenderItem], schedule: List[List[int]]) -> int:
+        loads = 0
+        for lane, lane_items in zip(self._lanes, schedule):
+            current = lane.voice
+            for index in lane_items:
+                if items[index].voice != current:
+                    loads += 1
+                    current = items[index].voice
+        return loads
+
+    def render(
+        self,
+        items: Sequence[RenderItem],
+        speed: float = 1.0,
+        pitch: int = 0,
+        volume: int = 0,
+        progress_callback: Optional[Callable[[float, str], None]] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        merge_into: Optional[str] = None
+    ) -> ScheduleReport:
+        """
+        Render every item to its output_path. With merge_into, the item
+        outputs are then joined in their original order into that file.
+        """
+        token = cancel_token or CancellationToken()
+        with self._lock:
+            schedule = self.plan(items)
+            report = ScheduleReport(
+                items=len(items),
+                voices=len({item.voice for item in items}),
+                model_loads=self._count_loads(items, schedule),
+                naive_loads=naive_model_loads(
+                    [item.voice for item in items], [lane.voice for lane in self._lanes]
+                ),
+            )
+            done = [0]
+            done_lock = threading.Lock()
+
+            def run_lane(lane: _Lane, lane_items: List[int]):
+                if lane.engine is None:
+                    lane.engine = lane.engine_factory()
+                for index in lane_items:
+                    token.raise_if_cancelled()
+                    item = items[index]
+                    lane.engine.generate(
+                        text=item.text,
+                        voice=item.voice,
+                        output_path=item.output_path,
+                        speed=speed,
+                        pitch=pitch,
+                        volume=volume,
+                        cancel_token=token
+                    )
+                    lane.voice = item.voice
+                    with done_lock:
+                        done[0] += 1
+                        if progress_callback:
+                            progress_callback(done[0] / len(items), f"Rendered {done[0]}/{len(items)} segments")
+
+            futures = [
+                lane.run(lambda lane=lane, lane_items=lane_items: run_lane(lane, lane_items))
+                for lane, lane_items in zip(self._lanes, schedule) if lane_items
+            ]
+            try:
+                for future in futures:
+                    future.result()
+            except BaseException:
+                # Stop the other lanes promptly
+                token.cancel("Segment failed")
+                for future in futures:
+                    try:
+                        future.result()
+                    except BaseException:
+                        pass
+                raise
+
+        if merge_into:
+            merge_audio([item.output_path for item in items], merge_into)
+        return report
+
+    def shutdown(self):
+        for lane in self._lanes:
+            lane.executor.shutdown(wait=False)
@@ -0,0 +1,435 @@
+"""
+Subtitles - Dub SRT/VTT subtitle files: one clip per cue, placed at its timestamp
+
+parse_subtitles() reads SRT or WebVTT cues (timing, text; tags, styling and
+sound descriptions removed). SubtitleRenderer renders every cue in parallel
+on a VoiceAffinityScheduler, trims each clip's leading and trailing silence,
+time-stretches clips that run past their window (the cue plus the gap
+before the next cue) and writes them at their start times on one track.
+Cues that still don't fit at the maximum stretch are cut at the next cue
+and reported.
+"""
+
+import os
+import re
+import shutil
+import tempfile
+import time
+from array import array
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from html import unescape
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from .audio_merge import _resample_block, read_wav_info
+from .base_engine import BaseTTSEngine
+from .cancellation import CancellationToken, GenerationCancelled
+from .encoders import decode_to_wav, open_audio_sink
+from .scheduler import RenderItem, ScheduleReport, VoiceAffinityScheduler
+from .wav_writer import WavWriter
+
+# Optional vectorized time-stretch
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+SUBTITLE_EXTENSIONS = ('.srt', '.vtt')
+
+# Fastest speed-up applied to fit a clip; more than this hurts intelligibility
+MAX_STRETCH = 1.5
+
+# Time-stretch analysis frame (seconds); frames overlap by half
+STRETCH_FRAME_SECONDS = 0.03
+
+# Samples quieter than this (16-bit amplitude, about -44 dBFS) count as silence
+SILENCE_THRESHOLD = 200
+
+# Lanes for online engines: cues are short, so many requests can be in flight
+ONLINE_WORKERS = 16
+
+_TIMESTAMP = r'(?:\d+:)?\d{1,2}:\d{2}[.,]\d{1,3}'
+_TIMING = re.compile(rf'^\s*({_TIMESTAMP})\s*-->\s*({_TIMESTAMP})')
+_TAG = re.compile(r'<[^>]*>|\{\\[^}]*\}')                  # <i>, <v Bob>, <00:01.000>, {\an8}
+_SOUND = re.compile(r'\[[^\]]*\]|\([A-Z][A-Z \'-]*\)|♪+')  # [door slams], (LAUGHS), ♪
+_DIALOGUE_DASH = re.compile(r'^\s*[-–]\s*')
+
+
+@dataclass
+class Cue:
+    """One subtitle: spoken text and its time on the video (seconds)"""
+    index: int
+    start: float
+    end: float
+    text: str
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+def _seconds(timestamp: str) -> float:
+    """'01:02:03,500' / '02:03.500' -> seconds"""
+    total = 0.0
+    for part in timestamp.replace(',', '.').split(':'):
+        total = total * 60 + float(part)
+    return total
+
+
+def _clean_cue_text(lines: Sequence[str]) -> str:
+    spoken = []
+    for line in lines:
+        line = _SOUND.sub(' ', unescape(_TAG.sub('', line)))
+        line = _DIALOGUE_DASH.sub('', line).strip()
+        if line:
+            spoken.append(line)
+    return ' '.join(' '.join(spoken).split())
+
+
+def parse_subtitles(text: str) -> List[Cue]:
+    """
+    Cues of an SRT or WebVTT file, in start order.
+
+    Blocks without a timing line (the WEBVTT header, NOTE, STYLE, REGION)
+    and cues with nothing to say (only tags or sound descriptions) are skipped.
+    """
+    cues = []
+    blocks = re.split(r'\n\s*\n', text.lstrip('﻿').replace('\r\n', '\n').replace('\r', '\n'))
+    for block in blocks:
+        lines = block.strip('\n').split('\n')
+        # SRT: number, timing, text; VTT: optional identifier, timing, text
+        for i, line in enumerate(lines[:3]):
+            timing = _TIMING.match(line)
+            if timing:
+                spoken = _clean_cue_text(lines[i + 1:])
+                start, end = _seconds(timing.group(1)), _seconds(timing.group(2))
+                if spoken and end > start:
+                    cues.append(Cue(0, start, end, spoken))
+                break
+    cues.sort(key=lambda cue: cue.start)
+    for index, cue in enumerate(cues):
+        cue.index = index
+    return cues
+
+
+def looks_like_subtitles(text: str) -> bool:
+    """True for text that starts like an SRT or WebVTT file"""
+    head = text.lstrip('﻿').lstrip()[:500]
+    if head.startswith('WEBVTT'):
+        return True
+    return any(_TIMING.match(line) for line in head.splitlines()[:3])
+
+
+# ----- time-stretch -----
+
+def time_stretch(pcm: bytes, factor: float, sample_rate: int, channels: int = 1) -> bytes:
+    """
+    Speed 16-bit PCM up by factor (>1 shortens) without changing pitch.
+
+    With numpy this is WSOLA: each analysis frame is shifted by up to a
+    quarter frame to line up with the waveform already written (the
+    cross-correlation over all shifts is one vectorized call per frame).
+    Without numpy, plain overlap-add in Python: slower and a little rougher.
+    """
+    if abs(factor - 1.0) < 1e-3:
+        return pcm
+    frame_size = 2 * channels
+    frames_in = len(pcm) // frame_size
+    frames_out = int(frames_in / factor)
+    frame = max(64, int(sample_rate * STRETCH_FRAME_SECONDS)) & ~1
+    hop = frame // 2
+    if frames_in <= frame:
+        return pcm[:frames_out * frame_size]
+    count = frames_out // hop + 1
+
+    if NUMPY_AVAILABLE:
+        tolerance = frame // 4
+        x = np.frombuffer(pcm, dtype='<i2', count=frames_in * channels).reshape(-1, channels).astype(np.float64)
+        # Padding: position p of x is row p + tolerance of padded
+        padded = np.zeros((frames_in + 2 * frame + 3 * tolerance + hop, channels))
+        padded[tolerance:tolerance + frames_in] = x
+        mono = padded.mean(axis=1)
+        # Periodic Hann windows at 50% overlap sum to one
+        window = 0.5 - 0.5 * np.cos(2 * np.pi * np.arange(frame) / frame)
+        out = np.zeros((count * hop + frame, channels))
+        norm = np.zeros(count * hop + frame)
+        position = 0
+        for k in range(count):
+            nominal = min(int(round(k * hop * factor)), frames_in)
+            if k:
+                # Pick the shift whose frame best continues the previous one
+                natural = position + hop + tolerance
+                target = mono[natural:natural + frame]
+                region = mono[nominal:nominal + frame + 2 * tolerance]
+                position = nominal - tolerance + int(np.argmax(np.correlate(region, target, mode='valid')))
+            start = position + tolerance
+            out[k * hop:k * hop + frame] += padded[start:start + frame] * window[:, None]
+            norm[k * hop:k * hop + frame] += window
+        norm = norm[:frames_out]
+        out = np.where(norm[:, None] > 1e-9, out[:frames_out] / np.maximum(norm, 1e-9)[:, None], 0.0)
+        return np.clip(np.round(out), -32768, 32767).astype('<i2').tobytes()
+
+    src = array('h', pcm[:frames_in * frame_size])
+    out = [0.0] * ((count * hop + frame) * channels)
+    norm = [0.0] * (count * hop + frame)
+    window = [1.0 - abs(2.0 * i / frame - 1.0) for i in range(frame)]  # Triangular
+    for k in range(count):
+        position = min(int(round(k * hop * factor)), frames_in - 1)
+        base = k * hop
+        for i in range(min(frame, frames_in - position)):
+            w = window[i]
+            norm[base + i] += w
+            for channel in range(channels):
+                out[(base + i) * channels + channel] += src[(position + i) * channels + channel] * w
+    result = array('h', bytes(frames_out * frame_size))
+    for i in range(frames_out):
+        scale = 1.0 / norm[i] if norm[i] > 1e-3 else 0.0
+        for channel in range(channels):
+            value = int(round(out[i * channels + channel] * scale))
+            result[i * channels + channel] = max(-32768, min(32767, value))
+    return result.tobytes()
+
+
+def _trim_silence(pcm: bytes, sample_rate: int, channels: int) -> bytes:
+    """Drop leading and trailing silence, keeping 20 ms around the speech"""
+    margin = int(sample_rate * 0.02)
+    if NUMPY_AVAILABLE:
+        loud = np.abs(np.frombuffer(pcm, dtype='<i2').reshape(-1, channels)).max(axis=1) > SILENCE_THRESHOLD
+        indices = np.flatnonzero(loud)
+        if not len(indices):
+            return b''
+        first, last = int(indices[0]), int(indices[-1])
+    else:
+        samples = array('h', pcm)
+        loud = [i // channels for i, value in enumerate(samples) if abs(value) > SILENCE_THRESHOLD]
+        if not loud:
+            return b''
+        first, last = loud[0], loud[-1]
+    frames = len(pcm) // (2 * channels)
+    first = max(0, first - margin)
+    last = min(frames, last + 1 + margin)
+    return pcm[first * 2 * channels:last * 2 * channels]
+
+
+def _fade_out(pcm: bytes, sample_rate: int, channels: int) -> bytes:
+    """Linear 10 ms fade at the end, so a cut clip doesn't click"""
+    samples = array('h', pcm)
+    fade = min(len(samples) // channels, int(sample_rate * 0.01))
+    for i in range(fade):
+        gain = (fade - i) / fade
+        for channel in range(channels):
+            j = (len(samples) // channels - fade + i) * channels + channel
+            samples[j] = int(samples[j] * gain)
+    return samples.tobytes()
+
+
+# ----- rendering -----
+
+@dataclass
+class CueFit:
+    """How a cue's clip was fitted into its window"""
+    cue: Cue
+    clip_seconds: float     # Speech length after trimming silence
+    window: float           # Time until the next cue starts (or this one ends)
+    stretch: float          # Speed-up applied (1.0 = untouched)
+    fits: bool
+
+    @property
+    def needed_stretch(self) -> float:
+        return self.clip_seconds / self.window if self.window > 0 else float('inf')
+
+
+@dataclass
+class SubtitleResult:
+    output_path: str
+    clips: List[str]
+    fits: List[CueFit]
+    report: ScheduleReport
+    elapsed: float
+
+    @property
+    def unfit(self) -> List[CueFit]:
+        """Cues whose speech was cut at the next cue"""
+        return [fit for fit in self.fits if not fit.fits]
+
+    @property
+    def stretched(self) -> int:
+        return sum(1 for fit in self.fits if fit.stretch > 1.0)
+
+
+class SubtitleRenderer:
+    """
+    Renders subtitle cues with one voice and places them on a timeline.
+
+    Args:
+        engine_factory: Creates the engine for each lane
+        workers: Parallel lanes (default: 16 for online engines, half the
+                 cores for local ones)
+        max_stretch: Fastest speed-up used to fit a clip into its window
+    """
+
+    def __init__(
+        self,
+        engine_factory: Callable[[], BaseTTSEngine],
+        workers: Optional[int] = None,
+        max_stretch: float = MAX_STRETCH
+    ):
+        probe = engine_factory()
+        if workers is None and probe.is_online:
+            workers = ONLINE_WORKERS
+        self.clip_ext = probe.get_output_extension()
+        self.max_stretch = max_stretch
+        self.scheduler = VoiceAffinityScheduler(engine_factory, workers=workers)
+
+    def render(
+        self,
+        cues: Sequence[Cue],
+        output_path: str,
+        voice: str,
+        clips_dir: Optional[str] = None,
+        speed: float = 1.0,
+        pitch: int = 0,
+        volume: int = 0,
+        progress_callback: Optional[Callable[[float, str], None]] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> SubtitleResult:
+        """
+        Render every cue to a clip in clips_dir (default: "<output>_clips"
+        next to the output) and write the fitted clips at their cue times
+        into output_path (any format open_audio_sink() supports).
+        """
+        if not cues:
+            raise ValueError("No subtitle cues to render")
+        if self.clip_ext != '.wav' and not shutil.which('ffmpeg'):
+            # Checked up front: fitting decodes every clip, after all of them are synthesized
+            raise ValueError(f"Fitting {self.clip_ext} clips to cue times needs ffmpeg (install it and add it to PATH)")
+        token = cancel_token or CancellationToken()
+        started = time.time()
+        if clips_dir is None:
+            clips_dir = os.path.splitext(output_path)[0] + "_clips"
+        os.makedirs(clips_dir, exist_ok=True)
+
+        clips = [os.path.join(clips_dir, f"{cue.index + 1:05d}{self.clip_ext}") for cue in cues]
+        items = [RenderItem(cue.text, voice, clip) for cue, clip in zip(cues, clips)]
+
+        def render_progress(fraction, status):
+            if progress_callback:
+                progress_callback(0.02 + 0.78 * fraction, status.replace("segments", "cues"))
+
+        if progress_callback:
+            progress_callback(0.02, f"Rendering {len(cues)} cues on {self.scheduler.workers} lanes...")
+        report = self.scheduler.render(
+            items, speed, pitch, volume,
+            progress_callback=render_progress,
+            cancel_token=token
+        )
+
+        temp_dir = tempfile.mkdtemp(prefix="tts_subtitles_", dir=os.path.dirname(os.path.abspath(output_path)))
+        try:
+            if progress_callback:
+                progress_callback(0.82, "Fitting clips to cue times...")
+            windows = [
+                (cues[i + 1].start if i + 1 < len(cues) else cue.end) - cue.start
+                for i, cue in enumerate(cues)
+            ]
+            fitted_paths = [os.path.join(temp_dir, f"{cue.index:05d}.wav") for cue in cues]
+            with ThreadPoolExecutor(max_workers=os.cpu_count() or 2, thread_name_prefix="subtitle-fit") as pool:
+                fitted = list(pool.map(
+                    lambda args: self._fit_clip(*args, token),
+                    zip(cues, clips, windows, fitted_paths)
+                ))
+            fits = [fit for fit, _ in fitted]
+
+            if progress_callback:
+                progress_callback(0.92, "Placing clips on the timeline...")
+            try:
+                self._assemble(cues, fitted_paths, [rate for _, rate in fitted], output_path, token)
+            except GenerationCancelled:
+                BaseTTSEngine._remove_partial_output(output_path)
+                raise
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+        result = SubtitleResult(output_path, clips, fits, report, time.time() - started)
+        if progress_callback:
+            suffix = f", {len(result.unfit)} too long" if result.unfit else ""
+            progress_callback(1.0, f"Complete! {len(cues)} cues{suffix}")
+        return result
+
+    def _fit_clip(
+        self, cue: Cue, clip: str, window: float, fitted_path: str, token: CancellationToken
+    ) -> Tuple[CueFit, int]:
+        """Trim, stretch and (if still too long) cut one clip; returns its fit and sample rate"""
+        token.raise_if_cancelled()
+        source = clip
+        if not clip.lower().endswith('.wav'):
+            source = fitted_path + ".decoded.wav"
+            decode_to_wav(clip, source)
+        info = read_wav_info(source)
+        if info.sample_width != 2:
+            raise ValueError(f"Only 16-bit clips can be fitted: {os.path.basename(clip)}")
+        with open(source, 'rb') as f:
+            f.seek(info.data_offset)
+            pcm = f.read(info.frames * info.frame_size)
+
+        pcm = _trim_silence(pcm, info.sample_rate, info.channels)
+        clip_seconds = len(pcm) / info.frame_size / info.sample_rate
+        window = max(window, 0.0)
+        needed = clip_seconds / window if window > 0 else float('inf')
+        stretch = 1.0
+        if needed > 1.0:
+            stretch = min(needed, self.max_stretch)
+            pcm = time_stretch(pcm, stretch, info.sample_rate, info.channels)
+        limit = int(window * info.sample_rate) * info.frame_size
+        if len(pcm) > limit:
+            pcm = _fade_out(pcm[:limit], info.sample_rate, info.channels)
+
+        with WavWriter(fitted_path, info.sample_rate, info.channels) as writer:
+            writer.write(pcm)
+        fits = needed <= self.max_stretch + 1e-6
+        return CueFit(cue, clip_seconds, window, stretch, fits), info.sample_rate
+
+    def _assemble(
+        self, cues: Sequence[Cue], fitted_paths: List[str], rates: List[int],
+        output_path: str, token: CancellationToken
+    ):
+        """Write silence up to each cue's start, then its clip, into output_path"""
+        counts = Counter(rates)
+        sample_rate = max(counts, key=lambda rate: (counts[rate], rate))
+        channels = read_wav_info(fitted_paths[0]).channels
+        frame_size = 2 * channels
+        silence_block = bytes(sample_rate * frame_size)
+
+        def pad_to(sink, cursor, target):
+            while cursor < target:
+                count = min(target - cursor, sample_rate)
+                sink.write(silence_block[:count * frame_size])
+                cursor += count
+            return cursor
+
+        with open_audio_sink(output_path, sample_rate, channels) as sink:
+            cursor = 0
+            for i, (cue, path) in enumerate(zip(cues, fitted_paths)):
+                token.raise_if_cancelled()
+                cursor = pad_to(sink, cursor, int(round(cue.start * sample_rate)))
+                info = read_wav_info(path)
+                if info.channels != channels:
+                    raise ValueError("All cue clips must have the same channel count")
+                with open(path, 'rb') as f:
+                    f.seek(info.data_offset)
+                    pcm = f.read(info.frames * frame_size)
+                if info.sample_rate != sample_rate and info.frames:
+                    step = info.sample_rate / sample_rate
+                    count = (info.frames * sample_rate) // info.sample_rate
+                    pcm = _resample_block(pcm, 0.0, step, count, channels)
+                # Rounding must never push a clip over the next cue's start
+                if i + 1 < len(cues):
+                    pcm = pcm[:max(0, int(round(cues[i + 1].start * sample_rate)) - cursor) * frame_size]
+                sink.write(pcm)
+                cursor += len(pcm) // frame_size
+            pad_to(sink, cursor, int(round(cues[-1].end * sample_rate)))
+
+    def shutdown(self):
+        self.scheduler.shutdown()
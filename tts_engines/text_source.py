@@ -0,0 +1,201 @@
+"""
+Text Source - Stream large text files from disk without loading them whole
+"""
+
+import codecs
+import re
+import threading
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from .cancellation import CancellationToken
+
+# Sentence end: terminal punctuation (Latin, CJK, Devanagari, Arabic) followed by space
+SENTENCE_END = re.compile(r'[.!?;。！？؟।](?:["\')\]»”’]*)\s+')
+
+# Bytes read from disk per block
+READ_BLOCK_SIZE = 64 * 1024
+
+# Default segment length (characters) for streaming and checkpointing
+SEGMENT_CHARS = 2000
+
+
+def split_sentences(text: str, max_chars: int = SEGMENT_CHARS) -> List[str]:
+    """
+    Split text into pieces that end at the first sentence boundary past
+    max_chars (a piece without a boundary runs to the end of the text)
+    """
+    if len(text) <= max_chars:
+        return [text] if text.strip() else []
+    pieces = []
+    start = 0
+    while len(text) - start > max_chars:
+        match = SENTENCE_END.search(text, start + max_chars)
+        if not match:
+            break
+        pieces.append(text[start:match.end()])
+        start = match.end()
+    pieces.append(text[start:])
+    return [piece for piece in pieces if piece.strip()]
+
+
+class FileTextSource:
+    """
+    Lazily indexed view of a UTF-8 text file.
+
+    Nothing is read up front. iter_segments() streams the file in blocks and
+    yields sentence-aligned segments; as it goes it records each segment's
+    byte offset so read_segment() can seek straight back to it later.
+    compute_stats() counts characters and words in a single background pass.
+    """
+
+    def __init__(self, path: str, segment_chars: int = SEGMENT_CHARS, encoding: str = 'utf-8'):
+        """
+        Args:
+            path: Text file to read
+            segment_chars: Target segment length; segments end at the first
+                           sentence boundary after this many characters
+            encoding: File encoding
+        """
+        self.path = Path(path)
+        self.segment_chars = segment_chars
+        self.encoding = encoding
+        self.size_bytes = self.path.stat().st_size
+
+        self._lock = threading.Lock()
+        # (byte_offset, byte_length) per segment, filled in as segments are produced
+        self._index: List[Tuple[int, int]] = []
+        self._index_complete = False
+
+        self.char_count: Optional[int] = None
+        self.word_count: Optional[int] = None
+
+    @property
+    def name(self) -> str:
+        return self.path.name
+
+    @property
+    def stats_ready(self) -> bool:
+        return self.char_count is not None
+
+    def preview(self, max_chars: int = 5000) -> str:
+        """Read just the beginning of the file for display"""
+        with open(self.path, 'r', encoding=self.encoding, errors='replace') as f:
+            return f.read(max_chars)
+
+    def _blocks(self, cancel_token: Optional[CancellationToken] = None) -> Iterator[str]:
+        """Decoded text blocks; multi-byte characters split across reads are handled"""
+        decoder = codecs.getincrementaldecoder(self.encoding)(errors='replace')
+        with open(self.path, 'rb') as f:
+            while True:
+                if cancel_token:
+                    cancel_token.raise_if_cancelled()
+                raw = f.read(READ_BLOCK_SIZE)
+                if not raw:
+                    tail = decoder.decode(b'', final=True)
+                    if tail:
+                        yield tail
+                    return
+                text = decoder.decode(raw)
+                if text:
+                    yield text
+
+    def _split_point(self, buffer: str) -> int:
+        """Position just after the first sentence end past segment_chars, or -1"""
+        if len(buffer) < self.segment_chars:
+            return -1
+        match = SENTENCE_END.search(buffer, self.segment_chars)
+        if match:
+            return match.end()
+        # No sentence boundary for a long stretch - fall back to whitespace
+        if len(buffer) >= self.segment_chars * 2:
+            space = buffer.rfind(' ', self.segment_chars, self.segment_chars * 2)
+            return space + 1 if space > 0 else self.segment_chars * 2
+        return -1
+
+    def iter_segments(self, cancel_token: Optional[CancellationToken] = None) -> Iterator[str]:
+        """Yield sentence-aligned segments streamed from disk"""
+        buffer = ""
+        offset = 0
+        index = []
+
+        def emit(segment):
+            nonlocal offset
+            length = len(segment.encode(self.encoding))
+            index.append((offset, length))
+            offset += length
+            return segment.strip()
+
+        for block in self._blocks(cancel_token):
+            buffer += block
+            while True:
+                cut = self._split_point(buffer)
+                if cut < 0:
+                    break
+                segment = emit(buffer[:cut])
+                buffer = buffer[cut:]
+                if segment:
+                    yield segment
+
+        if buffer:
+            segment = emit(buffer)
+            if segment:
+                yield segment
+
+        with self._lock:
+            self._index = index
+            self._index_complete = True
+
+    def segment_count(self) -> Optional[int]:
+        """Number of segments, once a full pass has built the index"""
+        with self._lock:
+            return len(self._index) if self._index_complete else None
+
+    def read_segment(self, i: int) -> str:
+        """Seek to and read a single indexed segment"""
+        with self._lock:
+            if not self._index_complete:
+                raise RuntimeError("Segment index not built yet")
+            offset, length = self._index[i]
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            return f.read(length).decode(self.encoding, errors='replace').strip()
+
+    def compute_stats(
+        self,
+        progress_callback: Optional[Callable[[int, int, float], None]] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> Tuple[int, int]:
+        """
+        Count characters and words in one streaming pass.
+
+        Args:
+            progress_callback: Optional callback(chars, words, fraction_done)
+                               invoked after each block with running totals
+            cancel_token: Optional token to stop the pass early
+
+        Returns:
+            (char_count, word_count)
+        """
+        chars = 0
+        words = 0
+        bytes_done = 0
+        in_word = False
+
+        for block in self._blocks(cancel_token):
+            chars += len(block)
+            bytes_done += len(block.encode(self.encoding, errors='replace'))
+            block_words = len(block.split())
+            # A word split across the block boundary was counted twice
+            if block_words and in_word and not block[0].isspace():
+                block_words -= 1
+            words += block_words
+            in_word = not block[-1].isspace()
+
+            if progress_callback:
+                fraction = bytes_done / self.size_bytes if self.size_bytes else 1.0
+                progress_callback(chars, words, min(1.0, fraction))
+
+        self.char_count = chars
+        self.word_count = words
+        return chars, words
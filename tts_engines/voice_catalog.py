@@ -0,0 +1,264 @@
+"""
+Voice Catalog - Edge voice list fetched from the service, cached on disk
+
+get_voices() never touches the network: it serves the last fetched list
+(memory, then the on-disk cache, then the bundled table) and starts a
+background refresh when the cache is older than its TTL. The service has
+no conditional request, so a refresh always downloads the whole list; if
+its content hash matches the cache, only the timestamp is renewed and
+nothing is re-parsed. A changed list is parsed once into immutable
+lookups and bumps the catalog generation so voice views rebuild.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, NamedTuple, Optional
+
+from .retry import RetryPolicy
+
+# Re-fetch the voice list after this many seconds
+CATALOG_TTL = 7 * 24 * 3600
+
+
+class VoiceInfo(NamedTuple):
+    """One voice in the catalog"""
+    voice_id: str
+    category: str
+    description: str
+    locale: str
+    gender: str
+
+
+class CatalogSnapshot(NamedTuple):
+    """Immutable parsed catalog"""
+    categories: Mapping[str, Mapping[str, str]]  # category -> {voice_id: description}
+    voices: Mapping[str, VoiceInfo]               # voice_id -> VoiceInfo
+    content_hash: str                             # hash of the source list
+    source: str                                   # 'bundled', 'cache' or 'network'
+
+
+def _freeze(categories: Dict[str, Dict[str, str]], voices: Dict[str, VoiceInfo], content_hash: str, source: str):
+    return CatalogSnapshot(
+        categories=MappingProxyType({c: MappingProxyType(v) for c, v in categories.items()}),
+        voices=MappingProxyType(voices),
+        content_hash=content_hash,
+        source=source,
+    )
+
+
+def _locale_of(voice_id: str) -> str:
+    """'en-US-AriaNeural' -> 'en-US'"""
+    return '-'.join(voice_id.split('-')[:2])
+
+
+def _content_hash(entries: List[dict]) -> str:
+    canonical = json.dumps(entries, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+
+async def _list_voices_edge_tts() -> List[dict]:
+    import edge_tts
+    return await edge_tts.list_voices()
+
+
+class EdgeVoiceCatalog:
+    """
+    Edge voice catalog with an on-disk cache and background refresh.
+
+    Args:
+        bundled: Hand-maintained {category: {voice_id: description}} table,
+                 used offline and for nicer descriptions of known voices
+        cache_path: JSON cache file
+        ttl: Seconds before a cached list is refreshed
+        fetcher: Coroutine function returning edge_tts.list_voices()-style entries
+    """
+
+    CACHE_PATH = Path("models/edge/voices.json")
+
+    def __init__(
+        self,
+        bundled: Dict[str, Dict[str, str]],
+        cache_path: Optional[Path] = None,
+        ttl: float = CATALOG_TTL,
+        fetcher: Optional[Callable] = None,
+        retry_policy: Optional[RetryPolicy] = None
+    ):
+        self.cache_path = Path(cache_path) if cache_path else self.CACHE_PATH
+        self.ttl = ttl
+        self.fetcher = fetcher or _list_voices_edge_tts
+        self.retry_policy = retry_policy or RetryPolicy(max_attempts=3, base_delay=2.0)
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self.generation = 0
+        self.fetched_at: Optional[float] = None
+
+        # Bundled lookups: known descriptions and where each locale is filed
+        self._bundled_voices: Dict[str, VoiceInfo] = {}
+        self._locale_category: Dict[str, str] = {}
+        self._lang_category: Dict[str, str] = {}
+        self._category_order = {category: i for i, category in enumerate(bundled)}
+        for category, voices in bundled.items():
+            for voice_id, desc in voices.items():
+                locale = _locale_of(voice_id)
+                gender = "Female" if "Female" in desc else "Male" if "Male" in desc else ""
+                self._bundled_voices[voice_id] = VoiceInfo(voice_id, category, desc, locale, gender)
+                self._locale_category.setdefault(locale, category)
+                lang = locale.split('-')[0]
+                # Regional splits (English) send unknown regions to '(Other)'
+                if lang not in self._lang_category or '(Other)' in category:
+                    self._lang_category[lang] = category
+
+        self._snapshot = _freeze(
+            {c: dict(v) for c, v in bundled.items()},
+            dict(self._bundled_voices),
+            content_hash="",
+            source='bundled'
+        )
+        self._load_cache()
+
+    # ----- reading -----
+
+    @property
+    def snapshot(self) -> CatalogSnapshot:
+        return self._snapshot
+
+    def get_voices(self) -> Mapping[str, Mapping[str, str]]:
+        """Current categories; schedules a background refresh when stale"""
+        if self.is_stale():
+            self.refresh_async()
+        return self._snapshot.categories
+
+    def is_stale(self) -> bool:
+        return self.fetched_at is None or time.time() - self.fetched_at > self.ttl
+
+    # ----- refreshing -----
+
+    def refresh_async(self):
+        """Start a background refresh unless one is already running"""
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._refresh_worker, name="edge-voice-catalog", daemon=True).start()
+
+    def _refresh_worker(self):
+        try:
+            self.refresh()
+        except Exception:
+            pass  # Offline or edge_tts missing: keep serving what we have
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def refresh(self) -> bool:
+        """
+        Fetch the voice list now (blocking). Returns True if the catalog changed.
+
+        edge_tts.list_voices() can't make a conditional request, so this always
+        downloads the full list; the content hash only skips re-parsing it.
+        """
+        attempt = 1
+        while True:
+            try:
+                entries = asyncio.run(self.fetcher())
+                break
+            except ImportError:
+                raise
+            except Exception:
+                if attempt >= self.retry_policy.max_attempts:
+                    raise
+                self.retry_policy.sleep(self.retry_policy.delay(attempt))
+                attempt += 1
+
+        entries = sorted(
+            ({k: e.get(k) for k in ('ShortName', 'Gender', 'Locale', 'FriendlyName')} for e in entries),
+            key=lambda e: e['ShortName'] or ''
+        )
+        content_hash = _content_hash(entries)
+        self.fetched_at = time.time()
+
+        if content_hash == self._snapshot.content_hash:
+            # Same list as before: renew the cache timestamp only
+            self._save_cache(entries, content_hash)
+            return False
+
+        snapshot = self._parse(entries, content_hash, 'network')
+        if snapshot is self._snapshot:
+            return False
+        self._save_cache(entries, content_hash)
+        self._install(snapshot)
+        return True
+
+    def _install(self, snapshot: CatalogSnapshot):
+        with self._lock:
+            self._snapshot = snapshot
+            self.generation += 1
+
+    # ----- parsing -----
+
+    def _parse(self, entries: List[dict], content_hash: str, source: str) -> CatalogSnapshot:
+        categories: Dict[str, Dict[str, str]] = {}
+        voices: Dict[str, VoiceInfo] = {}
+        for entry in entries:
+            voice_id = entry.get('ShortName')
+            if not voice_id:
+                continue
+            info = self._bundled_voices.get(voice_id) or self._describe(entry)
+            categories.setdefault(info.category, {})[voice_id] = info.description
+            voices[voice_id] = info
+        # Keep the bundled voices if the service returned nothing usable
+        if not voices:
+            return self._snapshot
+        # Bundled categories first, in their usual order, then new languages A-Z
+        order = sorted(categories, key=lambda c: (self._category_order.get(c, len(self._category_order)), c))
+        return _freeze({c: categories[c] for c in order}, voices, content_hash, source)
+
+    def _describe(self, entry: dict) -> VoiceInfo:
+        voice_id = entry['ShortName']
+        locale = entry.get('Locale') or _locale_of(voice_id)
+        gender = entry.get('Gender') or ""
+        # 'Microsoft Aria Online (Natural) - English (United States)'
+        friendly = entry.get('FriendlyName') or ""
+        language = friendly.rsplit(' - ', 1)[-1] if ' - ' in friendly else locale
+
+        category = (
+            self._locale_category.get(locale)
+            or self._lang_category.get(locale.split('-')[0])
+            or language.split(' (')[0]
+        )
+        # 'en-US-AvaMultilingualNeural' -> 'Ava Multilingual'
+        name = voice_id.split('-', 2)[-1].replace('Neural', '')
+        name = name.replace('Multilingual', ' Multilingual').strip()
+        region = language.split(' (')[-1].rstrip(')') if '(' in language else language
+        description = f"{name} - {gender}, {region}" if gender else f"{name} - {region}"
+        return VoiceInfo(voice_id, category, description, locale, gender)
+
+    # ----- disk cache -----
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            # Caches written by older versions call the hash 'etag'
+            content_hash = data['content_hash'] if 'content_hash' in data else data['etag']
+            snapshot = self._parse(data['voices'], content_hash, 'cache')
+        except (OSError, ValueError, KeyError, TypeError):
+            return
+        self._snapshot = snapshot
+        self.fetched_at = data.get('fetched_at')
+
+    def _save_cache(self, entries: List[dict], content_hash: str):
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.cache_path.with_suffix('.json.tmp')
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'fetched_at': self.fetched_at, 'content_hash': content_hash, 'voices': entries}, f, ensure_ascii=False)
+            os.replace(temp_path, self.cache_path)
+        except OSError:
+            pass
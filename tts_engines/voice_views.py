@@ -0,0 +1,111 @@
+"""
+Voice Views - Memoized, ready-to-display voice lists for dropdowns
+"""
+
+import threading
+from types import MappingProxyType
+from typing import Dict, Mapping, NamedTuple, Optional, Tuple
+
+from .base_engine import BaseTTSEngine
+
+
+class VoiceListView(NamedTuple):
+    """Immutable voice list for one (engine, language, show_all) selection"""
+    categories: Mapping[str, Mapping[str, str]]  # category -> {voice_id: description}
+    voices: Mapping[str, str]                     # voice_id -> description
+    display_to_id: Mapping[str, str]              # dropdown label -> voice_id
+    id_to_display: Mapping[str, str]              # voice_id -> dropdown label
+    display_names: Tuple[str, ...]                # dropdown values in order
+
+
+def display_name_for(description: str) -> str:
+    """Short dropdown label: drop indentation and status tags like ' [Downloaded]'"""
+    return description.strip().split(' [')[0].split(' (')[0]
+
+
+def build_voice_view(
+    engine: BaseTTSEngine,
+    lang_code: Optional[str] = None,
+    show_all: bool = False
+) -> VoiceListView:
+    """
+    Flatten and filter an engine's voices into dropdown-ready lookups.
+
+    Args:
+        engine: Engine to read voices from
+        lang_code: Keep only voices in this language (ignored when show_all)
+        show_all: Show every voice
+
+    Falls back to all voices when no voice matches the language.
+    """
+    all_categories = engine.get_voices()
+    categories = all_categories
+
+    if not show_all and lang_code:
+        filtered = {}
+        for category, voices in all_categories.items():
+            matching = {
+                voice_id: desc for voice_id, desc in voices.items()
+                if engine.get_voice_language(voice_id) == lang_code
+            }
+            if matching:
+                filtered[category] = matching
+        categories = filtered or all_categories
+
+    voices: Dict[str, str] = {}
+    for category_voices in categories.values():
+        voices.update(category_voices)
+
+    display_to_id: Dict[str, str] = {}
+    id_to_display: Dict[str, str] = {}
+    for voice_id, desc in voices.items():
+        display_name = display_name_for(desc)
+        display_to_id[display_name] = voice_id
+        id_to_display[voice_id] = display_name
+
+    return VoiceListView(
+        categories=MappingProxyType({c: MappingProxyType(dict(v)) for c, v in categories.items()}),
+        voices=MappingProxyType(voices),
+        display_to_id=MappingProxyType(display_to_id),
+        id_to_display=MappingProxyType(id_to_display),
+        display_names=tuple(display_to_id),
+    )
+
+
+class VoiceViewCache:
+    """
+    Cache of VoiceListViews keyed by
+    (engine key, language, show_all, engine.voices_generation).
+
+    Installing a voice bumps the engine's generation, so stale views are
+    never served; switching back and forth between engines and languages
+    is a dictionary lookup.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views: Dict[tuple, VoiceListView] = {}
+
+    def get(
+        self,
+        engine_key: str,
+        engine: BaseTTSEngine,
+        lang_code: Optional[str] = None,
+        show_all: bool = False
+    ) -> VoiceListView:
+        key = (engine_key, None if show_all else lang_code, show_all, engine.voices_generation)
+        with self._lock:
+            view = self._views.get(key)
+        if view is None:
+            view = build_voice_view(engine, lang_code, show_all)
+            with self._lock:
+                # Drop views built against an older voice generation
+                stale = [k for k in self._views if k[0] == engine_key and k[3] != key[3]]
+                for k in stale:
+                    del self._views[k]
+                self._views[key] = view
+        return view
+
+    def clear(self):
+        with self._lock:
+            self._views.clear()
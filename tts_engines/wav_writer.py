@@ -0,0 +1,235 @@
+"""
+WAV Writer - Buffered, crash-safe PCM WAV output that switches to RF64 past 4 GB
+
+The header occupies one aligned block, so audio is written to disk in
+large aligned blocks. Sizes in the header are refreshed at checkpoints
+while rendering: if the process dies, the file on disk is still a valid
+WAV holding everything up to the last checkpoint (repair_wav() recovers
+the rest). Outputs that outgrow the 4 GB RIFF limit are finalized as RF64.
+"""
+
+import os
+import struct
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, Optional
+
+# Header size; audio data starts on this boundary
+HEADER_ALIGNMENT = 4096
+
+# Bytes buffered before writing to disk (a multiple of HEADER_ALIGNMENT)
+WRITE_BLOCK_SIZE = 1024 * 1024
+
+# Header sizes are refreshed after this many bytes of audio
+CHECKPOINT_BYTES = 8 * 1024 * 1024
+
+# Largest data size a classic RIFF header can describe
+_RIFF_LIMIT = 0xFFFFFFFF
+
+
+def _header(channels: int, sample_rate: int, sample_width: int, data_size: int) -> bytes:
+    """
+    Header block: RIFF/RF64, ds64 (or a JUNK placeholder of the same size),
+    fmt, JUNK padding, then the data chunk header ending on the alignment.
+    """
+    block_align = channels * sample_width
+    fmt = struct.pack(
+        '<4sIHHIIHH', b'fmt ', 16, 1, channels, sample_rate,
+        sample_rate * block_align, block_align, sample_width * 8
+    )
+    padded = data_size + (data_size & 1)
+    riff_size = HEADER_ALIGNMENT - 8 + padded
+    pad_len = HEADER_ALIGNMENT - 12 - 36 - len(fmt) - 8 - 8
+
+    if riff_size > _RIFF_LIMIT:
+        frames = data_size // block_align
+        size64 = struct.pack('<4sIQQQI', b'ds64', 28, riff_size, data_size, frames, 0)
+        return (
+            struct.pack('<4sI4s', b'RF64', _RIFF_LIMIT, b'WAVE') + size64 + fmt
+            + struct.pack('<4sI', b'JUNK', pad_len) + bytes(pad_len)
+            + struct.pack('<4sI', b'data', _RIFF_LIMIT)
+        )
+    return (
+        struct.pack('<4sI4s', b'RIFF', riff_size, b'WAVE')
+        + struct.pack('<4sI', b'JUNK', 28) + bytes(28) + fmt
+        + struct.pack('<4sI', b'JUNK', pad_len) + bytes(pad_len)
+        + struct.pack('<4sI', b'data', data_size)
+    )
+
+
+class WavWriter:
+    """
+    Streaming PCM WAV writer.
+
+    Usage:
+        with WavWriter(path, sample_rate=22050) as wav:
+            for chunk in chunks:
+                wav.write(chunk)
+
+    Nothing touches the disk until the first block is full (or close()).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        sample_rate: int,
+        channels: int = 1,
+        sample_width: int = 2,
+        block_size: int = WRITE_BLOCK_SIZE,
+        checkpoint_bytes: int = CHECKPOINT_BYTES,
+        durable: bool = False,
+        resume_offset: Optional[int] = None
+    ):
+        """
+        Args:
+            path: Output file
+            sample_rate, channels, sample_width: PCM format
+            block_size: Bytes buffered per disk write
+            checkpoint_bytes: Audio written between header refreshes
+            durable: fsync at each checkpoint (survives power loss, slower)
+            resume_offset: Continue an existing WavWriter file from this
+                           end_offset, discarding anything after it
+        """
+        self.path = path
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.sample_width = sample_width
+        self.block_size = max(HEADER_ALIGNMENT, block_size - block_size % HEADER_ALIGNMENT)
+        self.checkpoint_bytes = checkpoint_bytes
+        self.durable = durable
+
+        self._file: Optional[BinaryIO] = None
+        self._buffer = bytearray()
+        self._data_bytes = 0        # Audio bytes on disk
+        self._checkpointed = 0      # Audio bytes covered by the header on disk
+        self.closed = False
+        if resume_offset is not None:
+            self._reopen(resume_offset)
+
+    @property
+    def frame_size(self) -> int:
+        return self.channels * self.sample_width
+
+    @property
+    def frames_written(self) -> int:
+        """Frames accepted so far (buffered or on disk)"""
+        return (self._data_bytes + len(self._buffer)) // self.frame_size
+
+    @property
+    def end_offset(self) -> int:
+        """File offset where the audio on disk ends (call flush() first to include the buffer)"""
+        return HEADER_ALIGNMENT + self._data_bytes
+
+    def write(self, data: bytes):
+        """Append PCM frames"""
+        self._buffer += data
+        if len(self._buffer) >= self.block_size:
+            whole = len(self._buffer) - len(self._buffer) % self.block_size
+            self._write_out(memoryview(self._buffer)[:whole])
+            del self._buffer[:whole]
+
+    @contextmanager
+    def raw_append(self) -> Iterator[BinaryIO]:
+        """
+        The underlying file, positioned at the end of the audio, for copying
+        PCM in directly (e.g. with os.sendfile). Bytes added are counted on exit.
+        """
+        self.flush()
+        start = self._file.tell()
+        yield self._file
+        self._file.seek(0, os.SEEK_END)
+        self._advance(self._file.tell() - start)
+
+    def flush(self):
+        """Write buffered audio and refresh the header"""
+        self._open()
+        if self._buffer:
+            self._write_out(self._buffer)
+            self._buffer.clear()
+        self._checkpoint()
+
+    def close(self):
+        """Finalize: write remaining audio, pad byte and the final header"""
+        if self.closed:
+            return
+        self.flush()
+        if self._data_bytes & 1:
+            self._file.write(b'\x00')
+        self._write_header()
+        self._file.close()
+        self.closed = True
+
+    def __enter__(self) -> "WavWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Finalize even on error so whatever was rendered stays playable
+        self.close()
+
+    # ----- internals -----
+
+    def _open(self):
+        if self._file is None:
+            self._file = open(self.path, 'wb')
+            self._file.write(_header(self.channels, self.sample_rate, self.sample_width, 0))
+
+    def _reopen(self, offset: int):
+        from .audio_merge import read_wav_info
+
+        info = read_wav_info(self.path)
+        if (info.data_offset != HEADER_ALIGNMENT
+                or (info.sample_rate, info.channels, info.sample_width)
+                != (self.sample_rate, self.channels, self.sample_width)):
+            raise ValueError(f"Cannot resume {os.path.basename(self.path)}: different format")
+        data_bytes = offset - HEADER_ALIGNMENT
+        data_bytes -= data_bytes % self.frame_size
+        self._file = open(self.path, 'r+b')
+        self._file.truncate(HEADER_ALIGNMENT + data_bytes)
+        self._file.seek(0, os.SEEK_END)
+        self._data_bytes = data_bytes
+        self._write_header()
+        self._checkpointed = data_bytes
+
+    def _write_out(self, data):
+        self._open()
+        self._file.write(data)
+        self._advance(len(data))
+
+    def _advance(self, nbytes: int):
+        self._data_bytes += nbytes
+        if self._data_bytes - self._checkpointed >= self.checkpoint_bytes:
+            self._checkpoint()
+
+    def _checkpoint(self):
+        if self._data_bytes == self._checkpointed:
+            return
+        # Audio first, then the header that covers it
+        self._file.flush()
+        self._write_header()
+        if self.durable:
+            os.fsync(self._file.fileno())
+        self._checkpointed = self._data_bytes
+
+    def _write_header(self):
+        position = self._file.tell()
+        self._file.seek(0)
+        self._file.write(_header(self.channels, self.sample_rate, self.sample_width, self._data_bytes))
+        self._file.seek(position)
+        self._file.flush()
+
+
+def repair_wav(path: str) -> int:
+    """
+    Fix the header of an interrupted WavWriter output so it covers all
+    audio on disk. Returns the number of audio frames in the file.
+    """
+    from .audio_merge import read_wav_info
+
+    info = read_wav_info(path)
+    if info.data_offset != HEADER_ALIGNMENT:
+        raise ValueError(f"Not written by WavWriter: {os.path.basename(path)}")
+    data_size = os.path.getsize(path) - info.data_offset
+    data_size -= data_size % info.frame_size
+    with open(path, 'r+b') as f:
+        f.write(_header(info.channels, info.sample_rate, info.sample_width, data_size))
+        f.truncate(info.data_offset + data_size)
+    return data_size // info.frame_size
@@ -0,0 +1,377 @@
+"""
+Synthesis Worker - Run TTS engines in a long-lived subprocess
+
+The GUI process only sends requests and receives progress; phonemization,
+model inference and audio handling happen in the worker, which keeps loaded
+Piper models between jobs. Audio is written straight to the output file.
+If the worker dies (e.g. a crashing model), pending requests fail with
+WorkerCrashed and the next request starts a fresh worker.
+"""
+
+import itertools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from .cancellation import CancellationToken, GenerationCancelled
+
+
+class WorkerCrashed(RuntimeError):
+    """The synthesis worker process exited while requests were in flight"""
+    pass
+
+
+# Exception types rebuilt on the client side; anything else becomes RuntimeError
+_REMOTE_ERRORS = {
+    'ImportError': ImportError,
+    'ModuleNotFoundError': ImportError,
+    'ValueError': ValueError,
+    'FileNotFoundError': FileNotFoundError,
+}
+
+
+class _PendingRequest:
+    def __init__(self, progress_callback: Optional[Callable], process):
+        self.progress_callback = progress_callback
+        self.process = process  # The worker process the request was sent to
+        self.done = threading.Event()
+        self.result: Optional[dict] = None
+        self.error: Optional[BaseException] = None
+
+
+class SynthesisWorker:
+    """
+    Client handle for the worker subprocess.
+
+    run() is blocking and thread-safe: call it from a background thread (the
+    GUI's generation thread or a job-queue worker). Several requests can be
+    in flight at once; the worker runs them on its own per-engine pools.
+
+    Request fields:
+        engine: 'edge' or 'piper'
+        mode: 'text' (default), 'file' (stream source_path from disk),
+              'mixed' (route paragraphs to a voice per language) or
+              'dialogue' (a "SPEAKER: line" script in text or source_path;
+              voice is the default for speakers without an @voice line) or
+              'subtitles' (SRT/VTT cues in text or source_path, each fitted
+              into its cue window on one track)
+        text / source_path, voice, output_path, speed, pitch, volume
+        route: For 'text', let EngineRouter pick (and hedge) the engine;
+               the result then names the engine, voice and output_path used
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._process = None
+        self._conn = None
+        self._pending: Dict[int, _PendingRequest] = {}
+        self._ids = itertools.count(1)
+
+    @property
+    def is_running(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    def start(self):
+        """Start the worker process if it isn't running"""
+        with self._lock:
+            if self.is_running:
+                return
+            # spawn: a clean interpreter, never a fork of the Tk process
+            ctx = multiprocessing.get_context('spawn')
+            parent_conn, child_conn = ctx.Pipe()
+            process = ctx.Process(
+                target=_worker_main, args=(child_conn,),
+                name="tts-synthesis-worker", daemon=True
+            )
+            process.start()
+            child_conn.close()
+            self._process = process
+            self._conn = parent_conn
+            threading.Thread(
+                target=self._reader, args=(process, parent_conn), daemon=True
+            ).start()
+
+    def run(
+        self,
+        request: Dict[str, Any],
+        progress_callback: Optional[Callable[[float, str], None]] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> dict:
+        """
+        Execute one request in the worker and wait for it.
+
+        Returns:
+            Result info from the worker (e.g. segment summary for 'mixed')
+
+        Raises:
+            GenerationCancelled, WorkerCrashed, or the engine's error
+        """
+        self.start()
+        request_id = next(self._ids)
+        with self._lock:
+            # The worker may already have died (even right at startup); its
+            # reader only fails requests registered before it exited
+            if not self.is_running or self._conn is None:
+                raise WorkerCrashed("Synthesis worker is not running; it will restart on the next request")
+            pending = _PendingRequest(progress_callback, self._process)
+            self._pending[request_id] = pending
+            conn = self._conn
+
+        try:
+            self._send(conn, ('run', request_id, request))
+            cancel_sent = False
+            # Poll the token (which also notices a passed deadline) and
+            # forward a cancel to the worker once
+            while not pending.done.wait(0.1):
+                if cancel_token and not cancel_sent and cancel_token.cancelled:
+                    self._send(conn, ('cancel', request_id, cancel_token.reason))
+                    cancel_sent = True
+        finally:
+            with self._lock:
+                self._pending.pop(request_id, None)
+
+        if pending.error is not None:
+            raise pending.error
+        return pending.result or {}
+
+    def shutdown(self):
+        """Ask the worker to exit"""
+        with self._lock:
+            conn, process = self._conn, self._process
+            self._conn = self._process = None
+        if conn is not None:
+            try:
+                self._send(conn, ('shutdown',))
+            except Exception:
+                pass
+        if process is not None:
+            process.join(timeout=2)
+            if process.is_alive():
+                process.terminate()
+
+    def _send(self, conn, message):
+        with self._send_lock:
+            try:
+                conn.send(message)
+            except (OSError, EOFError, ValueError):
+                pass  # The reader thread reports the crash
+
+    def _reader(self, process, conn):
+        """Dispatch worker messages to waiting requests until the pipe closes"""
+        try:
+            self._dispatch(conn)
+        finally:
+            # Pipe closed (or the reader failed): fail everything sent to this process
+            process.join(timeout=1)
+            with self._lock:
+                if self._process is process:
+                    self._process = self._conn = None
+                orphans = [p for p in self._pending.values() if p.process is process]
+            for pending in orphans:
+                if not pending.done.is_set():
+                    pending.error = WorkerCrashed(
+                        f"Synthesis worker exited unexpectedly (exit code {process.exitcode}); "
+                        "it will restart on the next request"
+                    )
+                    pending.done.set()
+
+    def _dispatch(self, conn):
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                return
+
+            kind, request_id = message[0], message[1]
+            pending = self._pending.get(request_id)
+            if pending is None:
+                continue
+
+            if kind == 'progress':
+                if pending.progress_callback:
+                    try:
+                        pending.progress_callback(message[2], message[3])
+                    except Exception:
+                        pass
+                continue
+
+            if kind == 'done':
+                pending.result = message[2]
+            elif kind == 'cancelled':
+                pending.error = GenerationCancelled(message[2])
+            elif kind == 'error':
+                error_type = _REMOTE_ERRORS.get(message[2], RuntimeError)
+                pending.error = error_type(message[3])
+            pending.done.set()
+
+
+def _worker_main(conn):
+    """Worker process entry point: serve requests until shutdown or parent exit"""
+    from .dialogue import LINE_PAUSE, DialogueRenderer, parse_script
+    from .edge_engine import EdgeTTSEngine
+    from .piper_engine import PiperTTSEngine
+    from .mixed_language import MixedLanguageSynthesizer
+    from .router import EngineRouter
+    from .scheduler import VoiceAffinityScheduler
+    from .document_source import open_text_source
+    from .subtitles import SubtitleRenderer, parse_subtitles
+
+    factories = {'edge': EdgeTTSEngine, 'piper': PiperTTSEngine}
+    pools = {
+        'edge': ThreadPoolExecutor(max_workers=8, thread_name_prefix="edge"),
+        'piper': ThreadPoolExecutor(
+            max_workers=max(1, (os.cpu_count() or 2) // 2), thread_name_prefix="piper"
+        ),
+    }
+    local = threading.local()
+    router = []  # Created on first routed request; keeps latency stats for the session
+    schedulers: Dict[str, VoiceAffinityScheduler] = {}  # Per engine; lanes keep voices loaded
+    schedulers_lock = threading.Lock()
+    subtitle_renderers: Dict[str, SubtitleRenderer] = {}  # Per engine, with their own wider lanes
+    tokens: Dict[int, CancellationToken] = {}
+    send_lock = threading.Lock()
+
+    def send(message):
+        with send_lock:
+            try:
+                conn.send(message)
+            except (OSError, EOFError):
+                pass
+
+    def scheduler_for(key):
+        with schedulers_lock:
+            if key not in schedulers:
+                schedulers[key] = VoiceAffinityScheduler(factories[key])
+            return schedulers[key]
+
+    def engine_for(key):
+        # Engines (and their loaded models) live as long as the pool thread
+        engines = getattr(local, 'engines', None)
+        if engines is None:
+            engines = local.engines = {}
+        if key not in engines:
+            engines[key] = factories[key]()
+        return engines[key]
+
+    def handle(request_id, request, token):
+        def progress(p, s):
+            send(('progress', request_id, p, s))
+
+        try:
+            params = dict(
+                voice=request['voice'],
+                output_path=request['output_path'],
+                speed=request.get('speed', 1.0),
+                pitch=request.get('pitch', 0),
+                volume=request.get('volume', 0),
+                progress_callback=progress,
+                cancel_token=token
+            )
+            mode = request.get('mode', 'text')
+            info = {}
+            if mode == 'file':
+                source = open_text_source(request['source_path'])
+                engine_for(request['engine']).generate_stream(
+                    source.iter_segments(token),
+                    total_chars=request.get('total_chars'),
+                    **params
+                )
+            elif mode == 'mixed':
+                params['default_voice'] = params.pop('voice')
+                synthesizer = MixedLanguageSynthesizer(
+                    factories[request['engine']], scheduler=scheduler_for(request['engine'])
+                )
+                segments = synthesizer.generate(text=request['text'], **params)
+                info['segments'] = [(seg.lang, seg.voice) for seg in segments]
+                info['model_loads_saved'] = synthesizer.last_report.loads_saved
+            elif mode == 'dialogue':
+                if 'source_path' in request:
+                    # Scripts are line-oriented (and small): read the file whole
+                    with open(request['source_path'], 'r', encoding='utf-8', errors='replace') as f:
+                        text = f.read()
+                else:
+                    text = request['text']
+                script = parse_script(text)
+                renderer = DialogueRenderer(factories, line_pause=request.get('line_pause', LINE_PAUSE))
+                voices = renderer.assign_voices(script, request['engine'], params.pop('voice'))
+                renderer.schedulers.update({v.engine: scheduler_for(v.engine) for v in voices.values()})
+                result = renderer.render(script, voices=voices, **params)
+                info.update(
+                    lines=len(script.lines),
+                    speakers={speaker: v.voice for speaker, v in voices.items()},
+                    stems_dir=os.path.dirname(result.stems[0])
+                )
+            elif mode == 'subtitles':
+                if 'source_path' in request:
+                    with open(request['source_path'], 'r', encoding='utf-8-sig', errors='replace') as f:
+                        text = f.read()
+                else:
+                    text = request['text']
+                cues = parse_subtitles(text)
+                with schedulers_lock:
+                    if request['engine'] not in subtitle_renderers:
+                        subtitle_renderers[request['engine']] = SubtitleRenderer(factories[request['engine']])
+                    renderer = subtitle_renderers[request['engine']]
+                result = renderer.render(cues, **params)
+                info.update(
+                    cues=len(cues),
+                    stretched=result.stretched,
+                    unfit=[(fit.cue.index + 1, fit.cue.start, round(fit.needed_stretch, 2)) for fit in result.unfit],
+                    clips_dir=os.path.dirname(result.clips[0])
+                )
+            elif request.get('route'):
+                if not router:
+                    router.append(EngineRouter(factories))
+                result = router[0].generate(
+                    text=request['text'], engine_key=request['engine'], **params
+                )
+                info.update(
+                    engine=result.engine, voice=result.voice,
+                    output_path=result.output_path, hedged=result.hedged
+                )
+            else:
+                engine_for(request['engine']).generate(text=request['text'], **params)
+            send(('done', request_id, info))
+        except GenerationCancelled as e:
+            send(('cancelled', request_id, str(e) or "Cancelled"))
+        except BaseException as e:
+            send(('error', request_id, type(e).__name__, str(e)))
+        finally:
+            tokens.pop(request_id, None)
+
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                break  # Parent went away
+
+            kind = message[0]
+            if kind == 'shutdown':
+                break
+            if kind == 'run':
+                request_id, request = message[1], message[2]
+                token = tokens[request_id] = CancellationToken()
+                pool = pools.get(request.get('engine'))
+                if pool is None:
+                    send(('error', request_id, 'ValueError', f"Unknown engine: {request.get('engine')}"))
+                    continue
+                pool.submit(handle, request_id, request, token)
+            elif kind == 'cancel':
+                token = tokens.get(message[1])
+                if token:
+                    token.cancel(message[2] or "Cancelled by user")
+    finally:
+        for token in list(tokens.values()):
+            token.cancel("Worker shutting down")
+        for pool in pools.values():
+            pool.shutdown(wait=True)
+        for r in router:
+            r.shutdown()
+        for scheduler in schedulers.values():
+            scheduler.shutdown()
+        for subtitle_renderer in subtitle_renderers.values():
+            subtitle_renderer.shutdown()